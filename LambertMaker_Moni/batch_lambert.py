@@ -0,0 +1,154 @@
+"""
+batch_lambert.py
+Génération non interactive de conditions initiales DOCKS à partir de `orbital_params.csv`.
+
+Le CSV est lu en flux (jamais chargé en entier), découpé en paquets de lignes, et chaque
+paquet (éléments → état, puis Lambert) est traité par un pool de processus. Les lignes
+DOCKS sont écrites dans l'ordre du CSV via un écrivain tamponné.
+L'entrée peut aussi être un fichier `.npy` du magasin d'éléments, ouvert en memmap.
+
+Exemple :
+    python batch_lambert.py --workers 8 --chunk-size 4096 --start 0 --stop 50000
+"""
+
+import argparse
+import csv
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+
+import numpy as np
+
+from lambert_core import orbital_elements_to_r, solve_lambert_batch, format_docks_line
+from predefined_bodies import known_bodies
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "convert_tle_params", "orbital_params.csv")
+ELEMENT_COLUMNS = ["demi_grand_axe_km", "excentricite", "inclinaison_deg",
+                   "noeud_ascendant_deg", "argument_perigee_deg", "anomalie_vraie_deg"]
+# Mêmes colonnes dans le magasin d'éléments (convert_tle_params/element_store.py)
+STORE_COLUMNS = ["demi_grand_axe_km", "ecc", "inc_deg", "raan_deg", "argp_deg", "anomalie_vraie_deg"]
+
+
+def iter_chunks(rows, chunk_size):
+    """Découpe un itérateur de lignes CSV en paquets (dates, éléments (n,6))."""
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        dates = [row["epoque_utc"] for row in chunk]
+        elements = np.array([[float(row[c]) for c in ELEMENT_COLUMNS] for row in chunk])
+        yield dates, elements
+
+
+def process_chunk(task):
+    """
+    Traite un paquet : éléments → positions, cible r2 = r + offset, Lambert sur tof.
+    Retourne les lignes DOCKS (None pour les lignes non convergées).
+    """
+    dates, elements, mu, tof_s, offset = task
+    a_m = elements[:, 0] * 1000  # km → m
+    r = orbital_elements_to_r(a_m, *elements[:, 1:].T)
+    r2 = r + offset
+    v1, _, converged = solve_lambert_batch(r, r2, tof_s, mu)
+    return [format_docks_line(d, r[k], v1[k]) if converged[k] else None for k, d in enumerate(dates)]
+
+
+def iter_store_chunks(elements, chunk_size):
+    """Découpe un tableau du magasin d'éléments (`convert_tle_params/element_store.py`) en paquets (dates, éléments (n,6))."""
+    for k in range(0, len(elements), chunk_size):
+        block = elements[k:k + chunk_size]
+        dates = [e.isoformat() + "Z" for e in block["epoch"].astype(object)]
+        yield dates, np.column_stack([block[c] for c in STORE_COLUMNS]).astype(float)
+
+
+def run_batch(input_csv, output, mu, tof_s, offset, start=0, stop=None,
+              chunk_size=4096, workers=None, split=False):
+    """
+    Exécute le pipeline sur les lignes [start, stop) du CSV.
+
+    input_csv : CSV des paramètres orbitaux, ou fichier `.npy` du magasin d'éléments
+                (`current.npy` / `history.npy`), ouvert en memmap au lieu de relire du texte
+    output : fichier DOCKS multi-lignes (une ligne par objet), ou dossier si `split`
+             (un fichier InitCond_Lambert_<ligne>.txt par objet)
+    Retourne (nombre de lignes écrites, nombre de lignes ignorées).
+    """
+    written = skipped = 0
+    with ExitStack() as stack:
+        if input_csv.endswith(".npy"):
+            chunks = iter_store_chunks(np.load(input_csv, mmap_mode="r")[start:stop], chunk_size)
+        else:
+            f = stack.enter_context(open(input_csv, newline=""))
+            chunks = iter_chunks(islice(csv.DictReader(f), start, stop), chunk_size)
+        tasks = ((dates, elements, mu, tof_s, offset) for dates, elements in chunks)
+
+        if split:
+            os.makedirs(output, exist_ok=True)
+        else:
+            out = stack.enter_context(open(output, "w", buffering=1 << 20))
+
+        def write(lines, first_row):
+            nonlocal written, skipped
+            for k, line in enumerate(lines):
+                if line is None:
+                    skipped += 1
+                    continue
+                if split:
+                    with open(os.path.join(output, f"InitCond_Lambert_{first_row + k}.txt"), "w") as g:
+                        g.write(line)
+                else:
+                    out.write(line + "\n")
+                written += 1
+
+        row = start
+        if workers == 1:
+            for task in tasks:
+                lines = process_chunk(task)
+                write(lines, row)
+                row += len(lines)
+        else:
+            # Au plus 2 paquets en attente par processus : mémoire bornée quelle que soit la taille du CSV
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            max_pending = 2 * (workers or os.cpu_count() or 1)
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(process_chunk, task))
+                if len(pending) >= max_pending:
+                    lines = pending.popleft().result()
+                    write(lines, row)
+                    row += len(lines)
+            while pending:
+                lines = pending.popleft().result()
+                write(lines, row)
+                row += len(lines)
+    return written, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génération DOCKS par lots depuis orbital_params.csv (Lambert)")
+    parser.add_argument("-i", "--input", default=DEFAULT_CSV, help="CSV des paramètres orbitaux, ou .npy du magasin d'éléments (memmap)")
+    parser.add_argument("-o", "--output", default="InitCond_Lambert_batch.txt",
+                        help="Fichier DOCKS multi-lignes de sortie (ou dossier avec --split)")
+    parser.add_argument("--split", action="store_true", help="Écrire un fichier DOCKS par ligne dans le dossier --output")
+    parser.add_argument("--body", default="earth", help="Corps central (défaut: earth)")
+    parser.add_argument("--tof-hours", type=float, default=2.0, help="Durée du transfert (heures, défaut: 2)")
+    parser.add_argument("--offset", type=float, nargs=3, default=[1e5, 0.0, 0.0],
+                        help="Déplacement de la cible r2 - r1 (m, défaut: 1e5 0 0)")
+    parser.add_argument("--start", type=int, default=0, help="Première ligne du CSV traitée (0 = première ligne de données)")
+    parser.add_argument("--stop", type=int, default=None, help="Ligne de fin (exclue), défaut: fin du fichier")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Nombre de lignes par paquet")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut: tous les cœurs)")
+    args = parser.parse_args()
+
+    mu = known_bodies[args.body][0]
+    written, skipped = run_batch(args.input, args.output, mu, args.tof_hours * 3600.0, np.array(args.offset),
+                                 start=args.start, stop=args.stop, chunk_size=args.chunk_size,
+                                 workers=args.workers, split=args.split)
+    if skipped:
+        print(f"⚠️  {skipped} ligne(s) ignorée(s) : Lambert n'a pas convergé")
+    print(f"✅ {written} condition(s) initiale(s) DOCKS générée(s) : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
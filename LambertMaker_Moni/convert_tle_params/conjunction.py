@@ -0,0 +1,240 @@
+"""conjunction.py
+
+Criblage des rapprochements (conjonctions) entre tous les objets d'un catalogue TLE
+sur une fenêtre de temps, sans test de toutes les paires à chaque pas.
+
+Trois filtres successifs :
+1. apogée / périgée : un objet dont la coquille radiale [périgée, apogée] (élargie de la
+   marge) ne recoupe celle d'aucun autre objet n'est même pas propagé, et les paires
+   candidates dont les coquilles sont disjointes sont écartées ;
+2. index spatial : à chaque pas de la grille, un KD-tree des positions SGP4 donne les paires
+   à moins de `seuil + v_max·pas` (distance que la paire peut rattraper en un demi-pas) ;
+3. raffinement : sur chaque intervalle [t_k, t_k+1], la position relative est interpolée
+   par un polynôme d'Hermite cubique (positions et vitesses aux deux bornes) et la date
+   de plus courte distance (TCA) est trouvée par Newton protégé sur d/dt |Δr|² = 0.
+
+Le coût est dominé par la propagation et les KD-trees, quasi linéaire en taille de catalogue.
+
+Exemple :
+    python conjunction.py -i tle.txt --start 2025-09-05T00:00 --hours 24 --step 60 --threshold-km 5
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import os
+import sys
+
+import numpy as np
+
+# lazy_import est partagé par tous les outils (dossier common/ à la racine du dépôt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "common")))
+
+from lazy_import import lazy_import
+from tle_to_orbital_params import parse_tle_catalog, mean_motion_to_sma
+from sgp4_propagation import iter_catalog_states
+
+scipy_spatial = lazy_import("scipy.spatial")
+
+# Borne de l'accélération relative de deux objets en orbite terrestre (2·mu/R², m/s²)
+A_REL_MAX = 2.0 * 398600.4418e9 / 6378137.0**2
+
+CONJUNCTION_DTYPE = np.dtype([
+    ('index_1', 'i8'),                  # lignes du catalogue
+    ('index_2', 'i8'),
+    ('satnum_1', 'i4'),
+    ('satnum_2', 'i4'),
+    ('tca', 'datetime64[us]'),          # date de plus courte distance
+    ('miss_m', 'f8'),                   # distance minimale (m)
+    ('vrel_m_s', 'f8'),                 # vitesse relative au TCA (m/s)
+])
+
+
+def perigee_apogee(catalog: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Rayons de périgée et d'apogée (m) à partir des éléments moyens du TLE."""
+    a_m = mean_motion_to_sma(catalog['mean_motion_rev_per_day']) * 1000.0
+    return a_m * (1.0 - catalog['ecc']), a_m * (1.0 + catalog['ecc'])
+
+
+def shell_overlap_mask(perigee: np.ndarray, apogee: np.ndarray, margin: float) -> np.ndarray:
+    """Objets dont la coquille [périgée - marge, apogée + marge] recoupe celle d'au moins un autre objet.
+
+    Balayage des intervalles triés par borne basse : O(n log n).
+    """
+    lo, hi = perigee - margin, apogee + margin
+    n = len(lo)
+    order = np.argsort(lo, kind='stable')
+    lo_s, hi_s = lo[order], hi[order]
+    # Recouvrement avec un objet précédent : plus grande borne haute déjà vue >= borne basse courante
+    prev_max = np.maximum.accumulate(hi_s)
+    overlap_prev = np.zeros(n, dtype=bool)
+    overlap_prev[1:] = prev_max[:-1] >= lo_s[1:]
+    # Recouvrement avec un objet suivant : borne basse suivante <= borne haute courante
+    overlap_next = np.zeros(n, dtype=bool)
+    overlap_next[:-1] = lo_s[1:] <= hi_s[:-1]
+    mask = np.zeros(n, dtype=bool)
+    mask[order] = overlap_prev | overlap_next
+    return mask
+
+
+def _candidate_pairs(r: np.ndarray, radius: float) -> np.ndarray:
+    """Paires (i, j), i < j, à moins de `radius` à un pas donné (KD-tree, positions NaN ignorées)."""
+    finite = np.flatnonzero(np.isfinite(r).all(axis=1))
+    if len(finite) < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = scipy_spatial.cKDTree(r[finite]).query_pairs(radius, output_type='ndarray')
+    return finite[pairs]
+
+
+def _hermite(dr0, dv0, dr1, dv1, dt, s):
+    """Position relative interpolée et ses dérivées par rapport à s ∈ [0, 1] (Hermite cubique)."""
+    s = s[:, None]
+    s2, s3 = s * s, s * s * s
+    m0, m1 = dv0 * dt, dv1 * dt
+    p = (2 * s3 - 3 * s2 + 1) * dr0 + (s3 - 2 * s2 + s) * m0 + (-2 * s3 + 3 * s2) * dr1 + (s3 - s2) * m1
+    dp = (6 * s2 - 6 * s) * dr0 + (3 * s2 - 4 * s + 1) * m0 + (-6 * s2 + 6 * s) * dr1 + (3 * s2 - 2 * s) * m1
+    ddp = (12 * s - 6) * dr0 + (6 * s - 4) * m0 + (-12 * s + 6) * dr1 + (6 * s - 2) * m1
+    return p, dp, ddp
+
+
+def refine_tca(dr0, dv0, dr1, dv1, dt, iterations=12):
+    """
+    Plus courte distance entre deux pas pour un lot de paires.
+
+    dr0, dv0 / dr1, dv1 : positions et vitesses relatives (n, 3) aux deux bornes de l'intervalle
+    dt : durée de l'intervalle (s)
+    Retourne (s* ∈ [0, 1], distance minimale (m), vitesse relative (m/s)).
+    Le minimum est cherché là où g(s) = Δr·dΔr/ds change de signe ; sinon la borne la plus proche est retenue.
+    """
+    g0 = np.einsum('ij,ij->i', dr0, dv0)
+    g1 = np.einsum('ij,ij->i', dr1, dv1)
+    lo = np.zeros(len(dr0))
+    hi = np.ones(len(dr0))
+    bracket = (g0 < 0) & (g1 >= 0)
+    s = np.where(bracket, np.clip(g0 / np.where(g0 != g1, g0 - g1, 1.0), 0.0, 1.0),
+                 np.where(np.linalg.norm(dr0, axis=1) <= np.linalg.norm(dr1, axis=1), 0.0, 1.0))
+
+    for _ in range(iterations):
+        p, dp, ddp = _hermite(dr0, dv0, dr1, dv1, dt, s)
+        g = np.einsum('ij,ij->i', p, dp)
+        dg = np.einsum('ij,ij->i', dp, dp) + np.einsum('ij,ij->i', p, ddp)
+        lo = np.where(bracket & (g < 0), s, lo)
+        hi = np.where(bracket & (g >= 0), s, hi)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = s - g / dg
+        # Newton protégé : bissection si le pas sort de l'intervalle [lo, hi]
+        ok = np.isfinite(newton) & (newton > lo) & (newton < hi)
+        s = np.where(bracket, np.where(ok, newton, 0.5 * (lo + hi)), s)
+
+    p, dp, _ = _hermite(dr0, dv0, dr1, dv1, dt, s)
+    return s, np.linalg.norm(p, axis=1), np.linalg.norm(dp, axis=1) / dt
+
+
+def screen_conjunctions(catalog: np.ndarray, start, duration_s: float, step_s: float = 60.0,
+                        threshold_m: float = 5e3, shell_margin_m: float = 20e3,
+                        chunk_times: int = 64) -> np.ndarray:
+    """
+    Recherche les rapprochements à moins de `threshold_m` entre objets du catalogue sur
+    [start, start + duration_s].
+
+    catalog        : tableau `parse_tle_catalog` (les objets invalides sont ignorés)
+    start          : début de la fenêtre (datetime64 ou chaîne ISO, UTC)
+    step_s         : pas de la grille de propagation (s)
+    shell_margin_m : marge du filtre apogée / périgée (écart éléments moyens TLE / positions SGP4)
+    chunk_times    : nombre de pas propagés à la fois (mémoire ~ n_objets × chunk_times × 48 octets)
+
+    Retourne un tableau `CONJUNCTION_DTYPE` trié par TCA (une ligne par rapprochement ;
+    une même paire peut apparaître à chaque passage). Deux TLE d'un même numéro NORAD ne
+    sont pas comparés.
+    """
+    start = np.datetime64(start, 'us')
+    n_steps = int(np.floor(duration_s / step_s)) + 1
+    times = start + np.round(np.arange(n_steps) * step_s * 1e6).astype(np.int64).astype('timedelta64[us]')
+
+    # Filtre 1 : coquilles radiales
+    perigee, apogee = perigee_apogee(catalog)
+    keep = np.flatnonzero(catalog['valid'] & shell_overlap_mask(perigee, apogee, shell_margin_m + threshold_m))
+    sub = catalog[keep]
+    satnum = sub['satnum']
+    peri, apo = perigee[keep], apogee[keep]
+    n = len(sub)
+
+    found = []
+    prev_state, prev_pairs = None, None
+    k = 0
+    for _, _, states, _ in iter_catalog_states(sub, times, chunk_objects=max(n, 1), chunk_times=chunk_times):
+        for state in states.transpose(1, 0, 2):
+            r, v = state[:, :3], state[:, 3:]
+            v_max = np.nanmax(np.linalg.norm(v, axis=1)) if n else 0.0
+            # Filtre 2 : KD-tree, rayon élargi du chemin relatif parcourable en un demi-pas
+            pairs = _candidate_pairs(r, threshold_m + v_max * step_s)
+            if prev_state is not None:
+                codes = np.union1d(prev_pairs[:, 0] * n + prev_pairs[:, 1], pairs[:, 0] * n + pairs[:, 1])
+                i, j = codes // n, codes % n
+                ok = (satnum[i] != satnum[j]) & (np.maximum(peri[i], peri[j]) - np.minimum(apo[i], apo[j])
+                                                 <= shell_margin_m + threshold_m)
+                i, j = i[ok], j[ok]
+                found.append(_refine_interval(prev_state, state, i, j, times[k - 1], step_s, threshold_m,
+                                              first=(k == 1), last=(k == n_steps - 1)))
+            prev_state, prev_pairs = state, pairs
+            k += 1
+
+    events = np.concatenate(found) if found else np.zeros(0, dtype=CONJUNCTION_DTYPE)
+    events['index_1'] = keep[events['index_1']]
+    events['index_2'] = keep[events['index_2']]
+    events['satnum_1'] = catalog['satnum'][events['index_1']]
+    events['satnum_2'] = catalog['satnum'][events['index_2']]
+    return events[np.argsort(events['tca'], kind='stable')]
+
+
+def _refine_interval(state0, state1, i, j, t0, dt, threshold_m, first, last):
+    """Filtre 3 : TCA des paires candidates sur [t0, t0 + dt], rapprochements sous le seuil."""
+    dr0 = state0[j, :3] - state0[i, :3]
+    dr1 = state1[j, :3] - state1[i, :3]
+    # Pré-filtre : distance minimale à la corde [dr0, dr1], la trajectoire relative s'en écartant
+    # d'au plus a_max·dt²/8 (a_max : accélération relative maximale)
+    w = dr1 - dr0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = np.clip(-np.einsum('ij,ij->i', dr0, w) / np.einsum('ij,ij->i', w, w), 0.0, 1.0)
+    chord = np.linalg.norm(dr0 + np.nan_to_num(tau)[:, None] * w, axis=1)
+    near = chord < threshold_m + A_REL_MAX * dt * dt / 8.0
+    i, j, dr0, dr1 = i[near], j[near], dr0[near], dr1[near]
+
+    dv0 = state0[j, 3:] - state0[i, 3:]
+    dv1 = state1[j, 3:] - state1[i, 3:]
+    s, miss, vrel = refine_tca(dr0, dv0, dr1, dv1, dt)
+    # Un minimum sur une borne appartient à l'intervalle voisin, sauf aux bords de la fenêtre
+    interior = (s > 0.0) & (s < 1.0)
+    at_edge = ((s == 0.0) & first) | ((s == 1.0) & last)
+    hit = (interior | at_edge) & (miss < threshold_m)
+
+    events = np.zeros(np.count_nonzero(hit), dtype=CONJUNCTION_DTYPE)
+    events['index_1'], events['index_2'] = i[hit], j[hit]
+    events['tca'] = t0 + np.round(s[hit] * dt * 1e6).astype(np.int64).astype('timedelta64[us]')
+    events['miss_m'], events['vrel_m_s'] = miss[hit], vrel[hit]
+    return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Criblage des rapprochements entre objets d\'un catalogue TLE')
+    parser.add_argument('-i', '--input', default='tle.txt', help='Chemin vers le fichier TLE (par défaut: tle.txt)')
+    parser.add_argument('-o', '--output', default='conjunctions.csv', help='Fichier CSV de sortie')
+    parser.add_argument('--start', required=True, help='Début de la fenêtre (ISO, UTC)')
+    parser.add_argument('--hours', type=float, default=24.0, help='Durée de la fenêtre (heures, défaut: 24)')
+    parser.add_argument('--step', type=float, default=60.0, help='Pas de propagation (s, défaut: 60)')
+    parser.add_argument('--threshold-km', type=float, default=5.0, help='Seuil de distance (km, défaut: 5)')
+    args = parser.parse_args()
+
+    catalog = parse_tle_catalog(args.input)
+    events = screen_conjunctions(catalog, args.start, args.hours * 3600.0, args.step, args.threshold_km * 1e3)
+    with open(args.output, 'w', newline='', encoding='utf-8') as csvf:
+        writer = csv.writer(csvf)
+        writer.writerow(['satnum_1', 'nom_1', 'satnum_2', 'nom_2', 'tca_utc', 'distance_km', 'vitesse_relative_km_s'])
+        writer.writerows([ev['satnum_1'], catalog['nom'][ev['index_1']], ev['satnum_2'], catalog['nom'][ev['index_2']],
+                          ev['tca'].item().isoformat() + "Z", ev['miss_m'] / 1e3, ev['vrel_m_s'] / 1e3]
+                         for ev in events)
+    print(f"✅ {len(events)} rapprochement(s) sous {args.threshold_km} km. Fichier de sortie : {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""element_store.py
+
+Magasin d'éléments orbitaux alimenté de façon incrémentale à partir de fichiers TLE.
+
+Chaque jeu d'éléments est identifié par son numéro NORAD et un hash du contenu de ses
+deux lignes TLE. À l'ingestion, seuls les TLE nouveaux ou modifiés sont découpés et
+convertis (demi-grand axe, anomalie vraie) ; les jeux déjà connus sont ignorés.
+
+Le magasin est un dossier de fichiers `.npy` (tableaux structurés `STORE_DTYPE`) :
+- `history.npy` : tous les jeux d'éléments ingérés (historique par objet) ;
+- `current.npy` : le jeu le plus récent (époque) de chaque objet, trié par numéro NORAD.
+
+Les traitements en aval ouvrent `current.npy` en memmap (`load_current`) au lieu de relire
+le CSV texte.
+
+Exemple :
+    python element_store.py -i tle.txt -s element_store --csv orbital_params.csv
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import hashlib
+import os
+
+import numpy as np
+
+from tle_to_orbital_params import (TLE_DTYPE, read_tle_file, parse_tle_arrays,
+                                   mean_motion_to_sma, mean_to_true_anomaly)
+
+STORE_DTYPE = np.dtype(TLE_DTYPE.descr + [
+    ('tle_hash', 'u8'),                 # hash (blake2b, 64 bits) des deux lignes TLE
+    ('demi_grand_axe_km', 'f8'),
+    ('anomalie_vraie_deg', 'f8'),
+    ('ingested', 'datetime64[s]'),      # date d'ingestion (UTC)
+])
+
+HISTORY_FILE = "history.npy"
+CURRENT_FILE = "current.npy"
+
+
+def tle_hashes(l1: np.ndarray, l2: np.ndarray) -> np.ndarray:
+    """Hash 64 bits du contenu (line1 + line2) de chaque TLE."""
+    rows = np.concatenate([l1, l2], axis=1)
+    return np.array([int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), 'little')
+                     for row in rows], dtype=np.uint64)
+
+
+def _load(path, mmap=True):
+    if not os.path.exists(path):
+        return np.zeros(0, dtype=STORE_DTYPE)
+    return np.load(path, mmap_mode='r' if mmap else None)
+
+
+def _save(path, array):
+    """Écriture atomique : un lecteur qui a le fichier en memmap n'en voit jamais une version partielle."""
+    tmp = path + ".tmp.npy"
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+def load_history(store_dir: str, mmap: bool = True) -> np.ndarray:
+    """Tous les jeux d'éléments ingérés (`STORE_DTYPE`), ouverts en memmap par défaut."""
+    return _load(os.path.join(store_dir, HISTORY_FILE), mmap)
+
+
+def load_current(store_dir: str, mmap: bool = True) -> np.ndarray:
+    """Dernier jeu d'éléments de chaque objet (`STORE_DTYPE`, trié par numéro NORAD), en memmap par défaut."""
+    return _load(os.path.join(store_dir, CURRENT_FILE), mmap)
+
+
+def object_history(store_dir: str, satnum: int) -> np.ndarray:
+    """Historique d'un objet, trié par époque."""
+    history = load_history(store_dir)
+    rows = history[history['satnum'] == satnum]
+    return rows[np.argsort(rows['epoch'], kind='stable')]
+
+
+def latest_per_object(history: np.ndarray) -> np.ndarray:
+    """Jeu d'éléments d'époque la plus récente pour chaque numéro NORAD (à époque égale : le dernier ingéré)."""
+    if len(history) == 0:
+        return history[:0].copy()
+    order = np.lexsort((np.arange(len(history)), history['epoch'], history['satnum']))
+    satnum = history['satnum'][order]
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = satnum[1:] != satnum[:-1]
+    return history[order[last]]
+
+
+def ingest(tle_path: str, store_dir: str) -> dict:
+    """
+    Ajoute au magasin les TLE nouveaux ou modifiés de `tle_path`.
+
+    Seuls ces TLE sont découpés et convertis. Les TLE invalides (champ illisible,
+    somme de contrôle fausse) ne sont pas stockés.
+    Retourne les compteurs {'lus', 'nouveaux', 'inchangés', 'invalides', 'objets'}.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    names, l1, l2 = read_tle_file(tle_path)
+    hashes = tle_hashes(l1, l2)
+
+    history = load_history(store_dir, mmap=False)
+    # Un même fichier peut contenir deux fois le même TLE : on ne garde que la première occurrence
+    _, first = np.unique(hashes, return_index=True)
+    is_first = np.zeros(len(hashes), dtype=bool)
+    is_first[first] = True
+    new = is_first & ~np.isin(hashes, history['tle_hash'])
+    idx = np.flatnonzero(new)
+
+    parsed = parse_tle_arrays([names[k] for k in idx], l1[idx], l2[idx])
+    parsed_hashes = hashes[idx]
+    valid = parsed['valid']
+    parsed, parsed_hashes = parsed[valid], parsed_hashes[valid]
+
+    added = np.zeros(len(parsed), dtype=STORE_DTYPE)
+    for name in TLE_DTYPE.names:
+        added[name] = parsed[name]
+    added['tle_hash'] = parsed_hashes
+    added['demi_grand_axe_km'] = mean_motion_to_sma(parsed['mean_motion_rev_per_day'])
+    added['anomalie_vraie_deg'] = mean_to_true_anomaly(parsed['mean_anom_deg'], parsed['ecc'])
+    added['ingested'] = np.datetime64('now', 's')
+
+    history = np.concatenate([history, added])
+    if len(added) or not os.path.exists(os.path.join(store_dir, CURRENT_FILE)):
+        _save(os.path.join(store_dir, HISTORY_FILE), history)
+        _save(os.path.join(store_dir, CURRENT_FILE), latest_per_object(history))
+
+    return {
+        'lus': len(hashes),
+        'nouveaux': len(added),
+        'inchangés': len(hashes) - len(idx),
+        'invalides': int(np.count_nonzero(~valid)),
+        'objets': len(np.unique(history['satnum'])),
+    }
+
+
+def export_csv(store_dir: str, output_csv: str) -> int:
+    """Écrit le dernier jeu d'éléments de chaque objet au format de `orbital_params.csv`."""
+    current = load_current(store_dir)
+    epochs_iso = [e.isoformat() + "Z" for e in current['epoch'].astype(object)]
+    fieldnames = ['nom', 'epoque_utc', 'demi_grand_axe_km', 'excentricite', 'inclinaison_deg',
+                  'noeud_ascendant_deg', 'argument_perigee_deg', 'anomalie_vraie_deg']
+    columns = [current['nom'].tolist(), epochs_iso, current['demi_grand_axe_km'].tolist(), current['ecc'].tolist(),
+               current['inc_deg'].tolist(), current['raan_deg'].tolist(), current['argp_deg'].tolist(),
+               current['anomalie_vraie_deg'].tolist()]
+    with open(output_csv, 'w', newline='', encoding='utf-8') as csvf:
+        writer = csv.writer(csvf)
+        writer.writerow(fieldnames)
+        writer.writerows(zip(*columns))
+    return len(current)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Ingestion incrémentale de TLE dans le magasin d\'éléments')
+    parser.add_argument('-i', '--input', default='tle.txt', help='Chemin vers le fichier TLE (par défaut: tle.txt)')
+    parser.add_argument('-s', '--store', default='element_store', help='Dossier du magasin (par défaut: element_store)')
+    parser.add_argument('--csv', default=None, help='Exporter aussi le dernier jeu de chaque objet dans ce CSV')
+    args = parser.parse_args()
+
+    counts = ingest(args.input, args.store)
+    if counts['invalides']:
+        print(f"⚠️  {counts['invalides']} TLE(s) invalide(s) ignoré(s)")
+    print(f"✅ {counts['lus']} TLE(s) lus : {counts['nouveaux']} nouveau(x) ou modifié(s), "
+          f"{counts['inchangés']} inchangé(s). {counts['objets']} objet(s) dans {args.store}")
+    if args.csv:
+        n = export_csv(args.store, args.csv)
+        print(f"✅ {n} objet(s) exporté(s) : {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
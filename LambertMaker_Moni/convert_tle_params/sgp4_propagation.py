@@ -0,0 +1,107 @@
+"""sgp4_propagation.py
+
+Propagation SGP4/SDP4 de tout un catalogue TLE (tableau structuré de
+`tle_to_orbital_params.parse_tle_catalog`) sur une grille de dates.
+
+Contrairement à la conversion éléments moyens → éléments osculateurs à l'époque
+(`orbital_params.csv`), les états obtenus sont ceux du modèle SGP4 à n'importe
+quelle date. La propagation est vectorisée sur les objets et sur les dates
+(`sgp4.api.SatrecArray`) et découpée en paquets pour borner la mémoire.
+
+Repère : TEME (celui de SGP4). Unités : m et m/s.
+"""
+
+from __future__ import annotations
+import math
+import os
+import sys
+from typing import Iterator, Tuple
+
+import numpy as np
+
+# lazy_import est partagé par tous les outils (dossier common/ à la racine du dépôt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "common")))
+
+from lazy_import import lazy_import
+
+# Dépendance optionnelle (pip install sgp4), importée seulement à la première propagation
+sgp4_api = lazy_import("sgp4.api")
+
+XPDOTP = 1440.0 / (2.0 * math.pi)   # rev/jour -> rad/min
+JD_UNIX_EPOCH = 2440587.5           # jour julien du 1970-01-01T00:00:00
+JD_SGP4_EPOCH = 2433281.5           # origine des époques sgp4init (1949-12-31T00:00:00)
+
+
+def datetime64_to_jd(times) -> Tuple[np.ndarray, np.ndarray]:
+    """Dates datetime64 (UTC) → (jour julien entier, fraction) pour garder la précision."""
+    us = np.asarray(times, dtype='datetime64[us]').astype(np.int64)
+    days, us_in_day = np.divmod(us, 86_400_000_000)
+    return days + JD_UNIX_EPOCH, us_in_day / 86_400_000_000.0
+
+
+def build_satrecs(catalog: np.ndarray) -> list:
+    """Initialise un `Satrec` SGP4 (WGS72, mode 'i') par objet valide du catalogue, sans relire les lignes TLE."""
+    jd, fr = datetime64_to_jd(catalog['epoch'])
+    epoch_1949 = (jd - JD_SGP4_EPOCH) + fr
+    satrecs = []
+    for k in range(len(catalog)):
+        sat = sgp4_api.Satrec()
+        sat.sgp4init(
+            sgp4_api.WGS72, 'i', int(catalog['satnum'][k]), float(epoch_1949[k]),
+            float(catalog['bstar'][k]),
+            float(catalog['ndot'][k]) / (XPDOTP * 1440.0),
+            float(catalog['nddot'][k]) / (XPDOTP * 1440.0 * 1440.0),
+            float(catalog['ecc'][k]),
+            math.radians(catalog['argp_deg'][k]),
+            math.radians(catalog['inc_deg'][k]),
+            math.radians(catalog['mean_anom_deg'][k]),
+            float(catalog['mean_motion_rev_per_day'][k]) / XPDOTP,
+            math.radians(catalog['raan_deg'][k]),
+        )
+        satrecs.append(sat)
+    return satrecs
+
+
+def iter_catalog_states(catalog: np.ndarray, times, chunk_objects: int = 2048,
+                        chunk_times: int = 1024) -> Iterator[Tuple[slice, slice, np.ndarray, np.ndarray]]:
+    """Propage le catalogue par paquets (objets × dates).
+
+    Produit (tranche d'objets, tranche de dates, états (n_obj, n_t, 6) en m et m/s, codes d'erreur SGP4).
+    Les objets invalides du catalogue et les erreurs SGP4 (code != 0) donnent des états NaN.
+    La mémoire de travail est bornée par chunk_objects × chunk_times.
+    """
+    jd, fr = datetime64_to_jd(times)
+    n_obj, n_t = len(catalog), len(jd)
+    for i0 in range(0, n_obj, chunk_objects):
+        objs = slice(i0, min(i0 + chunk_objects, n_obj))
+        sub = catalog[objs]
+        ok = np.flatnonzero(sub['valid'])
+        sats = sgp4_api.SatrecArray(build_satrecs(sub[ok])) if len(ok) else None
+        for j0 in range(0, n_t, chunk_times):
+            ts = slice(j0, min(j0 + chunk_times, n_t))
+            states = np.full((len(sub), ts.stop - ts.start, 6), np.nan)
+            errors = np.full((len(sub), ts.stop - ts.start), -1, dtype=np.int8)
+            if sats is not None:
+                e, r, v = sats.sgp4(jd[ts], fr[ts])
+                good = (e == 0)[..., None]
+                states[ok, :, :3] = np.where(good, r * 1e3, np.nan)
+                states[ok, :, 3:] = np.where(good, v * 1e3, np.nan)
+                errors[ok] = e
+            yield objs, ts, states, errors
+
+
+def propagate_catalog(catalog: np.ndarray, times, chunk_objects: int = 2048, chunk_times: int = 1024,
+                      out: np.ndarray | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Propage tout le catalogue sur `times` (datetime64 UTC).
+
+    Retourne (états (n_objets, n_dates, 6) en m et m/s dans TEME, codes d'erreur SGP4 (n_objets, n_dates)).
+    `out` peut être un tableau préalloué, par ex. `np.lib.format.open_memmap(...)`, pour les très gros cubes.
+    """
+    n_obj, n_t = len(catalog), len(np.atleast_1d(times))
+    if out is None:
+        out = np.empty((n_obj, n_t, 6))
+    errors = np.empty((n_obj, n_t), dtype=np.int8)
+    for objs, ts, states, err in iter_catalog_states(catalog, times, chunk_objects, chunk_times):
+        out[objs, ts] = states
+        errors[objs, ts] = err
+    return out, errors
@@ -4,17 +4,27 @@ Lit un fichier TLE (trois lignes par objet: nom, line1, line2) et extrait
 les paramètres orbitaux présents dans le TLE. Écrit le résultat dans
 `orbital_params.csv` (CSV avec en-tête).
 
-Ce script n'utilise aucune dépendance externe — il parse les champs fixes
-du format TLE.
+Les champs fixes du format TLE sont découpés pour tout le catalogue à la fois
+(`parse_tle_catalog`, NumPy uniquement) ; les fonctions scalaires ligne par ligne
+restent disponibles.
 """
 
 from __future__ import annotations
 import argparse
 import csv
+import os
+import sys
 from datetime import datetime, timedelta
 from typing import Tuple
 import math
 
+import numpy as np
+
+# lambert_core se trouve dans le dossier parent (LambertMaker_Moni)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lambert_core import mean_to_true_anomaly_rad
+
 
 def parse_epoch_from_line1(line1: str) -> str:
     """Extrait l'époque du TLE (YYDDD.DDD...) et retourne ISO string UTC."""
@@ -74,108 +84,218 @@ def parse_line2(line2: str) -> Tuple[float, float, float, float, float, float]:
     return inc, raan, ecc, argp, mean_anom, mean_motion
 
 
-def mean_motion_to_sma(mean_motion_rev_per_day: float, mu: float = 398600.4418) -> float:
+def mean_motion_to_sma(mean_motion_rev_per_day, mu: float = 398600.4418):
     """Convertit le mouvement moyen (rev/day) en demi-grand axe (km) via la loi de Kepler.
 
     a = (mu / n^2)^{1/3}, avec n en rad/s.
     mu par défaut = 398600.4418 km^3/s^2 (Terre)
+    Accepte un scalaire ou un tableau (tout le catalogue en une fois) ; les entrées invalides donnent NaN.
     """
-    try:
-        if mean_motion_rev_per_day is None or math.isnan(mean_motion_rev_per_day):
-            return float('nan')
-        n = mean_motion_rev_per_day * 2.0 * math.pi / 86400.0  # rev/day -> rad/s
-        a = (mu / (n * n)) ** (1.0 / 3.0)
-        return a
-    except Exception:
-        return float('nan')
+    n = np.asarray(mean_motion_rev_per_day, dtype=float) * 2.0 * math.pi / 86400.0  # rev/day -> rad/s
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = np.where(n > 0, (mu / (n * n)) ** (1.0 / 3.0), np.nan)
+    return float(a) if a.ndim == 0 else a
 
 
-def mean_to_true_anomaly(mean_anom_deg: float, e: float) -> float:
-    """Convertit anomalie moyenne (deg) en anomalie vraie (deg) pour orbite elliptique.
+def mean_to_true_anomaly(mean_anom_deg, e):
+    """Convertit anomalie moyenne (deg) en anomalie vraie (deg), orbites elliptiques ou hyperboliques.
 
-    Résolution numérique de l'équation de Kepler pour obtenir l'anomalie excentrique E,
-    puis conversion en anomalie vraie v.
+    Accepte des scalaires ou des tableaux : l'équation de Kepler est résolue pour tous les objets
+    à la fois par le solveur vectorisé `lambert_core.solve_kepler` (démarrage de Markley + Halley).
+    Les entrées invalides donnent NaN.
     """
-    try:
-        if mean_anom_deg is None or math.isnan(mean_anom_deg) or e is None or math.isnan(e):
-            return float('nan')
-        M = math.radians(mean_anom_deg) % (2.0 * math.pi)
-        # cas quasi-circulaire
-        if abs(e) < 1e-12:
-            return math.degrees(M)
-
-        # initial guess
-        E = M if e < 0.8 else math.pi
-        for _ in range(60):
-            f = E - e * math.sin(E) - M
-            fprime = 1 - e * math.cos(E)
-            if abs(fprime) < 1e-16:
-                break
-            delta = f / fprime
-            E -= delta
-            if abs(delta) < 1e-12:
-                break
-
-        # calcul de l'anomalie vraie
-        cosE = math.cos(E)
-        sinE = math.sin(E)
-        denom = 1 - e * cosE
-        if abs(denom) < 1e-16:
-            v = 0.0
-        else:
-            sin_v = math.sqrt(1 - e * e) * sinE / denom
-            cos_v = (cosE - e) / denom
-            v = math.atan2(sin_v, cos_v)
-
-        return math.degrees(v) % 360.0
-    except Exception:
-        return float('nan')
+    M = np.radians(np.asarray(mean_anom_deg, dtype=float)) % (2.0 * math.pi)
+    e = np.asarray(e, dtype=float)
+    nu, converged = mean_to_true_anomaly_rad(M, e)
+    nu_deg = np.where(converged, np.degrees(nu) % 360.0, np.nan)
+    # cas quasi-circulaire
+    nu_deg = np.where(np.abs(e) < 1e-12, np.degrees(M), nu_deg)
+    return float(nu_deg) if nu_deg.ndim == 0 else nu_deg
+
+
+# --- Parseur vectorisé -------------------------------------------------------
+
+TLE_LINE_LENGTH = 69
+
+TLE_DTYPE = np.dtype([
+    ('nom', 'U24'),
+    ('satnum', 'i4'),
+    ('epoch', 'datetime64[us]'),
+    ('ndot', 'f8'),                     # dérivée première du mouvement moyen / 2 (rev/jour²)
+    ('nddot', 'f8'),                    # dérivée seconde du mouvement moyen / 6 (rev/jour³)
+    ('bstar', 'f8'),                    # coefficient de traînée B* (1/rayon terrestre)
+    ('inc_deg', 'f8'),
+    ('raan_deg', 'f8'),
+    ('ecc', 'f8'),
+    ('argp_deg', 'f8'),
+    ('mean_anom_deg', 'f8'),
+    ('mean_motion_rev_per_day', 'f8'),
+    ('checksum_ok', '?'),               # sommes de contrôle des deux lignes valides
+    ('valid', '?'),                     # tous les champs lus + sommes de contrôle valides
+])
+
+# Poids de la somme de contrôle TLE : chiffres = leur valeur, '-' = 1, le reste = 0
+_CHECKSUM_WEIGHTS = np.zeros(256, dtype=np.int64)
+_CHECKSUM_WEIGHTS[ord('0'):ord('9') + 1] = np.arange(10)
+_CHECKSUM_WEIGHTS[ord('-')] = 1
+
+_POW10 = 10.0 ** np.arange(23)
+
+
+def _lines_to_array(lines):
+    """Liste de lignes (bytes) → tableau (N, 69) de codes ASCII, complété par des espaces."""
+    arr = np.full((len(lines), TLE_LINE_LENGTH), ord(' '), dtype=np.uint8)
+    if lines:
+        raw = np.array(lines, dtype=f'S{TLE_LINE_LENGTH}').view(np.uint8).reshape(len(lines), TLE_LINE_LENGTH)
+        arr = np.where(raw == 0, np.uint8(ord(' ')), raw)
+    return arr
+
+
+def _parse_decimal(cols, implied_point=False):
+    """
+    Lit un champ décimal à largeur fixe ([signe]chiffres[.chiffres], espaces autour) pour toutes les lignes.
+
+    cols : tableau (N, w) de codes ASCII.
+    implied_point : True pour les champs dont le point décimal est implicite en tête (excentricité).
+    Retourne (valeurs (N,), masque de validité (N,)) ; les valeurs invalides valent NaN.
+    """
+    n, w = cols.shape
+    is_digit = (cols >= ord('0')) & (cols <= ord('9'))
+    is_dot = cols == ord('.')
+    is_space = cols == ord(' ')
+    is_sign = (cols == ord('-')) | (cols == ord('+'))
+
+    # Étendue non blanche de chaque champ : aucun espace autorisé à l'intérieur
+    non_space = ~is_space
+    first = np.argmax(non_space, axis=1)
+    last = w - 1 - np.argmax(non_space[:, ::-1], axis=1)
+    j = np.arange(w)
+    inside = (j >= first[:, None]) & (j <= last[:, None])
+    sign_pos = is_sign & (j == first[:, None])
+    valid = (non_space.any(axis=1)
+             & ~(is_space & inside).any(axis=1)
+             & ~(is_sign & ~sign_pos).any(axis=1)
+             & (is_dot.sum(axis=1) <= (0 if implied_point else 1))
+             & is_digit.any(axis=1)
+             & np.all(is_digit | is_dot | is_space | sign_pos, axis=1))
+
+    # Mantisse entière (exacte) puis division par une puissance de 10 : même arrondi que float()
+    digits = np.where(is_digit, cols.astype(np.int64) - ord('0'), 0)
+    n_digits = is_digit.sum(axis=1)
+    rank = np.cumsum(is_digit[:, ::-1], axis=1)[:, ::-1] - 1   # rang du chiffre en partant de la droite
+    mantissa = np.sum(np.where(is_digit, digits * (10 ** np.clip(rank, 0, 18)), 0), axis=1)
+    if implied_point:
+        n_frac = n_digits
+    else:
+        dot_pos = np.where(is_dot.any(axis=1), np.argmax(is_dot, axis=1), w)
+        n_frac = np.sum(is_digit & (j > dot_pos[:, None]), axis=1)
+    values = mantissa / _POW10[np.clip(n_frac, 0, 22)]
+    values = np.where((cols == ord('-')).any(axis=1), -values, values)
+    return np.where(valid, values, np.nan), valid
+
+
+def _parse_exponent(cols):
+    """
+    Lit un champ à exposant implicite du TLE (ex. ' 10596-3' = 0.10596e-3) pour toutes les lignes.
+    """
+    mantissa, ok_m = _parse_decimal(cols[:, :-2], implied_point=True)
+    exponent, ok_e = _parse_decimal(cols[:, -2:])
+    valid = ok_m & ok_e
+    return np.where(valid, mantissa * 10.0 ** np.where(valid, exponent, 0.0), np.nan), valid
+
+
+def _checksum_ok(arr):
+    """Vérifie la somme de contrôle (colonne 69) de toutes les lignes à la fois."""
+    expected = arr[:, 68].astype(np.int64) - ord('0')
+    total = _CHECKSUM_WEIGHTS[arr[:, :68]].sum(axis=1) % 10
+    return (expected >= 0) & (expected <= 9) & (total == expected)
+
+
+def _epochs(yy, day_of_year):
+    """Époques TLE (année sur deux chiffres, jour de l'année fractionnaire) → datetime64[us]."""
+    year = np.where(yy < 57, 2000 + yy, 1900 + yy)
+    day_integer = np.floor(day_of_year)
+    seconds = (day_of_year - day_integer) * 86400.0
+    # Même arrondi à la microseconde que timedelta(seconds=...)
+    whole_seconds = np.floor(seconds)
+    micro = (day_integer - 1) * 86400e6 + whole_seconds * 1e6 + np.round((seconds - whole_seconds) * 1e6)
+    start_of_year = (year - 1970).astype('datetime64[Y]').astype('datetime64[us]')
+    return start_of_year + micro.astype(np.int64).astype('timedelta64[us]')
+
+
+def read_tle_file(input_path: str):
+    """Lit un fichier TLE en bytes et retourne (noms, line1 (N, 69), line2 (N, 69)) en codes ASCII."""
+    with open(input_path, 'rb') as f:
+        lines = [ln.rstrip() for ln in f.read().splitlines() if ln.strip()]
+    n = len(lines) // 3
+    return lines[0:3 * n:3], _lines_to_array(lines[1:3 * n:3]), _lines_to_array(lines[2:3 * n:3])
+
+
+def parse_tle_arrays(names, l1: np.ndarray, l2: np.ndarray) -> np.ndarray:
+    """Découpe les colonnes fixes de lignes TLE déjà lues (`read_tle_file`) → tableau structuré `TLE_DTYPE`."""
+    n = len(l1)
+    catalog = np.zeros(n, dtype=TLE_DTYPE)
+    catalog['nom'] = [name.strip().decode('utf-8', errors='replace') for name in names]
+
+    satnum1, ok_s1 = _parse_decimal(l1[:, 2:7])
+    satnum2, ok_s2 = _parse_decimal(l2[:, 2:7])
+    yy, ok_yy = _parse_decimal(l1[:, 18:20])
+    day, ok_day = _parse_decimal(l1[:, 20:32])
+    catalog['ndot'], ok_ndot = _parse_decimal(l1[:, 33:43])
+    catalog['nddot'], ok_nddot = _parse_exponent(l1[:, 44:52])
+    catalog['bstar'], ok_bstar = _parse_exponent(l1[:, 53:61])
+    catalog['inc_deg'], ok_inc = _parse_decimal(l2[:, 8:16])
+    catalog['raan_deg'], ok_raan = _parse_decimal(l2[:, 17:25])
+    catalog['ecc'], ok_ecc = _parse_decimal(l2[:, 26:33], implied_point=True)
+    catalog['argp_deg'], ok_argp = _parse_decimal(l2[:, 34:42])
+    catalog['mean_anom_deg'], ok_ma = _parse_decimal(l2[:, 43:51])
+    catalog['mean_motion_rev_per_day'], ok_n = _parse_decimal(l2[:, 52:63])
+
+    ok_epoch = ok_yy & ok_day
+    catalog['satnum'] = np.where(ok_s1, satnum1, -1)
+    catalog['epoch'] = np.where(ok_epoch, _epochs(np.where(ok_epoch, yy, 0), np.where(ok_epoch, day, 1.0)),
+                                np.datetime64('NaT'))
+    catalog['checksum_ok'] = _checksum_ok(l1) & _checksum_ok(l2)
+    line_numbers_ok = (l1[:, 0] == ord('1')) & (l2[:, 0] == ord('2')) & ok_s1 & ok_s2 & (satnum1 == satnum2)
+    catalog['valid'] = (catalog['checksum_ok'] & line_numbers_ok & ok_epoch & ok_ndot & ok_nddot & ok_bstar
+                        & ok_inc & ok_raan & ok_ecc & ok_argp & ok_ma & ok_n)
+    return catalog
+
+
+def parse_tle_catalog(input_path: str) -> np.ndarray:
+    """Lit un fichier TLE (nom, line1, line2) et retourne un tableau structuré `TLE_DTYPE` (un élément par objet).
+
+    Le fichier est lu en bytes et les colonnes fixes sont découpées pour tous les objets à la fois.
+    Les champs illisibles valent NaN et les objets concernés (ou dont une somme de contrôle est fausse)
+    ont `valid = False` : aucune exception n'est levée champ par champ.
+    """
+    return parse_tle_arrays(*read_tle_file(input_path))
 
 
 def process_tle_file(input_path: str, output_csv: str) -> None:
-    with open(input_path, 'r', encoding='utf-8') as f:
-        lines = [ln.rstrip('\n') for ln in f if ln.strip() != '']
-
-    # Expect groups of 3 lines: name, line1, line2
-    rows = []
-    i = 0
-    while i + 2 < len(lines):
-        name = lines[i].strip()
-        line1 = lines[i+1].rstrip() if i+1 < len(lines) else ''
-        line2 = lines[i+2].rstrip() if i+2 < len(lines) else ''
-
-        epoch_iso = parse_epoch_from_line1(line1) if line1 else ''
-        inc, raan, ecc, argp, mean_anom, mean_motion = parse_line2(line2) if line2 else (None,)*6
-
-        # Calculer demi-grand axe (km) à partir du mouvement moyen (rev/day)
-        demi_grand_axe_km = mean_motion_to_sma(mean_motion)
-
-        # Calculer l'anomalie vraie (deg) à partir de l'anomalie moyenne (deg) et excentricité
-        anomalie_vraie_deg = mean_to_true_anomaly(mean_anom, ecc)
-
-        rows.append({
-            'nom': name,
-            'epoque_utc': epoch_iso,
-            'demi_grand_axe_km': demi_grand_axe_km,
-            'excentricite': ecc,
-            'inclinaison_deg': inc,
-            'noeud_ascendant_deg': raan,
-            'argument_perigee_deg': argp,
-            'anomalie_vraie_deg': anomalie_vraie_deg,
-        })
-
-        i += 3
+    catalog = parse_tle_catalog(input_path)
+
+    epochs_iso = [e.isoformat() + "Z" if e is not None else '' for e in catalog['epoch'].astype(object)]
+    # Calculer demi-grand axe (km) à partir du mouvement moyen (rev/day)
+    demi_grand_axe_km = mean_motion_to_sma(catalog['mean_motion_rev_per_day']).tolist()
+    # Calculer l'anomalie vraie (deg) à partir de l'anomalie moyenne (deg) et excentricité
+    anomalie_vraie_deg = mean_to_true_anomaly(catalog['mean_anom_deg'], catalog['ecc']).tolist()
 
     # Écrire CSV
     fieldnames = ['nom', 'epoque_utc', 'demi_grand_axe_km', 'excentricite', 'inclinaison_deg',
                   'noeud_ascendant_deg', 'argument_perigee_deg', 'anomalie_vraie_deg']
+    columns = [catalog['nom'].tolist(), epochs_iso, demi_grand_axe_km, catalog['ecc'].tolist(),
+               catalog['inc_deg'].tolist(), catalog['raan_deg'].tolist(), catalog['argp_deg'].tolist(),
+               anomalie_vraie_deg]
     with open(output_csv, 'w', newline='', encoding='utf-8') as csvf:
-        writer = csv.DictWriter(csvf, fieldnames=fieldnames)
-        writer.writeheader()
-        for r in rows:
-            writer.writerow(r)
-
-    print(f"✅ {len(rows)} TLE(s) traités. Fichier de sortie : {output_csv}")
+        writer = csv.writer(csvf)
+        writer.writerow(fieldnames)
+        writer.writerows(zip(*columns))
+
+    n_invalid = int(np.count_nonzero(~catalog['valid']))
+    if n_invalid:
+        print(f"⚠️  {n_invalid} TLE(s) invalide(s) (champ illisible ou somme de contrôle fausse)")
+    print(f"✅ {len(catalog)} TLE(s) traités. Fichier de sortie : {output_csv}")
 
 
 def main() -> None:
@@ -0,0 +1,218 @@
+"""
+lambert_cache.py
+Cache de solutions de Lambert placé devant `solve_lambert` / `solve_lambert_batch`.
+
+- un LRU en mémoire (taille en nombre d'entrées) ;
+- un stockage optionnel sur disque (SQLite) qui persiste d'un script à l'autre,
+  avec éviction des entrées les plus anciennes au-delà d'une taille maximale ;
+- des compteurs de hits / misses.
+
+Les entrées sont indexées par un hash des entrées quantifiées (positions au mm,
+temps de vol à la µs, mu exact) : deux appels qui ne diffèrent que par du bruit
+d'arrondi partagent la même solution.
+"""
+
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from lambert_core import solve_lambert_batch
+
+# Nombre maximal de clés par requête SQLite (limite historique de 999 paramètres)
+SQL_BATCH = 900
+
+
+class LambertCache:
+    """
+    Cache LRU (+ disque optionnel) de solutions de Lambert.
+
+    maxsize        : nombre maximal d'entrées gardées en mémoire
+    path           : fichier SQLite du cache disque (None = mémoire seulement)
+    max_disk_bytes : taille maximale du cache disque avant éviction des entrées les plus anciennes
+    quantum_m      : pas de quantification des positions (m)
+    quantum_s      : pas de quantification des temps de vol (s)
+    """
+
+    def __init__(self, maxsize=100_000, path=None, max_disk_bytes=256 * 2**20, quantum_m=1e-3, quantum_s=1e-6):
+        self.maxsize = maxsize
+        self.max_disk_bytes = max_disk_bytes
+        self.quantum_m = quantum_m
+        self.quantum_s = quantum_s
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS lambert "
+                             "(key BLOB PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS lambert_last_used ON lambert (last_used)")
+            self._db.commit()
+
+    # --- Clés -----------------------------------------------------------------
+
+    def keys(self, r0, rf, tof, mu):
+        """Clés (bytes) des N problèmes (r0, rf en m, tof en s, mu en m³/s²)."""
+        r0 = np.atleast_2d(np.asarray(r0, dtype=float))
+        rf = np.atleast_2d(np.asarray(rf, dtype=float))
+        tof = np.atleast_1d(np.asarray(tof, dtype=float))
+        n = max(len(r0), len(rf), len(tof))
+        q = np.empty((n, 7), dtype=np.int64)
+        q[:, 0:3] = np.round(np.broadcast_to(r0, (n, 3)) / self.quantum_m)
+        q[:, 3:6] = np.round(np.broadcast_to(rf, (n, 3)) / self.quantum_m)
+        q[:, 6] = np.round(np.broadcast_to(tof, (n,)) / self.quantum_s)
+        mu = np.broadcast_to(np.asarray(mu, dtype=np.float64), (n,))
+        return [hashlib.blake2b(row.tobytes() + m.tobytes(), digest_size=16).digest()
+                for row, m in zip(q, mu)]
+
+    # --- Accès ----------------------------------------------------------------
+
+    def _get_many(self, keys):
+        """Retourne {index: (v0, vf)} pour les clés trouvées en mémoire ou sur disque."""
+        found = {}
+        disk_lookup = {}
+        for i, k in enumerate(keys):
+            value = self._memory.get(k)
+            if value is not None:
+                self._memory.move_to_end(k)
+                found[i] = value
+            elif self._db is not None:
+                disk_lookup.setdefault(k, []).append(i)
+
+        if disk_lookup:
+            now = time.time()
+            used = []
+            missing = list(disk_lookup)
+            # Une requête par paquet de clés (limite SQLite sur le nombre de paramètres)
+            for s in range(0, len(missing), SQL_BATCH):
+                batch = missing[s:s + SQL_BATCH]
+                rows = self._db.execute("SELECT key, value FROM lambert WHERE key IN "
+                                        f"({','.join('?' * len(batch))})", batch).fetchall()
+                for key, blob in rows:
+                    value = np.frombuffer(blob, dtype=np.float64).reshape(2, 3)
+                    value = (value[0], value[1])
+                    self._remember(key, value)
+                    for i in disk_lookup[key]:
+                        found[i] = value
+                    used.append((now, key))
+            if used:
+                self._db.executemany("UPDATE lambert SET last_used = ? WHERE key = ?", used)
+                self._db.commit()
+        return found
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _put_many(self, items):
+        for key, value in items:
+            self._remember(key, value)
+        if self._db is not None and items:
+            now = time.time()
+            self._db.executemany("INSERT OR REPLACE INTO lambert VALUES (?, ?, ?)",
+                                 [(k, np.concatenate(v).tobytes(), now) for k, v in items])
+            self._db.commit()
+            self._evict_disk()
+
+    def _disk_bytes(self):
+        page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def _evict_disk(self):
+        """Supprime les entrées les moins récemment utilisées tant que le cache disque dépasse sa taille."""
+        while self._disk_bytes() > self.max_disk_bytes:
+            n_rows = self._db.execute("SELECT COUNT(*) FROM lambert").fetchone()[0]
+            if n_rows == 0:
+                break
+            self._db.execute("DELETE FROM lambert WHERE key IN "
+                             "(SELECT key FROM lambert ORDER BY last_used LIMIT ?)", (max(1, n_rows // 10),))
+            self._db.commit()
+
+    # --- Résolution -----------------------------------------------------------
+
+    def _broadcast(self, r0, rf, tof, mu):
+        r0 = np.atleast_2d(np.asarray(r0, dtype=float))
+        rf = np.atleast_2d(np.asarray(rf, dtype=float))
+        tof = np.atleast_1d(np.asarray(tof, dtype=float))
+        n = max(len(r0), len(rf), len(tof))
+        mu = np.broadcast_to(np.asarray(mu, dtype=float), (n,))
+        return np.broadcast_to(r0, (n, 3)), np.broadcast_to(rf, (n, 3)), np.broadcast_to(tof, (n,)), mu
+
+    def lookup(self, r0, rf, tof, mu):
+        """
+        Cherche N problèmes dans le cache sans rien résoudre (tof en s).
+        Retourne v0, vf (N,3) (NaN pour les absents) et le masque des entrées trouvées.
+        """
+        r0, rf, tof, mu = self._broadcast(r0, rf, tof, mu)
+        n = len(tof)
+        found = self._get_many(self.keys(r0, rf, tof, mu))
+        v0 = np.full((n, 3), np.nan)
+        vf = np.full((n, 3), np.nan)
+        hit = np.zeros(n, dtype=bool)
+        for i, (a, b) in found.items():
+            v0[i], vf[i], hit[i] = a, b, True
+        self.hits += len(found)
+        self.misses += n - len(found)
+        return v0, vf, hit
+
+    def store(self, r0, rf, tof, mu, v0, vf, converged):
+        """Ajoute au cache les solutions convergées de N problèmes résolus ailleurs (tof en s)."""
+        r0, rf, tof, mu = self._broadcast(r0, rf, tof, mu)
+        ok = np.flatnonzero(converged)
+        keys = self.keys(r0[ok], rf[ok], tof[ok], mu[ok])
+        self._put_many([(k, (np.array(v0[i], dtype=float), np.array(vf[i], dtype=float))) for k, i in zip(keys, ok)])
+
+    def solve_batch(self, r0, rf, tof, mu):
+        """
+        Équivalent de `solve_lambert_batch` (tof en s) : seules les entrées absentes du cache
+        sont résolues, en un seul appel vectorisé.
+        """
+        r0, rf, tof, mu = self._broadcast(r0, rf, tof, mu)
+        v0, vf, converged = self.lookup(r0, rf, tof, mu)
+        miss = np.flatnonzero(~converged)
+        if len(miss):
+            v0_m, vf_m, ok_m = solve_lambert_batch(r0[miss], rf[miss], tof[miss], mu[miss])
+            v0[miss], vf[miss], converged[miss] = v0_m, vf_m, ok_m
+            self.store(r0[miss], rf[miss], tof[miss], mu[miss], v0_m, vf_m, ok_m)
+        return v0, vf, converged
+
+    def solve(self, r0, rf, tof_days, mu):
+        """Équivalent de `solve_lambert` (tof en jours), passant par le cache."""
+        v0, vf, converged = self.solve_batch(r0, rf, tof_days * 86400.0, mu)
+        if not converged[0]:
+            raise ValueError("Lambert n'a pas convergé (positions colinéaires ou temps de vol invalide).")
+        return v0[0], vf[0]
+
+    # --- Divers ---------------------------------------------------------------
+
+    def stats(self):
+        """Compteurs du cache : hits, misses, taux de hit, entrées en mémoire / sur disque."""
+        total = self.hits + self.misses
+        disk_entries = 0
+        if self._db is not None:
+            disk_entries = self._db.execute("SELECT COUNT(*) FROM lambert").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": disk_entries,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,322 @@
+"""
+lambert_core.py
+Cœur léger de LambertMaker (NumPy et bibliothèque standard uniquement) :
+constantes des corps, conversion éléments orbitaux → état, solveur de Lambert vectorisé,
+écriture des fichiers DOCKS et lecture des dates ISO8601.
+
+Aucune dépendance lourde (astropy, poliastro, scipy) n'est importée ici, pour que les
+scripts courts démarrent vite.
+"""
+import numpy as np
+from datetime import datetime
+
+from predefined_bodies import known_bodies
+
+
+def _perifocal_basis(inc_deg, Omega_deg, omega_deg):
+    """Vecteurs P (périapse) et Q (à 90° dans le plan) de la base périfocale, (N,3) chacun."""
+    inc, raan, argp = np.radians(inc_deg), np.radians(Omega_deg), np.radians(omega_deg)
+    cO, sO, cw, sw, ci, si = np.cos(raan), np.sin(raan), np.cos(argp), np.sin(argp), np.cos(inc), np.sin(inc)
+    P = np.stack([cO * cw - sO * sw * ci, sO * cw + cO * sw * ci, sw * si], axis=-1)
+    Q = np.stack([-cO * sw - sO * cw * ci, -sO * sw + cO * cw * ci, cw * si], axis=-1)
+    return P, Q
+
+
+def orbital_elements_to_rv(a_m, e, inc_deg, Omega_deg=0, omega_deg=0, nu_deg=0, mu=None):
+    """
+    Convertit des éléments orbitaux classiques en position (m) et vitesse (m/s), sans astropy.
+
+    Tous les arguments peuvent être des scalaires ou des tableaux (N,), diffusés entre eux.
+    Retourne r, v de forme (3,) pour des entrées scalaires, (N,3) sinon.
+    """
+    if mu is None:
+        raise ValueError("Le paramètre gravitationnel du corps central doit être fourni via `mu`.")
+    a, e, inc, raan, argp, nu = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in
+                                                      (a_m, e, inc_deg, Omega_deg, omega_deg, nu_deg)))
+    P, Q = _perifocal_basis(inc, raan, argp)
+    nu = np.radians(nu)
+    cnu, snu = np.cos(nu)[..., None], np.sin(nu)[..., None]
+    p = (a * (1 - e**2))[..., None]
+    r_norm = p / (1 + e[..., None] * cnu)
+    r = r_norm * (cnu * P + snu * Q)
+    v = np.sqrt(mu / p) * (-snu * P + (e[..., None] + cnu) * Q)
+    return r, v
+
+
+def orbital_elements_to_r(a_m, e, inc_deg, Omega_deg=0, omega_deg=0, nu_deg=0):
+    """
+    Convertit des éléments orbitaux en position 3D (m), sans astropy (la position ne dépend pas de mu).
+
+    Mêmes conventions de forme que `orbital_elements_to_rv`.
+    """
+    return orbital_elements_to_rv(a_m, e, inc_deg, Omega_deg, omega_deg, nu_deg, mu=1.0)[0]
+
+
+def non_collinear_mask(r_ref, r_candidates, tol=1e-6):
+    """Masque (N,) des positions candidates (N,3) non colinéaires avec r_ref (|r_ref × r| > tol)."""
+    return np.linalg.norm(np.cross(r_ref, r_candidates), axis=-1) > tol
+
+
+def _markley_starter(M, e):
+    """Estimation initiale de Markley (1995) pour E, avec M dans [0, π] et 0 <= e < 1."""
+    pi2 = np.pi**2
+    alpha = (3 * pi2 + 1.6 * np.pi * (np.pi - M) / (1 + e)) / (pi2 - 6)
+    d = 3 * (1 - e) + alpha * e
+    q = 2 * alpha * d * (1 - e) - M**2
+    r = 3 * alpha * d * (d - 1 + e) * M + M**3
+    w = (np.abs(r) + np.sqrt(q**3 + r**2)) ** (2 / 3)
+    return (2 * r * w / (w**2 + w * q + q**2) + M) / d
+
+
+def solve_kepler(M, e, tol=1e-14, max_iter=50):
+    """
+    Résout l'équation de Kepler élément par élément (tableaux M en rad et e diffusés entre eux).
+
+    - e < 1 : M = E - e sin E, retourne l'anomalie excentrique E (même tour que M) ;
+    - e > 1 : M = e sinh F - F, retourne l'anomalie hyperbolique F.
+    Démarrage de Markley (elliptique) ou logarithmique (hyperbolique), puis itérations de Halley
+    avec un masque de convergence par élément. Les cas paraboliques (e = 1) et invalides valent NaN.
+
+    Retourne (E ou F, masque de convergence).
+    """
+    M, e = np.broadcast_arrays(np.asarray(M, dtype=float), np.asarray(e, dtype=float))
+    shape = M.shape
+    M = M.ravel()
+    e = e.ravel()
+    ell = (e >= 0) & (e < 1) & np.isfinite(M)
+    hyp = (e > 1) & np.isfinite(M)
+
+    x = np.full(M.shape, np.nan)
+    # Elliptique : réduction à [-π, π], symétrie E(-M) = -E(M)
+    M_red = np.where(ell, np.remainder(M + np.pi, 2 * np.pi) - np.pi, 0.0)
+    turns = M - M_red
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x[ell] = np.sign(M_red[ell]) * _markley_starter(np.abs(M_red[ell]), e[ell])
+        x[hyp] = np.sign(M[hyp]) * np.log(2 * np.abs(M[hyp]) / e[hyp] + 1.8)
+
+    converged = np.zeros(M.shape, dtype=bool)
+    active = ell | hyp
+    target = np.where(ell, M_red, M)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        xa, ea, Ma, is_ell = x[idx], e[idx], target[idx], ell[idx]
+        s = np.where(is_ell, np.sin(xa), np.sinh(xa))
+        c = np.where(is_ell, np.cos(xa), np.cosh(xa))
+        f = np.where(is_ell, xa - ea * s - Ma, ea * s - xa - Ma)
+        fp = np.where(is_ell, 1 - ea * c, ea * c - 1)
+        fpp = ea * s
+        delta = 2 * f * fp / (2 * fp**2 - f * fpp)
+        x[idx] = xa - delta
+        done = np.abs(delta) <= tol * np.maximum(1.0, np.abs(xa))
+        converged[idx[done]] = True
+        active[idx[done | ~np.isfinite(delta)]] = False
+
+    x = np.where(ell, x + turns, x)
+    return x.reshape(shape), converged.reshape(shape)
+
+
+def mean_to_true_anomaly_rad(M, e):
+    """
+    Anomalie moyenne → anomalie vraie (rad), vectorisée, pour orbites elliptiques et hyperboliques.
+
+    Retourne (nu dans ]-π, π], masque de convergence).
+    """
+    x, converged = solve_kepler(M, e)
+    e = np.asarray(e, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        nu_ell = 2 * np.arctan2(np.sqrt(1 + e) * np.sin(x / 2), np.sqrt(np.abs(1 - e)) * np.cos(x / 2))
+        nu_hyp = 2 * np.arctan(np.sqrt((e + 1) / np.abs(e - 1)) * np.tanh(x / 2))
+    return np.where(e < 1, nu_ell, nu_hyp), converged
+
+
+def _hyp2f1b(x):
+    """Série hypergéométrique 2F1(3, 1, 5/2, x) évaluée élément par élément (|x| < 1)."""
+    res = np.ones_like(x)
+    term = np.ones_like(x)
+    for ii in range(200):
+        term = term * (3 + ii) * (1 + ii) / (2.5 + ii) * x / (ii + 1)
+        res_new = res + term
+        if np.array_equal(res_new, res):
+            break
+        res = res_new
+    return res
+
+
+def _compute_y(x, ll):
+    return np.sqrt(1 - ll**2 * (1 - x**2))
+
+
+def _compute_psi(x, y, ll):
+    """Angle auxiliaire psi (elliptique, hyperbolique ou parabolique) pour chaque élément."""
+    psi = np.zeros_like(x)
+    ell = (x >= -1) & (x < 1)
+    hyp = x > 1
+    psi[ell] = np.arccos(np.clip(x[ell] * y[ell] + ll[ell] * (1 - x[ell]**2), -1.0, 1.0))
+    psi[hyp] = np.arcsinh((y[hyp] - x[hyp] * ll[hyp]) * np.sqrt(x[hyp]**2 - 1))
+    return psi
+
+
+def _tof_equation_y(x, y, T0, ll):
+    """Équation du temps de vol d'Izzo (une révolution), vectorisée."""
+    T_ = np.empty_like(x)
+    # Près de x = 1 on utilise la série hypergéométrique (évite l'annulation de 1 - x²)
+    near = (x > np.sqrt(0.6)) & (x < np.sqrt(1.4))
+    if near.any():
+        eta = y[near] - ll[near] * x[near]
+        S_1 = (1 - ll[near] - x[near] * eta) * 0.5
+        Q = 4 / 3 * _hyp2f1b(S_1)
+        T_[near] = (eta**3 * Q + 4 * ll[near] * eta) * 0.5
+    far = ~near
+    if far.any():
+        xf, yf, llf = x[far], y[far], ll[far]
+        psi = _compute_psi(xf, yf, llf)
+        T_[far] = (psi / np.sqrt(np.abs(1 - xf**2)) - xf + llf * yf) / (1 - xf**2)
+    return T_ - T0
+
+
+def _initial_guess(T, ll):
+    """Estimation initiale de x (Izzo, éq. 19-21) pour le cas sans révolution complète."""
+    T_0 = np.arccos(ll) + ll * np.sqrt(1 - ll**2)
+    T_1 = 2 * (1 - ll**3) / 3
+    x_0 = (T_0 / T) ** (np.log2(T_1 / T_0)) - 1
+    long_tof = T >= T_0
+    short_tof = T < T_1
+    x_0 = np.where(long_tof, (T_0 / T) ** (2 / 3) - 1, x_0)
+    x_0 = np.where(short_tof & ~long_tof, 5 / 2 * T_1 / T * (T_1 - T) / (1 - ll**5) + 1, x_0)
+    return x_0
+
+
+def _householder(x0, T0, ll, rtol, numiter):
+    """Itérations de Householder (ordre 3) sur tous les éléments encore actifs."""
+    x = x0.copy()
+    converged = np.zeros(x.shape, dtype=bool)
+    active = np.isfinite(x)
+    for _ in range(numiter):
+        if not active.any():
+            break
+        p0, l_, t0 = x[active], ll[active], T0[active]
+        y = _compute_y(p0, l_)
+        fval = _tof_equation_y(p0, y, t0, l_)
+        T = fval + t0
+        one_m_x2 = 1 - p0**2
+        fder = (3 * T * p0 - 2 + 2 * l_**3 * p0 / y) / one_m_x2
+        fder2 = (3 * T + 5 * p0 * fder + 2 * (1 - l_**2) * l_**3 / y**3) / one_m_x2
+        fder3 = (7 * p0 * fder2 + 8 * fder - 6 * (1 - l_**2) * l_**5 * p0 / y**5) / one_m_x2
+        p = p0 - fval * ((fder**2 - fval * fder2 / 2)
+                         / (fder * (fder**2 - fval * fder2) + fder3 * fval**2 / 6))
+        done = np.abs(p - p0) < rtol
+        idx = np.flatnonzero(active)
+        x[idx] = p
+        converged[idx[done]] = True
+        active[idx[done | ~np.isfinite(p)]] = False
+    return x, converged
+
+
+def solve_lambert_batch(r0, rf, tof, mu, numiter=35, rtol=1e-8, x0=None, return_x=False):
+    """
+    Résout N problèmes de Lambert (0 révolution, méthode d'Izzo) en une seule passe vectorisée.
+
+    r0, rf : positions (N,3) en m
+    tof    : temps de vol (N,) en s
+    mu     : paramètre gravitationnel (m³/s²), scalaire ou (N,)
+
+    Retourne v0, vf (N,3) en m/s et un masque de convergence (N,).
+    Les lignes non convergées (positions colinéaires, tof <= 0, ...) valent NaN.
+
+    x0 : variable d'Izzo (N,) d'une solution voisine pour démarrer à chaud
+         (les valeurs NaN retombent sur l'estimation initiale d'Izzo)
+    return_x : si True, retourne aussi la variable x convergée (pour le démarrage à chaud suivant)
+    """
+    r0 = np.atleast_2d(np.asarray(r0, dtype=float))
+    rf = np.atleast_2d(np.asarray(rf, dtype=float))
+    tof = np.atleast_1d(np.asarray(tof, dtype=float))
+    n = max(len(r0), len(rf), len(tof))
+    r0 = np.broadcast_to(r0, (n, 3))
+    rf = np.broadcast_to(rf, (n, 3))
+    tof = np.broadcast_to(tof, (n,))
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), (n,))
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        # Corde et demi-périmètre
+        c = rf - r0
+        c_norm = np.linalg.norm(c, axis=1)
+        r0_norm = np.linalg.norm(r0, axis=1)
+        rf_norm = np.linalg.norm(rf, axis=1)
+        s = (r0_norm + rf_norm + c_norm) * 0.5
+
+        # Vecteurs unitaires
+        i_r0 = r0 / r0_norm[:, None]
+        i_rf = rf / rf_norm[:, None]
+        i_h = np.cross(i_r0, i_rf)
+        h_norm = np.linalg.norm(i_h, axis=1)
+        valid = (h_norm > 0) & (tof > 0) & (mu > 0)
+        i_h = i_h / h_norm[:, None]
+
+        # Géométrie du problème (sens prograde par rapport à +z, comme poliastro)
+        ll = np.sqrt(1 - np.minimum(1.0, c_norm / s))
+        retro = i_h[:, 2] < 0
+        ll = np.where(retro, -ll, ll)
+        i_h = np.where(retro[:, None], -i_h, i_h)
+        i_t0 = np.cross(i_h, i_r0)
+        i_tf = np.cross(i_h, i_rf)
+
+        # Temps de vol adimensionnel puis résolution en x
+        T = np.sqrt(2 * mu / s**3) * tof
+        x_guess = _initial_guess(T, ll)
+        if x0 is not None:
+            x0 = np.broadcast_to(np.asarray(x0, dtype=float), (n,))
+            x_guess = np.where(np.isfinite(x0), x0, x_guess)
+        x, converged = _householder(np.where(valid, x_guess, np.nan), T, ll, rtol, numiter)
+        y = _compute_y(x, ll)
+
+        # Reconstruction des vitesses
+        gamma = np.sqrt(mu * s / 2)
+        rho = (r0_norm - rf_norm) / c_norm
+        sigma = np.sqrt(1 - rho**2)
+        V_r0 = gamma * ((ll * y - x) - rho * (ll * y + x)) / r0_norm
+        V_rf = -gamma * ((ll * y - x) + rho * (ll * y + x)) / rf_norm
+        V_t0 = gamma * sigma * (y + ll * x) / r0_norm
+        V_tf = gamma * sigma * (y + ll * x) / rf_norm
+        v0 = V_r0[:, None] * i_r0 + V_t0[:, None] * i_t0
+        vf = V_rf[:, None] * i_rf + V_tf[:, None] * i_tf
+
+    converged &= valid & np.all(np.isfinite(v0), axis=1) & np.all(np.isfinite(vf), axis=1)
+    v0[~converged] = np.nan
+    vf[~converged] = np.nan
+    if return_x:
+        return v0, vf, converged, np.where(converged, x, np.nan)
+    return v0, vf, converged
+
+
+def solve_lambert(r0, rf, tof_days, mu, cache=None):
+    """
+    Résout Lambert et retourne les vecteurs vitesse initiale et finale (m/s)
+
+    cache : LambertCache optionnel (lambert_cache.py) consulté avant de résoudre
+    """
+    solve = solve_lambert_batch if cache is None else cache.solve_batch
+    v0, vf, converged = solve(r0, rf, tof_days * 86400.0, mu)
+    if not converged[0]:
+        raise ValueError("Lambert n'a pas convergé (positions colinéaires ou temps de vol invalide).")
+    return v0[0], vf[0]
+
+def format_docks_line(date_str, r, v):
+    """Ligne de conditions initiales DOCKS (date, r en km, v en km/s) à partir de r (m) et v (m/s)"""
+    r_km = r / 1000
+    v_kms = v / 1000
+    return f"{date_str}\t" + "\t".join(f"{x:.15e}" for x in r_km) + "\t" + "\t".join(f"{x:.15e}" for x in v_kms)
+
+def write_docks_file(filename, date_str, r, v):
+    """
+    Écrit un fichier de conditions initiales compatible DOCKS
+    """
+    line = format_docks_line(date_str, r, v)
+    with open(filename, "w") as f:
+        f.write(line)
+    print(f"✅ Fichier DOCKS généré : {filename}")
+
+def parse_isot(date_str):
+    """Conversion ISO8601 → datetime"""
+    return datetime.fromisoformat(date_str)
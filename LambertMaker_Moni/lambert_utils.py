@@ -1,9 +1,32 @@
+"""
+lambert_utils.py
+Point d'entrée historique de LambertMaker : ré-exporte le cœur léger (`lambert_core`)
+et ajoute les fonctions qui s'appuient sur astropy/poliastro, importés seulement au premier usage.
+"""
+import os
+import sys
+
 import numpy as np
-from datetime import datetime
-from astropy import units as u
-from astropy.time import Time
-from poliastro.twobody import Orbit
-from poliastro.iod.izzo import lambert
+
+# lazy_import est partagé par tous les outils (dossier common/ à la racine du dépôt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "common")))
+
+from lazy_import import lazy_import
+from lambert_core import (
+    known_bodies,
+    orbital_elements_to_rv,
+    orbital_elements_to_r,
+    non_collinear_mask,
+    solve_lambert_batch,
+    solve_lambert,
+    format_docks_line,
+    write_docks_file,
+    parse_isot,
+)
+
+u = lazy_import("astropy.units")
+astropy_time = lazy_import("astropy.time")
+poliastro_twobody = lazy_import("poliastro.twobody")
 
 def orbital_elements_to_r_poliastro(a_m, e, inc_deg, Omega_deg=0, omega_deg=0, nu_deg=0, attractor=None):
     """
@@ -19,44 +42,16 @@ def orbital_elements_to_r_poliastro(a_m, e, inc_deg, Omega_deg=0, omega_deg=0, n
     argp = omega_deg * u.deg
     nu = nu_deg * u.deg
 
-    epoch = Time("2000-01-01 12:00:00", scale="tdb")
-    orb = Orbit.from_classical(attractor, a, ecc, inc, raan, argp, nu, epoch)
+    epoch = astropy_time.Time("2000-01-01 12:00:00", scale="tdb")
+    orb = poliastro_twobody.Orbit.from_classical(attractor, a, ecc, inc, raan, argp, nu, epoch)
     r_vec = orb.r.to_value(u.m)
 
-    # Eviter positions collinéaires (y=z≈0)
+    # Eviter positions collinéaires (y=z≈0) : tous les candidats en une passe
     if np.allclose(r_vec[1:], 0.0, atol=1e-12):
-        nu_candidates = [10, 30, 45, 60, 90]
-        for nu_try in nu_candidates:
-            orb_try = Orbit.from_classical(attractor, a, ecc, inc, raan, argp, nu_try * u.deg, epoch)
-            r_try = orb_try.r.to_value(u.m)
-            if not np.allclose(r_try[1:], 0.0, atol=1e-12):
-                r_vec = r_try
-                break
+        nu_candidates = np.array([10, 30, 45, 60, 90])
+        r_try = orbital_elements_to_r(a_m, e, inc_deg, Omega_deg, omega_deg, nu_candidates)
+        ok = ~np.all(np.isclose(r_try[:, 1:], 0.0, atol=1e-12), axis=1)
+        if ok.any():
+            r_vec = r_try[np.argmax(ok)]
 
     return r_vec
-
-def solve_lambert(r0, rf, tof_days, mu):
-    """
-    Résout Lambert et retourne les vecteurs vitesse initiale et finale (m/s)
-    """
-    r0_q = r0 * u.m
-    rf_q = rf * u.m
-    tof_q = tof_days * u.day
-    lambert_gen = lambert(mu * u.m**3 / u.s**2, r0_q, rf_q, tof_q)
-    v0_q, vf_q = next(lambert_gen)
-    return v0_q.to(u.m/u.s).value, vf_q.to(u.m/u.s).value
-
-def write_docks_file(filename, date_str, r, v):
-    """
-    Écrit un fichier de conditions initiales compatible DOCKS
-    """
-    r_km = r / 1000
-    v_kms = v / 1000
-    line = f"{date_str}\t" + "\t".join(f"{x:.15e}" for x in r_km) + "\t" + "\t".join(f"{x:.15e}" for x in v_kms)
-    with open(filename, "w") as f:
-        f.write(line)
-    print(f"✅ Fichier DOCKS généré : {filename}")
-
-def parse_isot(date_str):
-    """Conversion ISO8601 → datetime"""
-    return datetime.fromisoformat(date_str)
@@ -1,16 +1,8 @@
-from lambert_utils import orbital_elements_to_r_poliastro, solve_lambert, write_docks_file, parse_isot
+from lambert_utils import orbital_elements_to_r, non_collinear_mask, solve_lambert, write_docks_file, parse_isot
 from predefined_bodies import known_bodies
-from poliastro.bodies import Sun, Mercury, Venus, Earth, Moon, Mars, Jupiter, Saturn, Uranus, Neptune
 from datetime import timedelta
 import numpy as np
 
-# Mapping nom -> objet poliastro
-body_dict = {
-    "sun": Sun, "mercury": Mercury, "venus": Venus, "earth": Earth,
-    "moon": Moon, "mars": Mars, "jupiter": Jupiter, "saturn": Saturn,
-    "uranus": Uranus, "neptune": Neptune
-}
-
 print("\n=== LambertMakerSimple (modulaire) ===\n")
 
 # 1. Date initiale
@@ -25,7 +17,6 @@ for i, b in enumerate(bodies_names):
 body_index = int(input("Choose a body by its number : "))
 body_selected = bodies_names[body_index]
 mu = known_bodies[body_selected][0]
-attractor = body_dict[body_selected]
 print(f"Body selected: {body_selected}\n")
 
 # 3. Paramètres orbitaux pour les deux points
@@ -40,20 +31,16 @@ e2 = float(input("Excentricité e2 : "))
 inc2 = float(input("Inclinaison i2 (°) : "))
 
 # 4. Calcul des positions r1 et r2
-r1 = orbital_elements_to_r_poliastro(a1, e1, inc1, attractor=attractor)
-
-# Ajustement de l'anomalie vraie pour éviter colinéarité
-nu_candidates_deg = [0, 10, 30, 45, 90, 135, 180]
-r2 = None
-for nu_try in nu_candidates_deg:
-    r2_try = orbital_elements_to_r_poliastro(a2, e2, inc2, nu_deg=nu_try, attractor=attractor)
-    if np.linalg.norm(np.cross(r1, r2_try)) > 1e-6:
-        r2 = r2_try
-        if nu_try != 0:
-            print(f"Note: adjusted true anomaly for point 2 to {nu_try}° to avoid collinear positions.")
-        break
-if r2 is None:
-    r2 = orbital_elements_to_r_poliastro(a2, e2, inc2, nu_deg=nu_candidates_deg[-1], attractor=attractor)
+r1 = orbital_elements_to_r(a1, e1, inc1)
+
+# Ajustement de l'anomalie vraie pour éviter colinéarité : tous les candidats en une passe
+nu_candidates_deg = np.array([0, 10, 30, 45, 90, 135, 180])
+r2_candidates = orbital_elements_to_r(a2, e2, inc2, nu_deg=nu_candidates_deg)
+ok = non_collinear_mask(r1, r2_candidates)
+k = np.argmax(ok) if ok.any() else len(nu_candidates_deg) - 1
+r2 = r2_candidates[k]
+if ok.any() and k != 0:
+    print(f"Note: adjusted true anomaly for point 2 to {nu_candidates_deg[k]}° to avoid collinear positions.")
 
 print("\nr1 (m) =", r1)
 print("r2 (m) =", r2)
@@ -0,0 +1,208 @@
+"""
+porkchop.py
+Grille porkchop : résout Lambert pour chaque couple (date de départ, date d'arrivée)
+entre deux corps héliocentriques et stocke C3, v∞ et Δv total dans des tableaux NumPy.
+
+La grille est découpée en tuiles résolues sur un pool de processus. Dans une tuile,
+on balaie les dates d'arrivée colonne par colonne et chaque colonne démarre à chaud
+à partir de la solution de la colonne voisine (même date de départ).
+
+Avec un LambertCache, les cellules déjà résolues lors d'un balayage précédent sont relues
+en une passe avant le calcul : seules les tuiles contenant des cellules absentes du cache
+sont envoyées au pool.
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+
+import numpy as np
+
+# lazy_import est partagé par tous les outils (dossier common/ à la racine du dépôt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "common")))
+
+from lazy_import import lazy_import
+from lambert_cache import LambertCache
+from lambert_core import solve_lambert_batch, parse_isot
+from predefined_bodies import known_bodies
+
+u = lazy_import("astropy.units")
+astropy_time = lazy_import("astropy.time")
+astropy_coordinates = lazy_import("astropy.coordinates")
+
+J2000 = datetime(2000, 1, 1, 12, 0, 0)
+
+
+def isot_to_jd(date_str):
+    """Date ISO8601 (TDB) → jour julien"""
+    return 2451545.0 + (parse_isot(date_str) - J2000).total_seconds() / 86400.0
+
+
+def body_ephemeris(body, epochs_jd):
+    """
+    Positions (N,3) en m et vitesses (N,3) en m/s héliocentriques d'un corps
+    aux dates `epochs_jd` (jours juliens TDB), via l'éphéméride intégrée d'astropy.
+    """
+    t = astropy_time.Time(np.asarray(epochs_jd, dtype=float), format="jd", scale="tdb")
+    r, v = astropy_coordinates.get_body_barycentric_posvel(body, t, ephemeris="builtin")
+    r_sun, v_sun = astropy_coordinates.get_body_barycentric_posvel("sun", t, ephemeris="builtin")
+    return (r - r_sun).xyz.to_value(u.m).T, (v - v_sun).xyz.to_value(u.m / u.s).T
+
+
+def _solve_tile(task):
+    """Résout une tuile (départs × arrivées) en démarrant chaque colonne à chaud sur la précédente."""
+    i0, j0, t_dep, r_dep, v_dep, t_arr, r_arr, v_arr, mu, keep_v = task
+    shape = (len(t_dep), len(t_arr))
+    vinf_dep = np.full(shape, np.nan)
+    vinf_arr = np.full(shape, np.nan)
+    converged = np.zeros(shape, dtype=bool)
+    v0_tile = np.full(shape + (3,), np.nan) if keep_v else None
+    vf_tile = np.full(shape + (3,), np.nan) if keep_v else None
+
+    x_prev = None
+    for j in range(len(t_arr)):
+        tof = (t_arr[j] - t_dep) * 86400.0
+        v0, vf, ok, x_prev = solve_lambert_batch(r_dep, r_arr[j], tof, mu, x0=x_prev, return_x=True)
+        vinf_dep[:, j] = np.linalg.norm(v0 - v_dep, axis=1)
+        vinf_arr[:, j] = np.linalg.norm(vf - v_arr[j], axis=1)
+        converged[:, j] = ok
+        if keep_v:
+            v0_tile[:, j], vf_tile[:, j] = v0, vf
+    return i0, j0, vinf_dep, vinf_arr, converged, v0_tile, vf_tile
+
+
+def porkchop_grid(dep_jd, r_dep, v_dep, arr_jd, r_arr, v_arr, mu, tile=250, workers=None, cache=None):
+    """
+    Calcule une grille porkchop à partir des états des deux corps aux dates de la grille.
+
+    dep_jd, arr_jd : dates de départ (n_dep,) et d'arrivée (n_arr,) en jours juliens
+    r_dep, v_dep   : états du corps de départ (n_dep,3) en m et m/s
+    r_arr, v_arr   : états du corps d'arrivée (n_arr,3) en m et m/s
+    mu             : paramètre gravitationnel du corps central (m³/s²)
+    tile           : taille des tuiles (en cellules par côté)
+    workers        : nombre de processus (None = tous les cœurs, 1 = exécution locale)
+    cache          : LambertCache optionnel (lambert_cache.py) ; les cellules trouvées ne sont pas
+                     recalculées et les nouvelles solutions y sont ajoutées
+
+    Retourne un dictionnaire de tableaux (n_dep, n_arr) :
+    c3 (m²/s²), vinf_dep et vinf_arr (m/s), dv_total = vinf_dep + vinf_arr (m/s), converged.
+    Les cellules non résolues (arrivée avant le départ, non convergence) valent NaN.
+    """
+    dep_jd = np.asarray(dep_jd, dtype=float)
+    arr_jd = np.asarray(arr_jd, dtype=float)
+    n_dep, n_arr = len(dep_jd), len(arr_jd)
+
+    vinf_dep = np.full((n_dep, n_arr), np.nan)
+    vinf_arr = np.full((n_dep, n_arr), np.nan)
+    converged = np.zeros((n_dep, n_arr), dtype=bool)
+    # Cellules sans calcul à faire : trouvées dans le cache, ou arrivée avant le départ
+    known = np.zeros((n_dep, n_arr), dtype=bool)
+
+    if cache is not None:
+        i, j = np.indices((n_dep, n_arr)).reshape(2, -1)
+        tof = (arr_jd[j] - dep_jd[i]) * 86400.0
+        v0, vf, hit = cache.lookup(r_dep[i], r_arr[j], tof, mu)
+        vinf_dep[i[hit], j[hit]] = np.linalg.norm(v0[hit] - v_dep[i[hit]], axis=1)
+        vinf_arr[i[hit], j[hit]] = np.linalg.norm(vf[hit] - v_arr[j[hit]], axis=1)
+        converged[i[hit], j[hit]] = True
+        known = (hit | (tof <= 0.0)).reshape(n_dep, n_arr)
+
+    tasks = []
+    for i0 in range(0, n_dep, tile):
+        for j0 in range(0, n_arr, tile):
+            i1, j1 = min(i0 + tile, n_dep), min(j0 + tile, n_arr)
+            if known[i0:i1, j0:j1].all():
+                continue
+            tasks.append((i0, j0, dep_jd[i0:i1], r_dep[i0:i1], v_dep[i0:i1],
+                          arr_jd[j0:j1], r_arr[j0:j1], v_arr[j0:j1], mu, cache is not None))
+
+    store = None
+    if cache is not None:
+        def store(i, j, v0, vf):
+            tof = (arr_jd[j] - dep_jd[i]) * 86400.0
+            cache.store(r_dep[i], r_arr[j], tof, mu, v0, vf, np.ones(len(i), dtype=bool))
+
+    if workers == 1:
+        _fill_grid(map(_solve_tile, tasks), vinf_dep, vinf_arr, converged, known, store)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            _fill_grid(pool.map(_solve_tile, tasks), vinf_dep, vinf_arr, converged, known, store)
+
+    return {
+        "dep_jd": dep_jd,
+        "arr_jd": arr_jd,
+        "c3": vinf_dep**2,
+        "vinf_dep": vinf_dep,
+        "vinf_arr": vinf_arr,
+        "dv_total": vinf_dep + vinf_arr,
+        "converged": converged,
+    }
+
+
+def _fill_grid(results, vinf_dep, vinf_arr, converged, known, store=None):
+    for i0, j0, vd, va, ok, v0, vf in results:
+        ni, nj = ok.shape
+        # Les cellules déjà connues (cache) gardent leur valeur
+        new = ~known[i0:i0 + ni, j0:j0 + nj]
+        vinf_dep[i0:i0 + ni, j0:j0 + nj][new] = vd[new]
+        vinf_arr[i0:i0 + ni, j0:j0 + nj][new] = va[new]
+        converged[i0:i0 + ni, j0:j0 + nj][new] = ok[new]
+        if store is not None:
+            i, j = np.nonzero(new & ok)
+            store(i0 + i, j0 + j, v0[i, j], vf[i, j])
+
+
+def porkchop(dep_body, arr_body, dep_start, dep_days, arr_start, arr_days,
+             n_dep=200, n_arr=200, tile=250, workers=None, cache=None):
+    """
+    Grille porkchop entre deux corps du système solaire (transfert héliocentrique).
+
+    dep_start, arr_start : début des fenêtres de départ et d'arrivée (ISO8601, TDB)
+    dep_days, arr_days   : largeur des fenêtres (jours)
+    """
+    dep_jd = isot_to_jd(dep_start) + np.linspace(0.0, dep_days, n_dep)
+    arr_jd = isot_to_jd(arr_start) + np.linspace(0.0, arr_days, n_arr)
+    r_dep, v_dep = body_ephemeris(dep_body, dep_jd)
+    r_arr, v_arr = body_ephemeris(arr_body, arr_jd)
+    mu_sun = known_bodies["sun"][0]
+    return porkchop_grid(dep_jd, r_dep, v_dep, arr_jd, r_arr, v_arr, mu_sun, tile=tile, workers=workers, cache=cache)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grille porkchop (C3, v∞, Δv) entre deux corps")
+    parser.add_argument("--dep", default="earth", help="Corps de départ (défaut: earth)")
+    parser.add_argument("--arr", default="mars", help="Corps d'arrivée (défaut: mars)")
+    parser.add_argument("--dep-start", default="2026-09-01T00:00:00", help="Début de la fenêtre de départ (ISOT)")
+    parser.add_argument("--dep-days", type=float, default=180.0, help="Largeur de la fenêtre de départ (jours)")
+    parser.add_argument("--arr-start", default="2027-06-01T00:00:00", help="Début de la fenêtre d'arrivée (ISOT)")
+    parser.add_argument("--arr-days", type=float, default=360.0, help="Largeur de la fenêtre d'arrivée (jours)")
+    parser.add_argument("--n-dep", type=int, default=200, help="Nombre de dates de départ")
+    parser.add_argument("--n-arr", type=int, default=200, help="Nombre de dates d'arrivée")
+    parser.add_argument("--tile", type=int, default=250, help="Taille des tuiles (cellules par côté)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut: tous les cœurs)")
+    parser.add_argument("--cache", default=None,
+                        help="Fichier SQLite du cache de Lambert (réutilisé d'un balayage à l'autre)")
+    parser.add_argument("-o", "--output", default="porkchop.npz", help="Fichier .npz de sortie")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        cache = stack.enter_context(LambertCache(path=args.cache)) if args.cache else None
+        grid = porkchop(args.dep, args.arr, args.dep_start, args.dep_days, args.arr_start, args.arr_days,
+                        n_dep=args.n_dep, n_arr=args.n_arr, tile=args.tile, workers=args.workers, cache=cache)
+        if cache is not None:
+            stats = cache.stats()
+            print(f"Cache de Lambert : {stats['hits']} hit(s), {stats['misses']} miss(es)")
+    np.savez(args.output, **grid)
+
+    c3 = np.where(grid["converged"], grid["c3"], np.inf)
+    i, j = np.unravel_index(np.argmin(c3), c3.shape)
+    print(f"C3 minimal : {c3[i, j] / 1e6:.3f} km²/s² "
+          f"(départ JD {grid['dep_jd'][i]:.2f}, arrivée JD {grid['arr_jd'][j]:.2f})")
+    print(f"✅ Grille porkchop {args.n_dep}×{args.n_arr} générée : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import os
+from batch_lambert import DEFAULT_CSV, run_batch
+
+MU_EARTH = 3.98659293629478e14  # m^3/s^2
+OFFSET = [1e5, 0.0, 0.0]
+
+
+def test_run_batch_same_output_for_any_worker_count(tmp_path):
+    serial = tmp_path / "serial.txt"
+    pooled = tmp_path / "pooled.txt"
+
+    written, skipped = run_batch(DEFAULT_CSV, str(serial), MU_EARTH, 7200.0, OFFSET, start=5, stop=45, workers=1)
+    run_batch(DEFAULT_CSV, str(pooled), MU_EARTH, 7200.0, OFFSET, start=5, stop=45, chunk_size=6, workers=2)
+
+    assert (written, skipped) == (40, 0)
+    assert serial.read_text() == pooled.read_text()
+    assert len(serial.read_text().splitlines()) == 40
+
+
+def test_run_batch_split_writes_one_file_per_row(tmp_path):
+    run_batch(DEFAULT_CSV, str(tmp_path / "out"), MU_EARTH, 7200.0, OFFSET, stop=3, workers=1, split=True)
+
+    assert sorted(os.listdir(tmp_path / "out")) == [f"InitCond_Lambert_{i}.txt" for i in range(3)]
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "convert_tle_params")))
+
+pytest.importorskip("sgp4.api")
+
+from tle_to_orbital_params import parse_tle_catalog
+from sgp4_propagation import propagate_catalog
+from conjunction import screen_conjunctions, shell_overlap_mask
+
+TLE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "convert_tle_params", "tle.txt"))
+
+
+def synthetic_catalog(n, seed=1):
+    """n copies du dernier TLE du fichier, plans et phases tirés au hasard."""
+    rng = np.random.default_rng(seed)
+    catalog = np.repeat(parse_tle_catalog(TLE_FILE)[-1:], n)
+    catalog["satnum"] = np.arange(n) + 1
+    catalog["raan_deg"] = rng.uniform(0, 360, n)
+    catalog["mean_anom_deg"] = rng.uniform(0, 360, n)
+    catalog["inc_deg"] = rng.uniform(50, 110, n)
+    catalog["mean_motion_rev_per_day"] *= rng.uniform(0.97, 1.03, n)
+    return catalog
+
+
+def test_screen_conjunctions_matches_brute_force():
+    catalog = synthetic_catalog(30)
+    start = np.datetime64("2025-09-06T00:00")
+    threshold = 300e3
+
+    events = screen_conjunctions(catalog, start, 3600.0, step_s=60.0, threshold_m=threshold)
+
+    # Référence : toutes les paires, échantillonnage à 1 s, minima locaux sous le seuil
+    times = start + np.arange(0, 3601).astype("timedelta64[s]")
+    states, _ = propagate_catalog(catalog, times)
+    i, j = np.triu_indices(len(catalog), 1)
+    d = np.linalg.norm(states[j, :, :3] - states[i, :, :3], axis=2)
+    local_min = (d[:, 1:-1] < d[:, :-2]) & (d[:, 1:-1] <= d[:, 2:]) & (d[:, 1:-1] < threshold)
+    pair, k = np.nonzero(local_min)
+
+    assert len(events) == len(pair) > 0
+    for p, kk in zip(pair, k + 1):
+        ev = events[(events["index_1"] == i[p]) & (events["index_2"] == j[p])]
+        dt = np.abs((ev["tca"] - times[kk]) / np.timedelta64(1, "s"))
+        best = ev[np.argmin(dt)]
+        assert dt.min() <= 1.0
+        # Le minimum raffiné est sous l'échantillon à 1 s, à l'erreur d'échantillonnage près
+        assert best["miss_m"] <= d[p, kk] + 1.0
+        assert d[p, kk] - best["miss_m"] < (best["vrel_m_s"] * 0.5) ** 2 / (2 * best["miss_m"]) + 1.0
+
+
+def test_shell_overlap_mask():
+    perigee = np.array([7000e3, 7100e3, 8000e3, 7050e3, 9000e3])
+    apogee = np.array([7020e3, 7200e3, 8010e3, 7060e3, 9500e3])
+
+    assert shell_overlap_mask(perigee, apogee, 0.0).tolist() == [False] * 5
+    assert shell_overlap_mask(perigee, apogee, 20e3).tolist() == [True, True, False, True, False]
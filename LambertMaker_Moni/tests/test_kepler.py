@@ -0,0 +1,25 @@
+import numpy as np
+from lambert_core import solve_kepler, mean_to_true_anomaly_rad
+
+
+def test_solve_kepler_elliptic_and_hyperbolic():
+    rng = np.random.default_rng(0)
+    M = rng.uniform(-20, 20, 1000)
+    e = np.concatenate([rng.uniform(0, 0.9999, 500), rng.uniform(1.0001, 10, 500)])
+
+    x, converged = solve_kepler(M, e)
+
+    assert converged.all()
+    ell = e < 1
+    assert np.allclose(x[ell] - e[ell] * np.sin(x[ell]), M[ell], rtol=0, atol=1e-12)
+    assert np.allclose(e[~ell] * np.sinh(x[~ell]) - x[~ell], M[~ell], rtol=1e-13, atol=1e-12)
+
+
+def test_mean_to_true_anomaly_rad_known_values():
+    # Orbite circulaire : nu = M ; apoapse et périapse fixes quelle que soit e
+    nu, _ = mean_to_true_anomaly_rad(np.array([0.3, 0.0, np.pi]), np.array([0.0, 0.7, 0.7]))
+    assert np.allclose(nu, [0.3, 0.0, np.pi])
+
+    # Parabolique non géré : NaN et non convergé
+    nu, converged = mean_to_true_anomaly_rad(1.0, 1.0)
+    assert np.isnan(nu) and not converged
@@ -0,0 +1,47 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+from lambert_utils import solve_lambert_batch, solve_lambert
+
+MU_EARTH = 398600e9  # m^3/s^2
+
+
+def test_solve_lambert_curtis():
+    # Exemple 5.2 de Curtis : r1, r2 en km, ΔT = 1 h
+    r1 = np.array([5000e3, 10000e3, 2100e3])
+    r2 = np.array([-14600e3, 2500e3, 7000e3])
+
+    v1, v2 = solve_lambert(r1, r2, 1 / 24, MU_EARTH)
+
+    assert np.allclose(v1 / 1e3, [-5.9925, 1.9254, 3.2456], atol=1e-4), f"v1 incorrect : {v1}"
+    assert np.allclose(v2 / 1e3, [-3.3125, -4.1966, -0.38529], atol=1e-4), f"v2 incorrect : {v2}"
+
+
+def test_solve_lambert_batch_reaches_rf_by_integration():
+    # Référence indépendante : v0 propagé numériquement pendant tof doit ramener en rf avec vf
+    rng = np.random.default_rng(1)
+    r0 = rng.normal(size=(50, 3)) * 1e7
+    rf = rng.normal(size=(50, 3)) * 1e7
+    tof = rng.uniform(600, 2e5, 50)
+
+    v0, vf, converged = solve_lambert_batch(r0, rf, tof, MU_EARTH)
+
+    assert v0.shape == (50, 3) and vf.shape == (50, 3) and converged.shape == (50,)
+    assert converged.all()
+
+    def two_body(t, y):
+        return np.hstack((y[3:], -MU_EARTH * y[:3] / np.linalg.norm(y[:3]) ** 3))
+
+    for k in (0, 17, 49):
+        sol = solve_ivp(two_body, (0, tof[k]), np.hstack((r0[k], v0[k])), method="DOP853", rtol=1e-12, atol=1e-6)
+        assert np.allclose(sol.y[:3, -1], rf[k], rtol=0, atol=1.0), f"rf non atteint (cas {k})"
+        assert np.allclose(sol.y[3:, -1], vf[k], rtol=0, atol=1e-3), f"vf incorrect (cas {k})"
+
+
+def test_solve_lambert_batch_masks_collinear_rows():
+    r0 = np.array([[7e6, 0, 0], [7e6, 0, 0]])
+    rf = np.array([[1.4e7, 0, 0], [0, 8e6, 0]])
+
+    v0, vf, converged = solve_lambert_batch(r0, rf, [3600.0, 3600.0], MU_EARTH)
+
+    assert converged.tolist() == [False, True]
+    assert np.isnan(v0[0]).all() and np.isfinite(v0[1]).all()
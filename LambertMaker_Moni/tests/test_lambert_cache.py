@@ -0,0 +1,62 @@
+import numpy as np
+from lambert_cache import LambertCache
+from lambert_utils import solve_lambert, solve_lambert_batch
+
+MU_EARTH = 398600e9  # m^3/s^2
+
+
+def sweep(n=20, seed=3):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n, 3)) * 1e7, rng.normal(size=(n, 3)) * 1e7, rng.uniform(600, 2e5, n)
+
+
+def test_cache_hits_and_results(tmp_path):
+    r0, rf, tof = sweep()
+    with LambertCache(path=str(tmp_path / "lambert.sqlite")) as cache:
+        v0, vf, ok = cache.solve_batch(r0, rf, tof, MU_EARTH)
+        v0_again, _, _ = cache.solve_batch(r0.copy(), rf, tof, MU_EARTH)
+        assert cache.hits == 20 and cache.misses == 20
+
+    v0_ref, vf_ref, ok_ref = solve_lambert_batch(r0, rf, tof, MU_EARTH)
+    assert np.array_equal(ok, ok_ref)
+    assert np.allclose(v0, v0_ref) and np.allclose(vf, vf_ref)
+    assert np.array_equal(v0, v0_again)
+
+    # Une nouvelle instance relit les solutions sur disque
+    with LambertCache(path=str(tmp_path / "lambert.sqlite")) as cache:
+        cache.solve_batch(r0[:5], rf[:5], tof[:5], MU_EARTH)
+        assert cache.stats()["hits"] == 5 and cache.stats()["misses"] == 0
+
+
+def test_cache_memory_and_disk_eviction(tmp_path):
+    r0, rf, tof = sweep(n=400)
+    with LambertCache(maxsize=50, path=str(tmp_path / "lambert.sqlite"), max_disk_bytes=16 * 1024) as cache:
+        cache.solve_batch(r0, rf, tof, MU_EARTH)
+        stats = cache.stats()
+        assert stats["memory_entries"] == 50
+        assert 0 < stats["disk_entries"] < 400
+        assert cache._disk_bytes() <= 16 * 1024
+
+
+def test_solve_lambert_through_cache():
+    r0, rf, tof = sweep(n=1)
+    cache = LambertCache()
+    v0, vf = solve_lambert(r0[0], rf[0], tof[0] / 86400.0, MU_EARTH, cache=cache)
+    v0_again, _ = solve_lambert(r0[0], rf[0], tof[0] / 86400.0, MU_EARTH, cache=cache)
+
+    assert cache.hits == 1 and cache.misses == 1
+    assert np.array_equal(v0, v0_again)
+    assert np.allclose(v0, solve_lambert(r0[0], rf[0], tof[0] / 86400.0, MU_EARTH)[0])
+
+
+def test_disk_lookup_batches_many_keys(tmp_path):
+    # Plus de clés que SQL_BATCH : plusieurs requêtes IN, doublons compris
+    r0, rf, tof = sweep(n=1000, seed=5)
+    with LambertCache(path=str(tmp_path / "lambert.sqlite")) as cache:
+        v0, _, ok = cache.solve_batch(r0, rf, tof, MU_EARTH)
+    with LambertCache(maxsize=10, path=str(tmp_path / "lambert.sqlite")) as cache:
+        idx = np.r_[np.arange(1000), 0, 1]
+        v0_disk, _, ok_disk = cache.solve_batch(r0[idx], rf[idx], tof[idx], MU_EARTH)
+        assert cache.misses == (~ok[idx]).sum()
+    assert np.array_equal(ok_disk, ok[idx])
+    assert np.array_equal(v0_disk[ok_disk], v0[idx][ok_disk])
@@ -1,5 +1,5 @@
 import numpy as np
-from lambert_utils import orbital_elements_to_r
+from lambert_utils import orbital_elements_to_r, orbital_elements_to_rv
 
 def test_orbital_elements_to_r():
     a = 7000e3     # demi-grand axe en m
@@ -16,3 +16,39 @@ def test_orbital_elements_to_r():
     assert r.shape == (3,), f"r n'a pas la bonne dimension : {r.shape}"
 
     print("✅ test_orbital_positions passed")
+
+
+def test_orbital_elements_to_rv_batch():
+    mu = 3.98659293629478e14
+    a = np.array([7000e3, 7000e3, 26600e3])
+    e = np.array([0.1, 0.1, 0.7])
+    nu = np.array([0.0, 90.0, 180.0])
+
+    r, v = orbital_elements_to_rv(a, e, 30, 40, 50, nu, mu=mu)
+
+    assert r.shape == (3, 3) and v.shape == (3, 3)
+    # Vis-viva : v² = mu (2/r - 1/a)
+    r_norm = np.linalg.norm(r, axis=1)
+    assert np.allclose(np.sum(v**2, axis=1), mu * (2 / r_norm - 1 / a))
+    # Chaque ligne est identique à un appel scalaire
+    r1, v1 = orbital_elements_to_rv(a[1], e[1], 30, 40, 50, nu[1], mu=mu)
+    assert np.allclose(r1, r[1]) and np.allclose(v1, v[1])
+
+
+def test_orbital_elements_to_rv_reference_values():
+    # Curtis, exemple 4.7 (hyperbole) : h = 80 000 km²/s, e = 1.4, i = 30°, Ω = 40°, ω = 60°, ν = 30°
+    mu = 398600e9
+    e = 1.4
+    a = (80000e6 ** 2 / mu) / (1 - e**2)
+    r, v = orbital_elements_to_rv(a, e, 30, 40, 60, 30, mu=mu)
+    assert np.allclose(r / 1e3, [-4039.9, 4814.56, 3628.62], rtol=0, atol=0.1), f"r incorrect : {r}"
+    assert np.allclose(v / 1e3, [-10.386, -4.77192, 1.74388], rtol=0, atol=1e-3), f"v incorrect : {v}"
+
+    # Vallado, exemple 2-6 : p = 11 067.790 km, e = 0.83285, i = 87.87°, Ω = 227.89°, ω = 53.38°, ν = 92.335°
+    mu = 398600.4418e9
+    e = 0.83285
+    a = 11067.790e3 / (1 - e**2)
+    r, v = orbital_elements_to_rv(a, e, 87.87, 227.89, 53.38, 92.335, mu=mu)
+    assert np.allclose(r / 1e3, [6525.368, 6861.532, 6449.119], rtol=0, atol=0.05), f"r incorrect : {r}"
+    assert np.allclose(v / 1e3, [4.902279, 5.533140, -1.975710], rtol=0, atol=1e-5), f"v incorrect : {v}"
+    assert np.allclose(orbital_elements_to_r(a, e, 87.87, 227.89, 53.38, 92.335), r)
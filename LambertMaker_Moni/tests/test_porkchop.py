@@ -0,0 +1,73 @@
+import numpy as np
+import porkchop
+from lambert_cache import LambertCache
+from lambert_utils import solve_lambert_batch
+from porkchop import porkchop_grid
+
+MU_SUN = 1.3271244004194e20  # m^3/s^2
+AU = 1.495978707e11          # m
+
+
+def circular_states(radius, jd):
+    """États d'un corps fictif sur orbite circulaire équatoriale (phase nulle à JD 0)."""
+    n = np.sqrt(MU_SUN / radius**3)
+    theta = n * jd * 86400.0
+    r = radius * np.stack([np.cos(theta), np.sin(theta), np.zeros_like(theta)], axis=1)
+    v = radius * n * np.stack([-np.sin(theta), np.cos(theta), np.zeros_like(theta)], axis=1)
+    return r, v
+
+
+def test_porkchop_grid_tiles_match_direct_solve():
+    dep_jd = np.linspace(0.0, 60.0, 7)
+    arr_jd = np.linspace(150.0, 300.0, 9)
+    r_dep, v_dep = circular_states(AU, dep_jd)
+    r_arr, v_arr = circular_states(1.52 * AU, arr_jd)
+
+    grid = porkchop_grid(dep_jd, r_dep, v_dep, arr_jd, r_arr, v_arr, MU_SUN, tile=4, workers=1)
+    grid_pool = porkchop_grid(dep_jd, r_dep, v_dep, arr_jd, r_arr, v_arr, MU_SUN, tile=3, workers=2)
+
+    assert grid["c3"].shape == (7, 9)
+    assert grid["converged"].all()
+    assert np.allclose(grid["c3"], grid_pool["c3"])
+    assert np.allclose(grid["dv_total"], grid["vinf_dep"] + grid["vinf_arr"])
+
+    v0, vf, _ = solve_lambert_batch(r_dep[2], r_arr[5], (arr_jd[5] - dep_jd[2]) * 86400.0, MU_SUN)
+    assert np.isclose(grid["vinf_dep"][2, 5], np.linalg.norm(v0[0] - v_dep[2]))
+    assert np.isclose(grid["vinf_arr"][2, 5], np.linalg.norm(vf[0] - v_arr[5]))
+
+
+def test_porkchop_grid_masks_arrival_before_departure():
+    jd = np.array([0.0, 100.0])
+    r, v = circular_states(AU, jd)
+    r2, v2 = circular_states(1.52 * AU, jd)
+
+    grid = porkchop_grid(jd, r, v, jd, r2, v2, MU_SUN, workers=1)
+
+    assert not grid["converged"][1, 0] and np.isnan(grid["c3"][1, 0])
+    assert grid["converged"][0, 1]
+
+
+def test_porkchop_grid_second_sweep_from_cache(tmp_path, monkeypatch):
+    dep_jd = np.linspace(0.0, 60.0, 5)
+    arr_jd = np.linspace(-10.0, 300.0, 6)  # la première colonne arrive avant tous les départs
+    r_dep, v_dep = circular_states(AU, dep_jd)
+    r_arr, v_arr = circular_states(1.52 * AU, arr_jd)
+    ref = porkchop_grid(dep_jd, r_dep, v_dep, arr_jd, r_arr, v_arr, MU_SUN, tile=3, workers=1)
+
+    with LambertCache(path=str(tmp_path / "lambert.sqlite")) as cache:
+        first = porkchop_grid(dep_jd, r_dep, v_dep, arr_jd, r_arr, v_arr, MU_SUN, tile=3, workers=2, cache=cache)
+        assert cache.hits == 0 and cache.misses == 30
+
+    # Second balayage (nouvelle instance, cache disque) : aucune résolution de Lambert
+    def no_solve(*args, **kwargs):
+        raise AssertionError("Lambert résolu alors que la cellule est en cache")
+
+    monkeypatch.setattr(porkchop, "solve_lambert_batch", no_solve)
+    with LambertCache(path=str(tmp_path / "lambert.sqlite")) as cache:
+        second = porkchop_grid(dep_jd, r_dep, v_dep, arr_jd, r_arr, v_arr, MU_SUN, tile=3, workers=1, cache=cache)
+        assert cache.hits == ref["converged"].sum() == 24
+
+    for grid in (first, second):
+        assert np.array_equal(grid["converged"], ref["converged"])
+        assert np.allclose(grid["c3"], ref["c3"], equal_nan=True)
+        assert np.allclose(grid["dv_total"], ref["dv_total"], equal_nan=True)
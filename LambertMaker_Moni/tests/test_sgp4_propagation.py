@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "convert_tle_params")))
+
+sgp4_api = pytest.importorskip("sgp4.api")
+
+from tle_to_orbital_params import parse_tle_catalog
+from sgp4_propagation import propagate_catalog, datetime64_to_jd
+
+TLE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "convert_tle_params", "tle.txt"))
+
+
+def test_propagate_catalog_matches_twoline2rv():
+    catalog = parse_tle_catalog(TLE_FILE)
+    times = np.datetime64("2025-09-05T00:00:00") + np.arange(0, 2880, 30).astype("timedelta64[m]")
+
+    # Petits paquets pour exercer le découpage objets × dates
+    states, errors = propagate_catalog(catalog, times, chunk_objects=50, chunk_times=7)
+
+    assert states.shape == (len(catalog), len(times), 6)
+    assert (errors == 0).all()
+    with open(TLE_FILE) as f:
+        lines = [ln.rstrip("\n") for ln in f if ln.strip()]
+    jd, fr = datetime64_to_jd(times)
+    for k in (0, 57, len(catalog) - 1):
+        sat = sgp4_api.Satrec.twoline2rv(lines[3 * k + 1], lines[3 * k + 2])
+        e, r, v = sat.sgp4_array(jd, fr)
+        assert np.allclose(states[k, :, :3], r * 1e3, rtol=0, atol=1e-3)
+        assert np.allclose(states[k, :, 3:], v * 1e3, rtol=0, atol=1e-6)
+
+
+def test_propagate_catalog_invalid_rows_are_nan():
+    catalog = parse_tle_catalog(TLE_FILE)[:3].copy()
+    catalog["valid"][1] = False
+    states, errors = propagate_catalog(catalog, np.array(["2025-09-05T12:00"], dtype="datetime64[us]"))
+
+    assert np.isnan(states[1]).all() and errors[1, 0] == -1
+    assert np.isfinite(states[[0, 2]]).all()
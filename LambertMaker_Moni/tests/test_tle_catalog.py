@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "convert_tle_params")))
+
+from tle_to_orbital_params import parse_tle_catalog, parse_line2, parse_epoch_from_line1
+
+TLE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "convert_tle_params", "tle.txt"))
+
+
+def test_parse_tle_catalog_matches_line_parser():
+    catalog = parse_tle_catalog(TLE_FILE)
+    with open(TLE_FILE) as f:
+        lines = [ln.rstrip("\n") for ln in f if ln.strip()]
+
+    assert len(catalog) == len(lines) // 3
+    assert catalog["valid"].all()
+    for k in (0, 57, len(catalog) - 1):
+        expected = parse_line2(lines[3 * k + 2])
+        got = tuple(catalog[k][f] for f in ("inc_deg", "raan_deg", "ecc", "argp_deg",
+                                            "mean_anom_deg", "mean_motion_rev_per_day"))
+        assert got == expected
+        assert catalog["epoch"][k].item().isoformat() + "Z" == parse_epoch_from_line1(lines[3 * k + 1])
+    assert catalog["satnum"][0] == 25160
+    assert np.isclose(catalog["bstar"][0], 0.10596e-3)
+
+
+def test_parse_tle_catalog_masks_invalid_rows(tmp_path):
+    with open(TLE_FILE) as f:
+        lines = [ln.rstrip("\n") for ln in f if ln.strip()][:9]
+    lines[2] = lines[2][:8] + " 1x8.008" + lines[2][16:]   # inclinaison illisible
+    lines[4] = lines[4][:-1] + str((int(lines[4][-1]) + 1) % 10)  # somme de contrôle fausse
+    bad = tmp_path / "bad_tle.txt"
+    bad.write_text("\n".join(lines) + "\n")
+
+    catalog = parse_tle_catalog(str(bad))
+
+    assert catalog["valid"].tolist() == [False, False, True]
+    assert np.isnan(catalog["inc_deg"][0]) and not np.isnan(catalog["raan_deg"][0])
+    assert catalog["checksum_ok"].tolist() == [True, False, True]
@@ -1,9 +1,15 @@
 # main.py - Solveur de trajectoire satellite avec méthode Monte Carlo
 import numpy as np
 import os
+import sys
 from datetime import datetime
 from predefined_bodies import known_bodies
 
+# samplers se trouve dans le dossier parent (MonteCarloMaker_Moni3) ; ajouté en fin de sys.path
+# pour que les modules locaux (predefined_bodies, mc_utils) restent prioritaires
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from samplers import SAMPLERS, sample_box
+
 def write_initial_conditions_file(filename, date_str, r, v):
     """Écrit un fichier de conditions initiales"""
     with open(filename, 'w') as f:
@@ -31,7 +37,10 @@ def write_parameters_file(filename, parameters):
         
         f.write("=== PARAMÈTRES MONTE CARLO ===\n")
         f.write(f"Nombre d'itérations: {parameters['nombre_iterations']}\n")
-        f.write(f"Domaine delta_v1_y: [-2.9, 2.9] km/s (perturbations très petites sur v1_y seulement)\n\n")
+        f.write(f"Méthode de tirage: {parameters['methode_tirage']}\n")
+        for axis, (lo, hi) in zip("xyz", parameters['bornes_deltav']):
+            f.write(f"Domaine delta_v1_{axis}: [{lo}, {hi}] km/s\n")
+        f.write("\n")
         
         f.write("=== DELTAV TIRÉS ===\n")
         if 'deltav_list' in parameters:
@@ -107,6 +116,15 @@ print(f"\nCorps sélectionnés: {central_body} (central) + {other_bodies}")
 # Nombre d'itérations Monte Carlo
 N = int(input(f"\nNombre d'itérations Monte Carlo [défaut 1]: ") or "1")
 
+# Méthode de tirage et bornes de la perturbation par axe (axe fixe si bornes égales)
+sampler = input(f"Méthode de tirage ({', '.join(SAMPLERS)}) [défaut random]: ") or "random"
+default_bounds = {"x": "0 0", "y": "-2.9 2.9", "z": "0 0"}
+dv_bounds = np.array([
+    [float(b) for b in (input(f"Bornes delta_v1_{axis} 'min max' (km/s) [défaut {default_bounds[axis]}]: ")
+                        or default_bounds[axis]).split()]
+    for axis in "xyz"
+])
+
 print(f"\n=== Configuration ===")
 print(f"r1: {r1}")
 print(f"r2: {r2}")
@@ -115,6 +133,7 @@ print(f"Date: {t0_str}")
 print(f"Corps central: {central_body}")
 print(f"Autres corps: {other_bodies}")
 print(f"Nombre d'itérations: {N}")
+print(f"Tirage: {sampler}, bornes delta_v1 (km/s): {dv_bounds.tolist()}")
 
 # Créer un dossier unique pour cette exécution dans le dossier MonteCarlo
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -131,32 +150,23 @@ parameters = {
     'corps_central': central_body,
     'autres_corps': other_bodies,
     'nombre_iterations': N,
+    'methode_tirage': sampler,
+    'bornes_deltav': dv_bounds,
     'timestamp': timestamp
 }
 
 # Boucle Monte Carlo
 print(f"\n=== Exécution Monte Carlo ===")
-rng = np.random.default_rng(42)
-
-# Liste pour stocker tous les deltav tirés
-deltav_list = []
+# Tous les deltav tirés d'un coup (suite quasi-aléatoire ou pseudo-aléatoire, graine 42)
+deltav_list = sample_box(sampler, N, dv_bounds[:, 0], dv_bounds[:, 1], seed=42)
 
 for i in range(N):
     print(f"\nItération {i+1}/{N}")
     
-    # Tirage aléatoire d'une perturbation sur la deuxième composante de v1 (v1_y)
-    #delta_v1_y = rng.uniform(-2.9, 2.9)  # Perturbation aléatoire sur v1_y    (delta=1.2 c bcp)
-    delta_v1_y = 1e-3  # Perturbation très petite en km/s
-    
-    # Appliquer la perturbation seulement sur v1_y
-    v1_prime = v1.copy()  # Copier v1 original
-    v1_prime[1] = v1[1] + delta_v1_y  # Modifier seulement la composante y
-    
-    # Stocker le delta pour les paramètres
-    deltav1 = np.array([0.0, delta_v1_y, 0.0])  # Perturbation seulement sur y
-    deltav_list.append(deltav1)
+    deltav1 = deltav_list[i]
+    v1_prime = v1 + deltav1
     
-    print(f"  delta_v1_y tiré: {delta_v1_y:.12e} km/s")
+    print(f"  delta_v1 tiré: [{deltav1[0]:.12e}, {deltav1[1]:.12e}, {deltav1[2]:.12e}] km/s")
     print(f"  v1 original: [{v1[0]:.12e}, {v1[1]:.12e}, {v1[2]:.12e}] km/s")
     print(f"  v1' modifié: [{v1_prime[0]:.12e}, {v1_prime[1]:.12e}, {v1_prime[2]:.12e}] km/s")
     print(f"  v1' = {v1_prime}")
@@ -0,0 +1,144 @@
+"""
+body_set.py
+Ensemble figé de corps attracteurs pour le calcul vectorisé de l'accélération multi-corps.
+
+Les positions (B, 3) et les paramètres gravitationnels (B,) sont empilés une fois pour toutes
+(tableaux en lecture seule) ; l'accélération est calculée en une seule diffusion numpy, pour un
+état (3,) ou un lot de N états (N, 3), dans des tampons réutilisés d'un appel à l'autre.
+
+Les corps fixes viennent en premier, puis les corps mobiles d'une éphéméride de Chebyshev
+(`ephemeris.ChebyshevEphemeris`), dont les positions sont relatives au corps central.
+"""
+
+import numpy as np
+
+from ephemeris import EphemerisBody
+
+
+class BodySet:
+    """
+    positions : positions fixes (Bf, 3) (m)
+    mu        : paramètres gravitationnels des corps fixes (Bf,) (m³/s²)
+    ephemeris : éphéméride des corps mobiles (optionnelle), mu_moving : leurs mu (Bm,)
+    radius, radius_moving : rayons des corps fixes (Bf,) et mobiles (Bm,) (m), pour la détection
+                            d'impact ; par défaut 0 (corps ponctuels)
+    """
+
+    def __init__(self, positions, mu, ephemeris=None, mu_moving=(), radius=None, radius_moving=None):
+        fixed = np.array(positions, dtype=float).reshape(-1, 3)
+        mu_fixed = np.array(mu, dtype=float).reshape(-1)
+        mu_moving = np.array(mu_moving, dtype=float).reshape(-1)
+        if len(fixed) != len(mu_fixed):
+            raise ValueError("positions et mu doivent avoir le même nombre de corps")
+        if ephemeris is not None and len(mu_moving) != len(ephemeris.names):
+            raise ValueError("mu_moving doit donner un mu par corps de l'éphéméride")
+        if ephemeris is None and len(mu_moving):
+            raise ValueError("mu_moving sans éphéméride")
+
+        self.fixed = fixed
+        self.ephemeris = ephemeris
+        self.mu = np.concatenate((mu_fixed, mu_moving))
+        self.radius = np.concatenate((np.zeros(len(mu_fixed)) if radius is None else np.array(radius, dtype=float),
+                                      np.zeros(len(mu_moving)) if radius_moving is None
+                                      else np.array(radius_moving, dtype=float))).reshape(-1)
+        if len(self.radius) != len(self.mu):
+            raise ValueError("radius et radius_moving doivent donner un rayon par corps")
+        self.n_fixed = len(fixed)
+        for array in (self.fixed, self.mu, self.radius):
+            array.setflags(write=False)
+        self._buffers = {}
+
+    @classmethod
+    def from_bodies_mu(cls, bodies_mu):
+        """
+        Conversion depuis l'ancienne liste de tuples (r_body, mu) ; r_body est une position fixe
+        ou un corps d'éphéméride (`ChebyshevEphemeris.body`), tous issus de la même éphéméride.
+        """
+        fixed = [(r_body, mu) for r_body, mu in bodies_mu if not isinstance(r_body, EphemerisBody)]
+        moving = [(r_body, mu) for r_body, mu in bodies_mu if isinstance(r_body, EphemerisBody)]
+        ephemeris = None
+        if moving:
+            sources = {id(body.ephemeris) for body, _ in moving}
+            if len(sources) > 1:
+                raise ValueError("Les corps mobiles doivent provenir d'une même éphéméride")
+            ephemeris = moving[0][0].ephemeris.subset([moving[0][0].ephemeris.names[body.index]
+                                                       for body, _ in moving])
+        return cls(np.array([r for r, _ in fixed], dtype=float).reshape(-1, 3), [mu for _, mu in fixed],
+                   ephemeris, [mu for _, mu in moving])
+
+    def __len__(self):
+        return len(self.mu)
+
+    def __getstate__(self):
+        # Les tampons ne sont pas transmis aux processus du pool
+        state = self.__dict__.copy()
+        state["_buffers"] = {}
+        return state
+
+    def central_field(self):
+        """(position, mu total) si tous les corps sont fixes et au même endroit (champ central pur), sinon None."""
+        if self.ephemeris is not None or not np.all(self.fixed == self.fixed[0]):
+            return None
+        return self.fixed[0], float(self.mu.sum())
+
+    def primary(self):
+        """(position, mu, rayon) du corps fixe le plus massif (référence pour l'énergie orbitale)."""
+        k = int(np.argmax(self.mu[:self.n_fixed]))
+        return self.fixed[k], float(self.mu[k]), float(self.radius[k])
+
+    def impact(self, r, t=0.0):
+        """Masque (N,) des états r (N, 3) situés à l'intérieur d'un corps à l'instant t (scalaire ou (N,))."""
+        if not np.any(self.radius > 0):
+            return np.zeros(len(r), dtype=bool)
+        P = self.positions(t)
+        if P.ndim < 3:
+            P = P[:, None, :]
+        distance = np.linalg.norm(np.asarray(r, dtype=float) - P, axis=-1)
+        return np.any(distance < self.radius[:, None], axis=0)
+
+    def _buffer(self, name, shape):
+        """Tampon réutilisé tant que la forme demandée ne change pas."""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape)
+            self._buffers[name] = buffer
+        return buffer
+
+    def positions(self, t=0.0):
+        """Positions (B, 3), ou (B, N, 3) pour des instants t (N,)."""
+        if self.ephemeris is None:
+            return self.fixed
+        t = np.asarray(t, dtype=float)
+        P = self._buffer("positions", (len(self),) + t.shape + (3,))
+        P[:self.n_fixed] = self.fixed.reshape((self.n_fixed,) + (1,) * t.ndim + (3,))
+        P[self.n_fixed:] = self.ephemeris.positions(t)
+        return P
+
+    def accel(self, r, t=0.0, out=None):
+        """
+        Accélération (m/s²) en r : (3,) ou (N, 3) ; t : scalaire ou (N,) (s depuis le début de la propagation).
+
+        Pour les corps mobiles, le repère centré sur le corps central n'est pas inertiel : le terme
+        indirect -mu r_body / |r_body|^3 est ajouté. `out` : tableau de sortie (optionnel).
+        """
+        r = np.asarray(r, dtype=float)
+        P = self.positions(t)
+        if P.ndim < r.ndim + 1:
+            P = P.reshape((len(self),) + (1,) * (r.ndim - 1) + (3,))      # mêmes positions pour tous les états
+
+        diff = self._buffer("diff", np.broadcast_shapes(P.shape, (1,) + r.shape))
+        np.subtract(r, P, out=diff)
+        w = self._buffer("w", diff.shape[:-1])
+        np.einsum("...c,...c->...", diff, diff, out=w)
+        np.power(w, -1.5, out=w)
+        w *= -self.mu.reshape((-1,) + (1,) * (w.ndim - 1))
+        acc = np.einsum("b...,b...c->...c", w, diff, out=out)
+
+        if self.ephemeris is not None:
+            Pm = P[self.n_fixed:]
+            wm = self._buffer("w_moving", Pm.shape[:-1])
+            np.einsum("...c,...c->...", Pm, Pm, out=wm)
+            np.power(wm, -1.5, out=wm)
+            wm *= self.mu[self.n_fixed:].reshape((-1,) + (1,) * (wm.ndim - 1))
+            acc -= np.einsum("b...,b...c->...c", wm, Pm)
+        return acc
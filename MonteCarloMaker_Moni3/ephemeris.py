@@ -0,0 +1,232 @@
+"""
+ephemeris.py
+Éphémérides des corps perturbateurs, interpolées par polynômes de Chebyshev.
+
+Les positions des corps (relatives au corps central, repère équatorial J2000, m) sont calculées
+une seule fois sur la fenêtre de la mission, par segments (1 jour par défaut), puis ajustées par
+des polynômes de Chebyshev. Dans la boucle d'intégration, une évaluation ne coûte qu'une récurrence
+de Chebyshev vectorisée et un produit matriciel.
+
+Sources :
+- "analytic" : éléments moyens des planètes (Standish, JPL, valables 1800-2050) et
+  théorie simplifiée de la Lune (Astronomical Almanac, ~0.3°) ;
+- "spice"    : noyau SPICE local (spiceypy, importé seulement si utilisé).
+
+Les coefficients sont enregistrés dans `cache_dir` (.npz) : les exécutions suivantes avec la même
+fenêtre les relisent sans recalculer (`load_or_build`).
+"""
+
+import hashlib
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+# lazy_import est partagé par tous les outils (dossier common/ à la racine du dépôt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "common")))
+
+from lazy_import import lazy_import
+from predefined_bodies import known_bodies
+
+# spiceypy n'est importé que pour la source "spice"
+spice = lazy_import("spiceypy")
+
+AU = 1.495978707e11                       # m
+OBLIQUITY_J2000 = np.radians(23.43928)    # obliquité de l'écliptique J2000
+JD_J2000 = 2451545.0
+JD_UNIX_EPOCH = 2440587.5
+
+# Éléments moyens J2000 et dérivées par siècle julien (Standish) :
+# a (UA), e, i (deg), L longitude moyenne (deg), longitude du périhélie (deg), longitude du nœud (deg)
+MEAN_ELEMENTS = {
+    "mercury": ([0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593],
+                [0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081]),
+    "venus":   ([0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255],
+                [0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418]),
+    "emb":     ([1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0],
+                [0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0]),
+    "mars":    ([1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891],
+                [0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343]),
+    "jupiter": ([5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909],
+                [-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106]),
+    "saturn":  ([9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448],
+                [-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794]),
+    "uranus":  ([19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503],
+                [-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589]),
+    "neptune": ([30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574],
+                [0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.01262724]),
+}
+
+
+def _ecliptic_to_equatorial(x):
+    c, s = np.cos(OBLIQUITY_J2000), np.sin(OBLIQUITY_J2000)
+    return np.stack((x[..., 0], c * x[..., 1] - s * x[..., 2], s * x[..., 1] + c * x[..., 2]), axis=-1)
+
+
+def mean_element_position(name, jd):
+    """Position héliocentrique (m, équatorial J2000) d'une planète ou du barycentre Terre-Lune ("emb")."""
+    elements, rates = MEAN_ELEMENTS[name]
+    T = (np.asarray(jd, dtype=float) - JD_J2000) / 36525
+    a, e, inc, L, varpi, node = (el + rate * T for el, rate in zip(elements, rates))
+    inc, node = np.radians(inc), np.radians(node)
+    omega = np.radians(varpi) - node
+    M = np.radians((L - varpi + 180) % 360 - 180)
+
+    E = M + e * np.sin(M)
+    for _ in range(10):
+        E = E - (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+    xp = a * AU * (np.cos(E) - e)
+    yp = a * AU * np.sqrt(1 - e**2) * np.sin(E)
+
+    cw, sw, cn, sn, ci, si = np.cos(omega), np.sin(omega), np.cos(node), np.sin(node), np.cos(inc), np.sin(inc)
+    x = (cw * cn - sw * sn * ci) * xp + (-sw * cn - cw * sn * ci) * yp
+    y = (cw * sn + sw * cn * ci) * xp + (-sw * sn + cw * cn * ci) * yp
+    z = (sw * si) * xp + (cw * si) * yp
+    return _ecliptic_to_equatorial(np.stack((x, y, z), axis=-1))
+
+
+def moon_geocentric_position(jd):
+    """Position géocentrique de la Lune (m, équatorial J2000), théorie simplifiée (~0.3°)."""
+    T = (np.asarray(jd, dtype=float) - JD_J2000) / 36525
+    d = lambda a, b: np.radians(a + b * T)
+    lon = np.radians(218.32 + 481267.881 * T) + np.radians(
+        6.29 * np.sin(d(135.0, 477198.87)) - 1.27 * np.sin(d(259.3, -413335.36))
+        + 0.66 * np.sin(d(235.7, 890534.22)) + 0.21 * np.sin(d(269.9, 954397.74))
+        - 0.19 * np.sin(d(357.5, 35999.05)) - 0.11 * np.sin(d(186.5, 966404.03)))
+    lat = np.radians(5.13 * np.sin(d(93.3, 483202.02)) + 0.28 * np.sin(d(228.2, 960400.89))
+                     - 0.28 * np.sin(d(318.3, 6003.15)) - 0.17 * np.sin(d(217.6, -407332.21)))
+    parallax = np.radians(0.9508 + 0.0518 * np.cos(d(135.0, 477198.87)) + 0.0095 * np.cos(d(259.3, -413335.36))
+                          + 0.0078 * np.cos(d(235.7, 890534.22)) + 0.0028 * np.cos(d(269.9, 954397.74)))
+    r = known_bodies["earth"][1] / np.sin(parallax)
+    x = np.stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)), axis=-1) * r[..., None]
+    return _ecliptic_to_equatorial(x)
+
+
+def heliocentric_position(name, jd):
+    """Position héliocentrique (m, équatorial J2000) d'un corps de `known_bodies` (modèle analytique)."""
+    jd = np.asarray(jd, dtype=float)
+    if name == "sun":
+        return np.zeros(jd.shape + (3,))
+    if name in ("earth", "moon"):
+        mu_e, mu_m = known_bodies["earth"][0], known_bodies["moon"][0]
+        moon = moon_geocentric_position(jd)
+        earth = mean_element_position("emb", jd) - moon * mu_m / (mu_e + mu_m)
+        return earth + moon if name == "moon" else earth
+    if name not in MEAN_ELEMENTS:
+        raise ValueError(f"Corps inconnu pour les éphémérides : {name}")
+    return mean_element_position(name, jd)
+
+
+def body_positions(names, central, epoch, t, source="analytic", kernel=None):
+    """
+    Positions (B, N, 3) des corps `names` relatives au corps `central` (m, équatorial J2000),
+    aux instants t (s depuis `epoch`, datetime UTC).
+    """
+    t = np.asarray(t, dtype=float)
+    if source == "spice":
+        spice.furnsh(kernel)
+        et = spice.str2et(epoch.isoformat()) + t
+        return np.array([[spice.spkpos(name, e, "J2000", "NONE", central)[0] for e in et] for name in names]) * 1e3
+    if source != "analytic":
+        raise ValueError(f"Source d'éphémérides inconnue : {source}")
+    if epoch.tzinfo is None:
+        epoch = epoch.replace(tzinfo=timezone.utc)
+    jd = (epoch.timestamp() + t) / 86400 + JD_UNIX_EPOCH
+    origin = heliocentric_position(central, jd)
+    return np.array([heliocentric_position(name, jd) - origin for name in names])
+
+
+class ChebyshevEphemeris:
+    """
+    Positions des corps perturbateurs interpolées par polynômes de Chebyshev, par segments.
+    coeffs : (B, S, degré + 1, 3) ; le temps t est compté en s depuis l'époque de la mission.
+    """
+
+    def __init__(self, names, coeffs, duration, segment):
+        self.names = list(names)
+        self.coeffs = coeffs
+        self.duration = float(duration)
+        self.segment = float(segment)
+
+    @classmethod
+    def build(cls, names, central, epoch, duration, segment=86400.0, degree=12, source="analytic", kernel=None):
+        """Ajuste les polynômes sur [0, duration] (s depuis epoch) à partir de `body_positions`."""
+        epoch = datetime.fromisoformat(epoch) if isinstance(epoch, str) else epoch
+        n_seg = max(1, int(np.ceil(duration / segment)))
+        segment = duration / n_seg if duration > 0 else segment
+        # Nœuds de Chebyshev sur [-1, 1], ramenés sur chaque segment
+        x = np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))
+        t = (np.arange(n_seg)[:, None] + (x[None, :] + 1) / 2) * segment
+        pos = body_positions(names, central, epoch, t.ravel(), source, kernel).reshape(len(names), n_seg, degree + 1, 3)
+        V = np.polynomial.chebyshev.chebvander(x, degree)
+        coeffs = np.einsum("kj,bsjc->bskc", np.linalg.inv(V), pos)
+        return cls(names, coeffs, duration, segment)
+
+    def _evaluate(self, coeffs, t):
+        """Évaluation des séries de Chebyshev de coefficients (..., S, degré + 1, 3) aux instants t."""
+        t = np.asarray(t, dtype=float)
+        if np.min(t) < -1e-6 * self.segment or np.max(t) > self.duration + 1e-6 * self.segment:
+            raise ValueError(f"Instant hors de la fenêtre des éphémérides [0, {self.duration}] s")
+        seg = np.minimum((t // self.segment).astype(int), coeffs.shape[-3] - 1)
+        x = 2 * (t - seg * self.segment) / self.segment - 1
+        # Polynômes T_k(x) par récurrence, puis combinaison avec les coefficients du segment
+        n = coeffs.shape[-2]
+        T = np.empty(x.shape + (n,))
+        T[..., 0] = 1.0
+        T[..., 1] = x
+        for k in range(2, n):
+            T[..., k] = 2 * x * T[..., k - 1] - T[..., k - 2]
+        return (T[..., None, :] @ coeffs[..., seg, :, :])[..., 0, :]
+
+    def positions(self, t):
+        """Positions (B, ..., 3) de tous les corps aux instants t (scalaire ou tableau, s)."""
+        return self._evaluate(self.coeffs, t)
+
+    def position(self, name, t):
+        """Position (..., 3) d'un corps aux instants t."""
+        return self._evaluate(self.coeffs[self.names.index(name)], t)
+
+    def subset(self, names):
+        """Éphéméride restreinte aux corps `names` (dans cet ordre)."""
+        return ChebyshevEphemeris(names, self.coeffs[[self.names.index(n) for n in names]], self.duration, self.segment)
+
+    def body(self, name):
+        """Position du corps sous forme d'objet appelable r_body(t), utilisable dans `bodies_mu`."""
+        return EphemerisBody(self, self.names.index(name))
+
+    def save(self, path):
+        np.savez(path, names=np.array(self.names), coeffs=self.coeffs, duration=self.duration, segment=self.segment)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["names"].tolist(), data["coeffs"], data["duration"], data["segment"])
+
+
+class EphemerisBody:
+    """Position d'un corps de l'éphéméride, appelable (et sérialisable par pickle pour le pool de processus)."""
+
+    def __init__(self, ephemeris, index):
+        self.ephemeris = ephemeris
+        self.index = index
+
+    def __call__(self, t):
+        return self.ephemeris._evaluate(self.ephemeris.coeffs[self.index], t)
+
+
+def load_or_build(names, central, epoch, duration, segment=86400.0, degree=12, source="analytic", kernel=None,
+                  cache_dir="ephemeris_cache"):
+    """
+    Éphéméride de Chebyshev pour la fenêtre [epoch, epoch + duration], relue depuis `cache_dir`
+    si elle a déjà été calculée avec les mêmes paramètres, construite et enregistrée sinon.
+    """
+    epoch = datetime.fromisoformat(epoch) if isinstance(epoch, str) else epoch
+    key = repr((list(names), central, epoch.isoformat(), float(duration), float(segment), degree, source, kernel))
+    path = os.path.join(cache_dir, f"cheb_{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}.npz")
+    if os.path.exists(path):
+        return ChebyshevEphemeris.load(path)
+    ephemeris = ChebyshevEphemeris.build(names, central, epoch, duration, segment, degree, source, kernel)
+    os.makedirs(cache_dir, exist_ok=True)
+    ephemeris.save(path)
+    return ephemeris
@@ -1,11 +1,26 @@
 # main_mc.py
+import argparse
+import glob
+import sys
 import numpy as np
 from datetime import datetime
-from mc_utils import propagate, f1_cost, write_docks_file
+from mc_utils import write_docks_file
+from mc_parallel import run_monte_carlo
+from ephemeris import load_or_build
+from body_set import BodySet
+from telemetry import Telemetry, PROGRESS, INFO, stop_summary
+from samplers import SAMPLERS
+from mc_adaptive import run_adaptive, blind_evaluations
+from result_store import ResultStore
 from predefined_bodies import known_bodies
-from tqdm import trange
 
 
+parser = argparse.ArgumentParser(description="Recherche Monte Carlo de v1 (multi-corps)")
+parser.add_argument("--resume", action="store_true",
+                    help="reprendre une exécution interrompue (mêmes réponses aux questions) sans recalculer "
+                         "les blocs déjà écrits dans le dossier de résultats")
+args = parser.parse_args()
+
 print("\n=== MonteCarloSolverMultiCorps ===\n")
 
 
@@ -35,7 +50,7 @@ other_indices = [int(i) for i in other_input.split(",")]
 other_bodies = [bodies_names[i] for i in other_indices if bodies_names[i] != central_body]
 
 
-print(f"Bodies included: {central_body} + {other_bodies}\n")
+bodies_included = f"Bodies included: {central_body} + {other_bodies}"
 
 
 # 4. Paramètres initiaux
@@ -66,89 +81,133 @@ v1_guess = np.array([
 
 
 # 5. Paramètres Monte Carlo
-N_samples = int(input("Number of Monte Carlo samples [default 500]: ") or 500)
+N_samples = int(input("Number of Monte Carlo samples (evaluation budget) [default 500]: ") or 500)
 tolerance_percent = float(input("Tolerance (percent) [default 1]: ") or 1.0)
 tof = float(input("Time of flight Δt (s) [default 86400 = 1 day]: ") or 86400)
+spice_kernel = input("SPICE kernel for ephemerides [leave empty for analytic mean elements]: ")
+search_mode = input("Search mode (mc = blind sampling, adaptive = cross-entropy) [default mc]: ") or "mc"
+if search_mode == "adaptive":
+    # La recherche adaptative tire ses générations en un seul processus et n'écrit pas de blocs
+    if args.resume:
+        parser.error("--resume ne s'applique qu'au mode mc (la recherche adaptive n'écrit pas de blocs)")
+    compare = (input("Compare with blind sampling of the same budget (runs it too) [y/N]: ") or "n").lower() == "y"
+else:
+    chunk_size = int(input("Samples per chunk [default 1000]: ") or 1000)
+    workers = int(input("Number of worker processes [default 0 = all cores]: ") or 0) or None
+    sampler = input(f"Sampler ({', '.join(SAMPLERS)}) [default random]: ") or "random"
+# Bornes de Δv par axe (m/s) : par défaut ±1% de |v1_guess|
+half = 0.01 * np.linalg.norm(v1_guess)
+dv_bounds = np.array([[float(x) for x in (input(f"Δv_{axis} bounds 'lo hi' (m/s) [default {-half:.6g} {half:.6g}]: ")
+                                          or f"{-half} {half}").split()] for axis in "xyz"])
+verbosity = int(input("Verbosity (0 quiet, 1 progress, 2 info per chunk, 3 debug per sample) [default 1]: ") or 1)
+metrics_path = None
+if search_mode != "adaptive":
+    metrics_path = input(f"Per-sample metrics file [default mc_metrics_{central_body}.npy]: ") \
+                   or f"mc_metrics_{central_body}.npy"
+seed = 42
+telemetry = Telemetry(verbosity, metrics_path)
+
+if search_mode != "adaptive":
+    # Dossier de résultats : nouveau dossier horodaté, ou dossier à reprendre (par défaut le plus récent)
+    if args.resume:
+        previous = sorted(glob.glob(f"mc_run_{central_body}_*"))
+        run_dir = input(f"Result store directory to resume [default {previous[-1] if previous else 'none'}]: ") \
+                  or (previous[-1] if previous else "")
+        if not run_dir:
+            parser.error(f"aucun dossier mc_run_{central_body}_* à reprendre")
+    else:
+        default_dir = f"mc_run_{central_body}_{datetime.now():%Y%m%d_%H%M%S}"
+        run_dir = input(f"Result store directory (one file per finished chunk) [default {default_dir}]: ") \
+                  or default_dir
+    # Dossier vérifié avant les calculs d'éphémérides : blocs d'une autre exécution, paramètres différents...
+    try:
+        store = ResultStore(run_dir, {
+            "date": t0_str, "central_body": central_body, "other_bodies": other_bodies, "spice_kernel": spice_kernel,
+            "r1": r1, "r2": r2, "v1_guess": v1_guess, "tof": tof, "n_samples": N_samples, "seed": seed,
+            "chunk_size": chunk_size, "sampler": sampler, "dv_bounds": dv_bounds,
+        }, resume=args.resume)
+    except ValueError as error:
+        print(f"\n❌ {error}")
+        sys.exit(1)
 
 # --- Préparer les corps pour gravité ---
-bodies_mu = []
-for name in [central_body] + other_bodies:
-    mu = known_bodies[name][0]
-    r_body = np.array([0.0, 0.0, 0.0])  # approximation simple
-    bodies_mu.append((r_body, mu))
+# Corps central à l'origine ; corps perturbateurs mobiles, interpolés par Chebyshev sur la fenêtre
+# de la mission (calculés une fois, puis relus depuis ephemeris_cache/ aux exécutions suivantes)
+ephemeris = load_or_build(other_bodies, central_body, t0_dt, tof,
+                          source="spice" if spice_kernel else "analytic", kernel=spice_kernel or None)
+# Rayons des corps : les échantillons qui les percutent sont arrêtés (impact)
+bodies_mu = BodySet([[0.0, 0.0, 0.0]], [known_bodies[central_body][0]],
+                    ephemeris=ephemeris, mu_moving=[known_bodies[name][0] for name in other_bodies],
+                    radius=[known_bodies[central_body][1]], radius_moving=[known_bodies[name][1] for name in other_bodies])
 
 tol = tolerance_percent / 100 * np.linalg.norm(r2 - r1)
-
-
-# --- Préparer pour stocker tous les f1 ---
-all_f1 = []       # liste pour stocker tous les f1
-all_v1 = []       # liste pour stocker les v1 correspondants
-all_r2i = []      # liste pour stocker les r2i correspondants
-
-
-# --- Boucle Monte Carlo ---
-best_f1 = np.inf
-best_r2i = None
-best_v1 = None
-rng = np.random.default_rng(42)
-
-for i in trange(N_samples, desc="Monte Carlo Progress"):
-    # Tirage uniforme ±1% autour de v1_guess
-    delta_v = rng.uniform(-0.01*np.linalg.norm(v1_guess), 0.01*np.linalg.norm(v1_guess), 3)   # ?????
-    v1_trial = v1_guess + delta_v
-
-    # Propagation
-    prop = propagate(r1, v1_trial, bodies_mu)
-    r2i = prop[:3]
-    print(" r2i(t):", r2i)
-    print(" r2(t):", r2)
-
-
-    # Fonction de coût f1
-    f1i = f1_cost(r2, r2i)
-    print(f" f1:", f1i)
-    #print(f"Trial {i+1}: v1 = {v1_trial}, r2i = {r2i}, f1 = {f1}\n")
-
-    """if f1i <= tol:
-        if f1i < best_f1:
-            print(f"✅New best f1: {f1i} with v1: {v1_trial} and r2i: {r2i}\n")
-            best_f1 = f1i
-            best_r2i = r2i
-            best_v1 = v1_trial
-
-    print(f"✅New best f1: {f1i} with v1: {v1_trial} and r2i: {r2i}\n")
-    best_f1 = f1i
-    best_r2i = r2i
-    best_v1 = v1_trial"""
-
-    # Stocker les résultats
-    all_f1.append(f1i)
-    all_v1.append(v1_trial)
-    all_r2i.append(r2i)
-
-    # Affichage pour suivi
-    print(f"Trial {i+1}: f1 = {f1i}, v1 = {v1_trial}, r2i = {r2i}")
-
-
-
-# Fonction de coût f2
-#f2 = best_f1
-
-# --- Calcul du minimum final ---
-best_index = np.argmin(all_f1)        # index de la plus petite f1
-f2 = all_f1[best_index]               # valeur minimale
-best_v1 = all_v1[best_index]          # v1 correspondant
-best_r2i = all_r2i[best_index]        # r2i correspondant
+telemetry.log(INFO, bodies_included)
+
+
+partial = False     # résultat d'une exécution interrompue (meilleur échantillon parmi les blocs terminés)
+if search_mode == "adaptive":
+    # --- Recherche adaptative (entropie croisée) : arrêt dès que f1 <= tol ou stagnation ---
+    search = run_adaptive(r1, v1_guess, r2, bodies_mu, tof, tol, N_samples, (dv_bounds[:, 0], dv_bounds[:, 1]),
+                          seed=seed, telemetry=telemetry)
+    f2, best_v1, best_r2i, best_t = search["f1"], search["v1"], search["r2i"], search["t_min"]
+    telemetry.log(PROGRESS, f"Arrêt ({search['reason']}) après {search['generations']} générations : "
+                            f"{search['evaluations']} propagations, budget non utilisé {search['unused_budget']}")
+    if compare:
+        # Même budget tiré à l'aveugle (mêmes bornes, même graine) : tirages nécessaires pour atteindre le même f1
+        blind = run_monte_carlo(r1, v1_guess, r2, bodies_mu, N_samples, tof, seed=seed,
+                                bounds=(dv_bounds[:, 0], dv_bounds[:, 1]), telemetry=Telemetry(verbosity))
+        n_blind = blind_evaluations(blind["f1"], f2)
+        if blind["interrupted"]:
+            telemetry.log(PROGRESS, "Comparaison à l'aveugle interrompue")
+        elif n_blind is None:
+            telemetry.log(PROGRESS, f"À l'aveugle : f1 = {f2:.6e} m non atteint en {N_samples} tirages "
+                                    f"(meilleur {np.nanmin(blind['f1']):.6e} m)")
+        else:
+            telemetry.log(PROGRESS, f"À l'aveugle : {n_blind} tirages pour atteindre le même f1, soit "
+                                    f"{n_blind - search['evaluations']} évaluations économisées")
+else:
+    # --- Monte Carlo : blocs d'échantillons répartis sur un pool de processus ---
+    # Résultats identiques quel que soit le nombre de processus (un flux aléatoire par bloc) ;
+    # Ctrl-C conserve les blocs déjà terminés
+    # Métriques par échantillon (f1, nfev, steps, wall_s) : telemetry.load_metrics(metrics_path)
+    # Chaque bloc terminé est écrit dans run_dir : après une interruption, relancer avec --resume
+    mc = run_monte_carlo(r1, v1_guess, r2, bodies_mu, N_samples, tof, seed=seed, chunk_size=chunk_size,
+                         workers=workers, telemetry=telemetry, sampler=sampler,
+                         bounds=(dv_bounds[:, 0], dv_bounds[:, 1]), store=store)
+    if mc["resumed"]:
+        telemetry.log(PROGRESS, f"Reprise : {mc['resumed']}/{N_samples} échantillons relus depuis {run_dir}")
+    if mc["interrupted"]:
+        telemetry.log(PROGRESS, f"⚠️  Interrompu : {np.count_nonzero(mc['done'])}/{N_samples} échantillons calculés "
+                                f"(relancer avec --resume sur {run_dir} pour terminer)")
+    all_f1, all_v1, all_r2i = mc["f1"], mc["v1"], mc["r2i"]
+    telemetry.log(INFO, f"Arrêts des propagations : {stop_summary(mc['stop'][mc['done']])}")
+    if not np.isfinite(all_f1).any():
+        # Ctrl-C avant la fin du premier bloc (ou propagations toutes en échec) : aucun résultat à écrire
+        telemetry.log(PROGRESS, "Aucun échantillon calculé : pas de résultat")
+        sys.exit(1)
+    partial = mc["interrupted"]
+
+    # --- Calcul du minimum final ---
+    best_index = np.nanargmin(all_f1)     # index de la plus petite f1 (échantillons en échec : NaN)
+    f2 = all_f1[best_index]               # valeur minimale
+    best_v1 = all_v1[best_index]          # v1 correspondant
+    best_r2i = all_r2i[best_index]        # r2i correspondant
+    best_t = mc["t_min"][best_index]      # instant du rapprochement minimal
 
 
 # --- Résultats ---
-print("\n=== Résultat Monte Carlo ===")
-print(f"Vitesse initiale optimale v1 : {best_v1}")
-print(f"Position finale r2i : {best_r2i}")
-print(f"Fonction de coût f2: {f2}")
+telemetry.log(PROGRESS, "\n=== Résultat Monte Carlo ===" if not partial else
+              f"\n=== Résultat Monte Carlo PARTIEL ({np.count_nonzero(mc['done'])}/{N_samples} échantillons) ===")
+telemetry.log(PROGRESS, f"Vitesse initiale optimale v1 : {best_v1}")
+telemetry.log(PROGRESS, f"Position au rapprochement minimal r2i : {best_r2i} (t = {best_t:.1f} s / {tof:.1f} s)")
+telemetry.log(PROGRESS, f"Fonction de coût f2 = min_t |r2 - r(t)| : {f2}")
+telemetry.log(PROGRESS, f"Tolérance ({tolerance_percent} % de |r2 - r1|) : {tol:.6e} m, "
+                        f"{'atteinte' if f2 <= tol else 'non atteinte'}")
+if metrics_path is not None:
+    telemetry.log(INFO, f"Métriques par échantillon : {metrics_path}")
 
 
-# Générer fichier DOCKS
-write_docks_file(f"best_solution_mc_{central_body}.txt", t0_str, r1, best_v1)
+# Générer fichier DOCKS (suffixe _partial pour une exécution interrompue)
+write_docks_file(f"best_solution_mc_{central_body}{'_partial' if partial else ''}.txt", t0_str, r1, best_v1)
 
-print("\n=== End of Monte Carlo Script ===")
+telemetry.log(PROGRESS, "\n=== End of Monte Carlo Script ===")
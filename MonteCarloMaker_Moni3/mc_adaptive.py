@@ -0,0 +1,106 @@
+"""
+mc_adaptive.py
+Recherche adaptative de v1 par la méthode de l'entropie croisée.
+
+Au lieu de tirer tous les échantillons à l'aveugle, la recherche procède par générations :
+chaque génération tire `population` vitesses d'une loi normale N(m, C), les propage sur la
+durée de vol et évalue f1 = min_t |r2 - r(t)| (`closest_approach`), puis m et C
+sont réajustés sur les meilleurs échantillons (élites). La recherche s'arrête dès que
+f1 <= tol, quand le meilleur f1 stagne, ou quand le budget d'évaluations est épuisé.
+
+Comparaison avec la recherche à l'aveugle : `blind_evaluations` compte les tirages d'un Monte Carlo
+(`mc_parallel.run_monte_carlo`, mêmes bornes) nécessaires pour atteindre le même f1.
+"""
+
+import numpy as np
+
+from mc_utils import closest_approach
+from telemetry import Telemetry, INFO
+
+
+def run_adaptive(r1, v1_guess, r2, bodies_mu, tof, tol, max_evals, bounds, population=64, elite_frac=0.2,
+                 smoothing=0.7, patience=5, min_improvement=1e-3, seed=42, telemetry=None):
+    """
+    Recherche de v1 minimisant f1 = min_t |r2 - r(t)| sur [0, tof] par entropie croisée.
+
+    bounds    : (lower, upper) bornes de Δv par axe (m/s) autour de v1_guess ; elles fixent la loi
+                initiale (centre du pavé, écart type = quart de la largeur), pas une contrainte
+    tol       : arrêt dès que f1 <= tol (m)
+    max_evals : budget d'évaluations (même budget qu'une recherche à l'aveugle)
+    smoothing : poids de la nouvelle estimation dans la mise à jour de (m, C)
+    patience  : générations sans amélioration relative > min_improvement avant l'arrêt
+
+    Retourne un dictionnaire : 'v1', 'r2i', 'f1', 't_min' (meilleur échantillon), 'evaluations', 'generations',
+    'reason' ('tolérance', 'stagnation' ou 'budget'), 'history' (meilleur f1 par génération)
+    et 'unused_budget' (max_evals - evaluations).
+    """
+    r1, v1_guess, r2 = (np.asarray(x, dtype=float) for x in (r1, v1_guess, r2))
+    lower, upper = (np.asarray(b, dtype=float) for b in bounds)
+    n_elite = max(4, int(round(elite_frac * population)))
+    if n_elite >= population:
+        raise ValueError("La population doit dépasser le nombre d'élites")
+
+    telemetry = telemetry or Telemetry()
+    rng = np.random.default_rng(seed)
+    mean = v1_guess + (lower + upper) / 2
+    cov = np.diag(np.maximum((upper - lower) / 4, 1e-9) ** 2)
+    floor = 1e-12 * np.eye(3) * max(np.linalg.norm(v1_guess), 1.0) ** 2
+
+    best = {"v1": None, "r2i": None, "f1": np.inf, "t_min": np.nan}
+    history = []
+    evaluations = 0
+    generations = 0
+    stalled = 0
+    reason = "budget"
+
+    telemetry.start(max_evals, desc="Adaptive search")
+    try:
+        while evaluations < max_evals:
+            n = min(population, max_evals - evaluations)
+            v1 = rng.multivariate_normal(mean, cov, n, method="cholesky")
+            # Élagage par rapport au meilleur f1 : le f1 d'un échantillon arrêté tôt majore son vrai coût
+            r2i, f1, t_min, _ = closest_approach(r1, v1, r2, bodies_mu, tof, best=best["f1"])
+            evaluations += n
+            generations += 1
+            telemetry.advance(n)
+
+            k = np.nanargmin(f1) if np.any(np.isfinite(f1)) else None
+            previous = best["f1"]
+            if k is not None and f1[k] < best["f1"]:
+                best = {"v1": v1[k], "r2i": r2i[k], "f1": f1[k], "t_min": t_min[k]}
+            history.append(best["f1"])
+            telemetry.log(INFO, f"Génération {generations} : meilleur f1 {best['f1']:.6e} m "
+                                f"({evaluations} évaluations, écart type {np.sqrt(np.diag(cov)).max():.3e} m/s)")
+
+            if best["f1"] <= tol:
+                reason = "tolérance"
+                break
+            stalled = 0 if best["f1"] < previous * (1 - min_improvement) else stalled + 1
+            if stalled >= patience:
+                reason = "stagnation"
+                break
+
+            # Réajustement de la loi sur les élites (échantillons en échec : f1 = NaN, exclus)
+            elites = v1[np.argsort(np.where(np.isfinite(f1), f1, np.inf))[:n_elite]]
+            mean = smoothing * elites.mean(axis=0) + (1 - smoothing) * mean
+            cov = smoothing * np.cov(elites, rowvar=False) + (1 - smoothing) * cov + floor
+    finally:
+        telemetry.close()
+
+    best.update({
+        "evaluations": evaluations,
+        "generations": generations,
+        "reason": reason,
+        "history": np.array(history),
+        "unused_budget": max_evals - evaluations,
+    })
+    return best
+
+
+def blind_evaluations(f1_blind, target):
+    """
+    Nombre de tirages à l'aveugle nécessaires pour atteindre f1 <= target : rang (à partir de 1) du
+    premier échantillon de f1_blind (dans l'ordre du tirage) qui y parvient, None si aucun.
+    """
+    reached = np.flatnonzero(np.asarray(f1_blind) <= target)
+    return int(reached[0]) + 1 if reached.size else None
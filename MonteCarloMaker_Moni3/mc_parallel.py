@@ -0,0 +1,142 @@
+"""
+mc_parallel.py
+Exécution parallèle du Monte Carlo sur un pool de processus, reproductible.
+
+Les échantillons sont découpés en blocs de `chunk_size`. Chaque bloc tire ses vitesses dans
+son propre flux aléatoire, issu de `SeedSequence(seed).spawn(n_blocs)` : le résultat ne
+dépend que de (seed, chunk_size), jamais du nombre de processus ni de l'ordre d'exécution.
+Les tirages quasi-aléatoires (`samplers`) sont générés en une fois et ne dépendent que de seed.
+
+Ctrl-C arrête le calcul proprement : les blocs déjà terminés sont conservés (masque 'done').
+Avec un `result_store.ResultStore`, chaque bloc terminé est aussi écrit sur disque : une exécution
+interrompue (Ctrl-C ou arrêt brutal) reprend sans recalculer les blocs déjà écrits.
+"""
+
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from mc_utils import closest_approach
+from telemetry import Telemetry, METRICS_DTYPE
+from samplers import sample_box
+from result_store import check_stream
+
+
+def _run_chunk(task):
+    """Tire et propage un bloc d'échantillons (tâche du pool de processus)."""
+    k, seed_seq, n, delta_v, r1, v1_guess, r2, bodies_mu, tof, lower, upper = task
+    start = time.perf_counter()
+    if delta_v is None:
+        # Tirage pseudo-aléatoire : flux propre au bloc
+        delta_v = np.random.default_rng(seed_seq).uniform(lower, upper, (n, 3))
+    v1 = v1_guess + delta_v
+    r2i, f1, t_min, info = closest_approach(r1, v1, r2, bodies_mu, tof)
+    # Les échantillons d'un bloc sont propagés ensemble : le temps du bloc est réparti au prorata de nfev
+    wall = time.perf_counter() - start
+    share = info["nfev"] / info["nfev"].sum() if info["nfev"].sum() else np.full(n, 1 / n)
+    return k, v1, r2i, f1, t_min, info["nfev"], info["steps"], wall * share, info["success"], info["stop"]
+
+
+def run_monte_carlo(r1, v1_guess, r2, bodies_mu, n_samples, tof, seed=42, chunk_size=1000, workers=None, spread=0.01,
+                    telemetry=None, sampler="random", bounds=None, store=None):
+    """
+    Monte Carlo sur v1 : tirage de Δv dans un pavé autour de v1_guess, propagation sur la durée de vol
+    tof (s) et coût f1 = min_t |r2 - r(t)| (rapprochement minimal, `mc_utils.closest_approach`).
+
+    bounds  : (lower, upper) bornes de Δv par axe (m/s) ; par défaut ±spread·|v1_guess| sur chaque axe
+    sampler : "random" (uniforme, un flux par bloc), "sobol", "halton" ou "lhs" (voir `samplers`) ;
+              les suites quasi-aléatoires sont générées en entier puis découpées en blocs
+    workers : None = tous les cœurs, 1 = exécution locale sans pool
+    telemetry : `telemetry.Telemetry` (progression, messages, fichier de métriques) ; par défaut,
+                barre de progression seule
+    store   : `result_store.ResultStore` (optionnel) ; les blocs qu'il contient déjà sont relus au lieu
+              d'être recalculés, chaque nouveau bloc y est écrit dès qu'il est terminé
+    Retourne un dictionnaire de tableaux (n_samples lignes) : 'v1', 'r2i' (position au rapprochement
+    minimal), 'f1', 't_min' (instant du rapprochement, s), 'stop' (raison de l'arrêt de la propagation,
+    indice dans `mc_utils.STOP_REASONS` : les échantillons sans espoir sont arrêtés tôt), 'done',
+    'metrics' (`telemetry.METRICS_DTYPE` : f1, t_min, nfev, steps, wall_s, stop...), 'resumed' (nombre
+    d'échantillons relus depuis store) et 'interrupted' (True si Ctrl-C).
+    Les échantillons non calculés ont f1 = NaN.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size doit être >= 1")
+    r1, v1_guess, r2 = (np.asarray(x, dtype=float) for x in (r1, v1_guess, r2))
+    if bounds is None:
+        half = spread * np.linalg.norm(v1_guess)
+        bounds = (np.full(3, -half), np.full(3, half))
+    lower, upper = (np.asarray(b, dtype=float) for b in bounds)
+    starts = np.arange(0, n_samples, chunk_size)
+    children = np.random.SeedSequence(seed).spawn(len(starts))
+    design = None if sampler == "random" else sample_box(sampler, n_samples, lower, upper, seed)
+    tasks = [(k, children[k], min(chunk_size, n_samples - s), None if design is None else design[s:s + chunk_size],
+              r1, v1_guess, r2, bodies_mu, tof, lower, upper)
+             for k, s in enumerate(starts)]
+
+    results = {
+        "v1": np.full((n_samples, 3), np.nan),
+        "r2i": np.full((n_samples, 3), np.nan),
+        "f1": np.full(n_samples, np.nan),
+        "t_min": np.full(n_samples, np.nan),
+        "stop": np.zeros(n_samples, dtype=np.int8),
+        "done": np.zeros(n_samples, dtype=bool),
+        "metrics": np.zeros(n_samples, dtype=METRICS_DTYPE),
+        "resumed": 0,
+        "interrupted": False,
+    }
+    metrics = results["metrics"]
+    metrics["sample"] = np.arange(n_samples)
+    metrics["chunk"] = np.arange(n_samples) // chunk_size
+    metrics["f1"] = metrics["t_min"] = np.nan
+
+    telemetry = telemetry or Telemetry()
+
+    def fill(k, v1, r2i, f1, t_min, metrics_k, stop):
+        rows = slice(starts[k], starts[k] + len(f1))
+        results["v1"][rows], results["r2i"][rows], results["f1"][rows] = v1, r2i, f1
+        results["t_min"][rows], results["stop"][rows] = t_min, stop
+        results["done"][rows] = True
+        metrics[rows] = metrics_k
+        return rows
+
+    def store_chunk(k, v1, r2i, f1, t_min, nfev, steps, wall_s, success, stop):
+        m = metrics[starts[k]:starts[k] + len(f1)].copy()
+        m["f1"], m["t_min"], m["nfev"], m["steps"], m["wall_s"] = f1, t_min, nfev, steps, wall_s
+        m["success"], m["stop"] = success, stop
+        rows = fill(k, v1, r2i, f1, t_min, m, stop)
+        if store is not None:
+            store.write_chunk(k, children[k], v1=v1, r2i=r2i, f1=f1, t_min=t_min, stop=stop, metrics=m)
+        telemetry.chunk_done(k, rows, f1, nfev, steps, wall_s, success, stop)
+
+    # Reprise : blocs déjà sur disque, relus sans recalcul
+    telemetry.start(n_samples)
+    if store is not None:
+        for k, chunk in store.completed().items():
+            check_stream(chunk, children[k])
+            fill(k, chunk["v1"], chunk["r2i"], chunk["f1"], chunk["t_min"], chunk["metrics"], chunk["stop"])
+            results["resumed"] += len(chunk["f1"])
+        telemetry.advance(results["resumed"])
+        tasks = [task for task in tasks if not results["done"][starts[task[0]]]]
+
+    workers = workers or os.cpu_count()
+    try:
+        if workers == 1:
+            for task in tasks:
+                store_chunk(*_run_chunk(task))
+        else:
+            # Les processus du pool ignorent Ctrl-C : seul le processus principal l'intercepte
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=signal.signal,
+                                       initargs=(signal.SIGINT, signal.SIG_IGN))
+            try:
+                for future in as_completed([pool.submit(_run_chunk, task) for task in tasks]):
+                    store_chunk(*future.result())
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+    except KeyboardInterrupt:
+        results["interrupted"] = True
+    finally:
+        telemetry.close()
+    telemetry.save_metrics(metrics)
+    return results
@@ -1,59 +1,278 @@
 # mc_utils.py
+import os
+import sys
+
 import numpy as np
-from scipy.integrate import solve_ivp
 
-def nbody_accel(r, bodies_mu):
+# lazy_import, kepler_propagator et ensemble_propagator sont partagés par tous les outils (dossier common/)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "common")))
+
+from lazy_import import lazy_import
+from kepler_propagator import propagate_kepler, state_at_anomaly, universal_anomaly
+from ensemble_propagator import propagate_ensemble, illinois_root
+from body_set import BodySet
+
+# scipy n'est importé qu'à la première propagation
+scipy_integrate = lazy_import("scipy.integrate")
+
+# Raisons d'arrêt d'un échantillon (info['stop'] de `closest_approach`) : code = indice
+STOP_REASONS = ("tof", "impact", "escape", "bound")
+IMPACT, ESCAPE, BOUND = 1, 2, 3
+# Marge sur la vitesse maximale de la borne inférieure du coût (perturbations des autres corps)
+SPEED_MARGIN = 1.1
+
+def nbody_accel(r, bodies_mu, t=0.0):
     """
     Calcul de l'accélération multi-corps.
     
-    r : position actuelle du satellite (np.array 3D)
-    bodies_mu : liste de tuples (r_body, mu)
+    r : position actuelle du satellite (np.array 3D), ou (N, 3) pour N satellites
+    bodies_mu : `BodySet`, ou liste de tuples (r_body, mu) (convertie à chaque appel : à éviter
+                dans une boucle) ; r_body est une position fixe ou un corps d'éphéméride
+    t : instant (s depuis le début de la propagation), scalaire ou (N,)
     """
-    acc = np.zeros(3)
-    for r_body, mu in bodies_mu:
-        diff = r - r_body
-        acc += -mu * diff / np.linalg.norm(diff)**3
-    return acc
+    return as_body_set(bodies_mu).accel(r, t)
+
+def as_body_set(bodies_mu):
+    """`BodySet` tel quel, ou construit depuis une liste de tuples (r_body, mu)."""
+    return bodies_mu if isinstance(bodies_mu, BodySet) else BodySet.from_bodies_mu(bodies_mu)
 
-def propagate(r0, v0, bodies_mu):
+def propagate(r0, v0, bodies_mu, t_final):
     """
     Propagation multi-corps simplifiée.
     
     r0 : position initiale (m)
     v0 : vitesse initiale (m/s)
-    bodies_mu : liste de tuples (r_body, mu)
+    bodies_mu : `BodySet` (ou liste de tuples (r_body, mu))
+    t_final : durée de propagation (s) ; pour le coût de la recherche, voir `closest_approach`
     
     Retourne l'état final [x,y,z,vx,vy,vz]
+    Si tous les corps sont au même endroit (champ central), la propagation est analytique
+    (`kepler_propagator`) ; sinon, intégration numérique.
     """
+    bodies = as_body_set(bodies_mu)
+
     def ode(t, y):  # concaténation de v et a 
         r = y[:3]
         v = y[3:]
-        a = nbody_accel(r, bodies_mu)
-        #print("y(t):", y)
-        #print(" a(t):", a)
-        #print(" v(t):", v)
-        #print(" r(t):", r)
-        #print("np.hstack((v, a)):", np.hstack((v, a)))
+        a = bodies.accel(r, t)
         return np.hstack((v, a))
 
     y0 = np.hstack((r0, v0))
-    
-    # Temps d'intégration arbitraire : on peut prendre une grande valeur pour atteindre t2 mais ça va prendre du temps
-    t_final =2  # tof ?????????
-    sol = solve_ivp(ode, [0, t_final], y0, rtol=1e-8, atol=1e-8)
-    print(" sol:", sol)
-    print(" sol.y:", sol.y)
-    print(" sol.y[:, -1]:", sol.y[:, -1])
-    
+
+    # Corps tous au même endroit : champ central pur (mu total), solution analytique exacte
+    field = bodies.central_field()
+    if field is not None:
+        r_center, mu_total = field
+        r_f, v_f = propagate_kepler(np.asarray(r0, dtype=float) - r_center, v0, t_final, mu_total)
+        return np.hstack((r_f + r_center, v_f))
+
+    sol = scipy_integrate.solve_ivp(ode, [0, t_final], y0, rtol=1e-8, atol=1e-8)
     return sol.y[:, -1]
 
 
+def propagate_samples(r0, v0, bodies_mu, t_final):
+    """
+    Propagation multi-corps de N échantillons en un seul appel.
+
+    r0 : position(s) initiale(s) (m), (3,) ou (N, 3)
+    v0 : vitesses initiales (m/s), (N, 3)
+    bodies_mu : `BodySet` (ou liste de tuples (r_body, mu))
+    t_final : durée de propagation (s)
+
+    Retourne (états finaux (N, 6), info) ; info : 'nfev', 'steps', 'success' par échantillon.
+    Tous les échantillons avancent ensemble dans l'intégrateur DOP853 vectorisé (`ensemble_propagator`),
+    chacun avec son propre pas ; champ central pur (corps fixes confondus) : propagation analytique vectorisée.
+    """
+    v0 = np.asarray(v0, dtype=float)
+    r0 = np.broadcast_to(np.asarray(r0, dtype=float), v0.shape)
+    N = len(v0)
+
+    bodies = as_body_set(bodies_mu)
+    field = bodies.central_field()
+    if field is not None:
+        r_center, mu_total = field
+        r_f, v_f = propagate_kepler(r0 - r_center, v0, t_final, mu_total)
+        info = {"nfev": np.zeros(N, dtype=int), "steps": np.zeros(N, dtype=int), "success": np.ones(N, dtype=bool)}
+        return np.hstack((r_f + r_center, v_f)), info
+
+    def ode(t, y):
+        dy = np.empty_like(y)
+        dy[:, :3] = y[:, 3:]
+        bodies.accel(y[:, :3], t, out=dy[:, 3:])
+        return dy
+
+    y_f, info = propagate_ensemble(ode, 0.0, np.hstack((r0, v0)), t_final, rtol=1e-8, atol=1e-8)
+    return y_f, info
+
+
+def closest_approach(r0, v0, r_target, bodies_mu, tof, best=np.inf, stop_early=True):
+    """
+    Rapprochement minimal de N échantillons vers r_target sur [0, tof] : f = min_t |r_target - r(t)|.
+
+    Le minimum est localisé pendant la propagation (événement d/dt |r - r_target| = 0, affiné sur
+    l'interpolant dense) : aucune trajectoire n'est stockée. Les extrémités t = 0 et t = tof comptent.
+    r0 : (3,) ou (N, 3) ; v0 : (N, 3) ; tof : durée de vol (s)
+    best : meilleur coût déjà connu (m), pour l'élagage des échantillons sans espoir
+    stop_early : arrêt immédiat des échantillons sans espoir (voir `_stop_rule`) ; leur f est alors le
+                 rapprochement minimal atteint avant l'arrêt
+    Retourne (r_min (N, 3), d_min (N,), t_min (N,), info) ; info comme `propagate_samples`, plus
+    'stop' (N,) : raison de l'arrêt (indice dans STOP_REASONS).
+    """
+    v0 = np.asarray(v0, dtype=float)
+    r0 = np.broadcast_to(np.asarray(r0, dtype=float), v0.shape)
+    r_target = np.asarray(r_target, dtype=float)
+    N = len(v0)
+
+    bodies = as_body_set(bodies_mu)
+    field = bodies.central_field()
+    if field is not None:
+        r_center, mu_total = field
+        radius = bodies.radius.max() if stop_early else 0.0
+        r_min, d_min, t_min, stop = _closest_approach_kepler(r0 - r_center, v0, r_target - r_center, tof, mu_total,
+                                                             radius)
+        info = {"nfev": np.zeros(N, dtype=int), "steps": np.zeros(N, dtype=int), "success": np.ones(N, dtype=bool),
+                "stop": stop}
+        return r_min + r_center, d_min, t_min, info
+
+    def ode(t, y):
+        dy = np.empty_like(y)
+        dy[:, :3] = y[:, 3:]
+        bodies.accel(y[:, :3], t, out=dy[:, 3:])
+        return dy
+
+    stop = _stop_rule(bodies, r_target, tof) if stop_early else None
+    _, info = propagate_ensemble(ode, 0.0, np.hstack((r0, v0)), tof, rtol=1e-8, atol=1e-8, target=r_target,
+                                 stop=stop, best=best)
+    info.setdefault("stop", np.zeros(N, dtype=np.int8))
+    return info.pop("r_min"), info.pop("d_min"), info.pop("t_min"), info
+
+
+def _stop_rule(bodies, r_target, tof):
+    """
+    Règle d'arrêt des échantillons sans espoir (paramètre `stop` de `propagate_ensemble`) :
+    - impact : r à l'intérieur d'un corps (rayons du `BodySet`) ;
+    - escape : orbite hyperbolique autour du corps principal, en éloignement, et déjà assez loin pour
+      que |r - r_target| >= |r| - |r_target| ne puisse plus descendre sous le d_min atteint ;
+    - bound : borne inférieure du coût, min(d_min, |r - r_target| - v_max (tof - t)), supérieure au
+      meilleur coût atteint ; v_max est la vitesse au ras du corps principal à énergie constante,
+      majorée de SPEED_MARGIN.
+    """
+    r_p, mu_p, radius_p = bodies.primary()
+    target_distance = np.linalg.norm(r_target - r_p)
+
+    def stop(t, y, d_min, best):
+        rel, v = y[:, :3] - r_p, y[:, 3:]
+        distance = np.linalg.norm(rel, axis=1)
+        energy = 0.5 * np.einsum("ij,ij->i", v, v) - mu_p / distance
+        code = np.zeros(len(t), dtype=np.int8)
+        if radius_p > 0:
+            v_max = SPEED_MARGIN * np.sqrt(2 * np.maximum(energy + mu_p / radius_p, 0.0))
+            lower = np.minimum(d_min, np.linalg.norm(y[:, :3] - r_target, axis=1) - v_max * (tof - t))
+            code[lower > best] = BOUND
+        outward = np.einsum("ij,ij->i", rel, v) > 0
+        code[(energy >= 0) & outward & (distance - target_distance >= d_min)] = ESCAPE
+        code[bodies.impact(y[:, :3], t)] = IMPACT
+        return code
+
+    return stop
+
+
+def _closest_approach_kepler(r0, v0, r_target, tof, mu, radius=0.0, points_per_orbit=16):
+    """
+    Rapprochement minimal en champ central : (r - r_target)·v est suivi sur une grille régulière en
+    variable universelle chi (formules explicites, sans équation de Kepler à résoudre), et chaque
+    passage de - à + est affiné en chi (Illinois).
+    Le pas en chi correspond à au plus 2 pi / points_per_orbit d'anomalie vraie (dchi/dnu = r / sqrt(p)),
+    même au périgée : une grille régulière en temps, elle, y passe trop vite et peut enjamber un
+    minimum et un maximum de distance dans un même intervalle.
+    Un échantillon dont l'orbite passe sous `radius` s'arrête au point d'entrée (impact, chi affiné par
+    Illinois sur radius - |r|) : les rapprochements postérieurs, à travers le corps, ne comptent pas.
+    Retourne (r_min, d_min, t_min, stop).
+    """
+    def rate(chi, rows):
+        r, v, t = state_at_anomaly(r0[rows], v0[rows], chi, mu)
+        return r, t, np.einsum("ij,ij->i", r - r_target, v)
+
+    def radial(chi, rows):
+        r, v, _ = state_at_anomaly(r0[rows], v0[rows], chi, mu)
+        return np.einsum("ij,ij->i", r, v)
+
+    def depth(chi, rows):
+        return radius - np.linalg.norm(state_at_anomaly(r0[rows], v0[rows], chi, mu)[0], axis=1)
+
+    N = len(r0)
+    r0_norm = np.linalg.norm(r0, axis=1)
+    # Périgée : h² / (mu (1 + e)) ; p = h² / mu
+    h = np.cross(r0, v0)
+    p = np.einsum("ij,ij->i", h, h) / mu
+    e = np.linalg.norm(np.cross(v0, h) / mu - r0 / r0_norm[:, None], axis=1)
+    r_peri = p / (1 + e)
+    # Pas en chi : résolution angulaire exigée au-dessus de la surface (ou de 1e-3 r0 pour une
+    # orbite quasi rectiligne : la portion d'orbite plus proche du foyer est alors minuscule)
+    chi_f = universal_anomaly(r0, v0, np.full(N, float(tof)), mu)
+    r_floor = np.maximum.reduce([r_peri, np.full(N, radius), 1e-3 * r0_norm])
+    dchi = 2 * np.pi / points_per_orbit * r_floor / np.sqrt(np.maximum(p, 1e-300))
+    n_grid = int(max(16, np.ceil(np.max(np.abs(chi_f) / dchi))))
+
+    r_min = np.array(r0, dtype=float)
+    d_min = np.linalg.norm(r_min - r_target, axis=1)
+    t_min = np.zeros(N)
+    stop = np.where(r0_norm < radius, IMPACT, 0).astype(np.int8)
+    g = np.einsum("ij,ij->i", r0 - r_target, v0)
+    sigma = np.einsum("ij,ij->i", r0, v0)
+    r_norm = r0_norm.copy()
+    chi_prev = np.zeros(N)
+    for k in range(1, n_grid + 1):
+        alive = np.flatnonzero(stop == 0)
+        if not alive.size:
+            break
+        chi_k = chi_f[alive] * k / n_grid
+        r, v, t_k = state_at_anomaly(r0[alive], v0[alive], chi_k, mu)
+        if k == n_grid:
+            t_k = np.full(alive.size, float(tof))
+        g_new = np.einsum("ij,ij->i", r - r_target, v)
+        sigma_new = np.einsum("ij,ij->i", r, v)
+        r_norm_new = np.linalg.norm(r, axis=1)
+        # Impact : sous la surface en fin d'intervalle, ou passage au périgée (r·v de - à +) sous la surface
+        inside = r_norm_new < radius
+        hit = inside | ((sigma[alive] < 0) & (sigma_new >= 0) & (r_peri[alive] < radius))
+        # Fin utile de l'intervalle : chi_k, ou le point d'entrée dans le corps pour un impact
+        chi_end, r_end, t_end, g_end = chi_k.copy(), r, t_k, g_new.copy()
+        if np.any(hit):
+            rows = alive[hit]
+            chi_in = chi_k[hit]
+            through = ~inside[hit]                          # traversée complète : entrée avant le périgée
+            if np.any(through):
+                across = rows[through]
+                chi_in[through] = illinois_root(lambda x: radial(x, across), chi_prev[across], chi_in[through],
+                                                sigma[across], sigma_new[hit][through])
+            chi_hit = illinois_root(lambda x: depth(x, rows), chi_prev[rows], chi_in,
+                                    radius - r_norm[rows], depth(chi_in, rows))
+            r_hit, t_hit, g_hit = rate(chi_hit, rows)
+            chi_end[hit], r_end[hit], t_end[hit], g_end[hit] = chi_hit, r_hit, t_hit, g_hit
+        candidates = [(r_end, t_end, alive)]                # extrémité de l'intervalle (t = tof, ou impact)
+        crossing = (g[alive] < 0) & (g_end >= 0)
+        if np.any(crossing):
+            cross = alive[crossing]
+            chi_c = illinois_root(lambda x: rate(x, cross)[2], chi_prev[cross], chi_end[crossing],
+                                  g[cross], g_end[crossing])
+            r_c, t_c, _ = rate(chi_c, cross)
+            candidates.append((r_c, t_c, cross))
+        for r_c, t_c, rows in candidates:
+            d_c = np.linalg.norm(r_c - r_target, axis=1)
+            better = d_c < d_min[rows]
+            d_min[rows[better]], r_min[rows[better]], t_min[rows[better]] = d_c[better], r_c[better], t_c[better]
+        stop[alive[hit]] = IMPACT
+        g[alive], sigma[alive], r_norm[alive], chi_prev[alive] = g_new, sigma_new, r_norm_new, chi_k
+    return r_min, d_min, t_min, stop
+
 
 def f1_cost(r_target, r2i):
     """
     Fonction de coût f1 : norme de la distance finale par rapport à la cible
+    r2i : (3,) ou (N, 3) ; retourne un scalaire ou (N,)
     """
-    return np.linalg.norm(r_target - r2i)
+    return np.linalg.norm(r_target - r2i, axis=-1)
 
 
 
@@ -37,18 +37,19 @@ positions_bodies = {
     "uranus": np.array([2.87e12, 0, 0]),
     "neptune": np.array([4.5e12, 0, 0])
 }
-# Calculer les accélérations
-accelerations = []
-for name, (mu, radius) in known_bodies.items():
-    r_body = positions_bodies[name]
-    distance = np.linalg.norm(r_body - r_satellite)
-    a = mu / distance**2
-    accelerations.append((name, distance, a))
+if __name__ == "__main__":
+    # Calculer les accélérations
+    accelerations = []
+    for name, (mu, radius) in known_bodies.items():
+        r_body = positions_bodies[name]
+        distance = np.linalg.norm(r_body - r_satellite)
+        a = mu / distance**2
+        accelerations.append((name, distance, a))
 
-# Trier par accélération décroissante (du plus grand au plus petit)
-accelerations_sorted = sorted(accelerations, key=lambda x: x[2], reverse=True)
+    # Trier par accélération décroissante (du plus grand au plus petit)
+    accelerations_sorted = sorted(accelerations, key=lambda x: x[2], reverse=True)
 
-# Afficher
-print("Accélérations gravitationnelles par rapport au satellite (m/s²), triées du plus grand au plus petit :\n")
-for name, distance, a in accelerations_sorted:
-    print(f"{name:8s} -> distance = {distance:.3e} m, a = {a:.5e} m/s²")
\ No newline at end of file
+    # Afficher
+    print("Accélérations gravitationnelles par rapport au satellite (m/s²), triées du plus grand au plus petit :\n")
+    for name, distance, a in accelerations_sorted:
+        print(f"{name:8s} -> distance = {distance:.3e} m, a = {a:.5e} m/s²")
\ No newline at end of file
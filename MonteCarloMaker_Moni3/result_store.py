@@ -0,0 +1,84 @@
+"""
+result_store.py
+Stockage sur disque des résultats Monte Carlo, bloc par bloc, pour reprendre un calcul interrompu.
+
+Un dossier par exécution :
+- run.json          : paramètres du tirage (graine, taille des blocs, bornes, r1, r2, tof...) ;
+- chunk_XXXXX.npz   : un fichier par bloc terminé (v1, r2i, f1, t_min, stop, métriques) et l'état
+                      du flux aléatoire du bloc (entropie et spawn_key de sa SeedSequence, état PCG64).
+
+Les fichiers de bloc ne sont jamais modifiés une fois écrits (écriture dans un fichier temporaire
+puis renommage atomique) : un bloc présent sur disque est complet, même après un arrêt brutal.
+"""
+
+import json
+import os
+
+import numpy as np
+
+MANIFEST = "run.json"
+
+
+class ResultStore:
+    """
+    path   : dossier de l'exécution
+    params : paramètres du tirage (dictionnaire sérialisable en JSON après conversion des tableaux)
+    resume : True = reprendre les blocs déjà écrits (paramètres identiques exigés) ;
+             False = nouvelle exécution, refusée si le dossier contient déjà des blocs (rien n'est effacé)
+    """
+
+    def __init__(self, path, params, resume=False):
+        self.path = path
+        self.params = json.loads(json.dumps(params, default=_to_json))
+        manifest = os.path.join(path, MANIFEST)
+        if resume and not os.path.exists(manifest):
+            raise ValueError(f"Aucune exécution à reprendre dans {path}")
+        os.makedirs(path, exist_ok=True)
+        if resume:
+            with open(manifest, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved != self.params:
+                changed = sorted(k for k in set(saved) | set(self.params) if saved.get(k) != self.params.get(k))
+                raise ValueError(f"Paramètres différents de l'exécution à reprendre : {', '.join(changed)}")
+        else:
+            if self._chunk_files():
+                raise ValueError(f"{path} contient déjà les blocs d'une exécution : relancer avec --resume pour la "
+                                 f"reprendre, ou choisir un autre dossier")
+            with open(manifest, "w", encoding="utf-8") as f:
+                json.dump(self.params, f, indent=2)
+
+    def _chunk_files(self):
+        return sorted(name for name in os.listdir(self.path) if name.startswith("chunk_") and name.endswith(".npz"))
+
+    def completed(self):
+        """Blocs déjà sur disque : {k: contenu du fichier (dictionnaire de tableaux)}."""
+        chunks = {}
+        for name in self._chunk_files():
+            with np.load(os.path.join(self.path, name)) as data:
+                chunks[int(name[6:-4])] = {key: data[key] for key in data.files}
+        return chunks
+
+    def write_chunk(self, k, seed_seq, **arrays):
+        """Écrit le bloc k (tableaux de résultats et état du flux aléatoire `seed_seq`)."""
+        name = os.path.join(self.path, f"chunk_{k:05d}.npz")
+        tmp = name + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, entropy=str(seed_seq.entropy), spawn_key=np.array(seed_seq.spawn_key),
+                     rng_state=json.dumps(np.random.PCG64(seed_seq).state), **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, name)
+
+
+def check_stream(chunk, seed_seq):
+    """Vérifie qu'un bloc relu a bien été tiré dans le flux `seed_seq` attendu."""
+    if str(chunk["entropy"]) != str(seed_seq.entropy) or tuple(chunk["spawn_key"]) != tuple(seed_seq.spawn_key):
+        raise ValueError("Bloc relu tiré dans un autre flux aléatoire : exécution incompatible")
+
+
+def _to_json(x):
+    if isinstance(x, np.ndarray):
+        return x.tolist()
+    if isinstance(x, np.generic):
+        return x.item()
+    raise TypeError(f"Paramètre non sérialisable : {type(x).__name__}")
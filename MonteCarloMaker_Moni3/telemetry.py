@@ -0,0 +1,95 @@
+"""
+telemetry.py
+Suivi d'exécution du Monte Carlo : messages par niveau de verbosité, barre de progression
+agrégée et métriques par échantillon enregistrées en colonnes (tableau structuré `.npy`).
+
+Niveaux : QUIET (rien), PROGRESS (barre de progression et résultat, par défaut),
+INFO (un message par bloc), DEBUG (une ligne par échantillon).
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# lazy_import est partagé par tous les outils (dossier common/ à la racine du dépôt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "common")))
+
+from lazy_import import lazy_import
+from mc_utils import STOP_REASONS
+
+# tqdm n'est importé que si une barre de progression est affichée
+tqdm = lazy_import("tqdm")
+
+QUIET, PROGRESS, INFO, DEBUG = 0, 1, 2, 3
+
+METRICS_DTYPE = np.dtype([
+    ('sample', 'i8'),
+    ('chunk', 'i4'),
+    ('f1', 'f8'),          # coût f1 : distance au rapprochement minimal (m)
+    ('t_min', 'f8'),       # instant du rapprochement minimal (s)
+    ('nfev', 'i4'),        # évaluations du second membre
+    ('steps', 'i4'),       # pas acceptés
+    ('wall_s', 'f4'),      # temps de calcul attribué à l'échantillon (s)
+    ('success', '?'),
+    ('stop', 'i1'),        # raison de l'arrêt (indice dans mc_utils.STOP_REASONS)
+])
+
+
+class Telemetry:
+    """
+    verbosity    : QUIET, PROGRESS, INFO ou DEBUG
+    metrics_path : fichier `.npy` des métriques par échantillon (None = pas d'enregistrement)
+    """
+
+    def __init__(self, verbosity=PROGRESS, metrics_path=None):
+        self.verbosity = verbosity
+        self.metrics_path = metrics_path
+        self._bar = None
+
+    def log(self, level, message):
+        """Affiche `message` si la verbosité l'autorise (sans casser la barre de progression)."""
+        if self.verbosity >= level:
+            if self._bar is not None:
+                self._bar.write(message)
+            else:
+                print(message)
+
+    def start(self, total, desc="Monte Carlo Progress"):
+        if self.verbosity >= PROGRESS:
+            self._bar = tqdm.tqdm(total=total, desc=desc)
+
+    def advance(self, n):
+        if self._bar is not None:
+            self._bar.update(n)
+
+    def close(self):
+        if self._bar is not None:
+            self._bar.close()
+            self._bar = None
+
+    def chunk_done(self, k, rows, f1, nfev, steps, wall_s, success, stop):
+        """Compte rendu d'un bloc terminé : progression, messages INFO/DEBUG."""
+        self.advance(len(f1))
+        self.log(INFO, f"Bloc {k} : {len(f1)} échantillons en {wall_s.sum():.3f} s, "
+                       f"nfev moyen {nfev.mean():.0f}, min f1 {np.nanmin(f1, initial=np.inf):.6e}, "
+                       f"arrêts {stop_summary(stop)}")
+        if self.verbosity >= DEBUG:
+            for i, (f, n, s, ok, code) in enumerate(zip(f1, nfev, steps, success, stop)):
+                self.log(DEBUG, f"Trial {rows.start + i + 1}: f1 = {f}, nfev = {n}, steps = {s}, success = {ok}, "
+                                f"stop = {STOP_REASONS[code]}")
+
+    def save_metrics(self, metrics):
+        if self.metrics_path is not None:
+            np.save(self.metrics_path, metrics)
+
+
+def stop_summary(stop):
+    """Décompte des raisons d'arrêt, ex. 'tof 812, impact 150, escape 38'."""
+    counts = np.bincount(stop, minlength=len(STOP_REASONS))
+    return ", ".join(f"{name} {n}" for name, n in zip(STOP_REASONS, counts) if n)
+
+
+def load_metrics(path):
+    """Relit un fichier de métriques (tableau structuré `METRICS_DTYPE`)."""
+    return np.load(path)
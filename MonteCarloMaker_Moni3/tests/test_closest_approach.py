@@ -0,0 +1,67 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from body_set import BodySet
+from kepler_propagator import propagate_kepler
+from mc_utils import closest_approach
+from predefined_bodies import known_bodies
+
+MU = known_bodies["earth"][0]
+# Terre au centre et Lune fixe : champ non central, propagation numérique (intégrateur d'ensemble)
+BODIES = BodySet([[0.0, 0.0, 0.0], [3.84e8, 0.0, 0.0]], [MU, known_bodies["moon"][0]])
+
+
+def brute_force(state_at, tof, n=200001, n_refine=2001):
+    """Minimum de |r(t) - r_target| par recherche exhaustive, affinée autour du meilleur point de la grille."""
+    t = np.linspace(0.0, tof, n)
+    i = np.argmin(state_at(t))
+    t_fine = np.linspace(t[max(i - 1, 0)], t[min(i + 1, n - 1)], n_refine)
+    return state_at(t_fine).min()
+
+
+def test_kepler_grid_matches_brute_force():
+    # Orbite très excentrique (e = 0.95, périgée 7000 km) partie de l'apogée, sur 2.5 révolutions, et
+    # orbite hyperbolique ; cibles autour du périgée, dont certaines derrière le centre de courbure du
+    # périgée (deux minima de distance de part et d'autre du périgée, manqués par une grille en temps)
+    rp, e = 7e6, 0.95
+    a = rp / (1 - e)
+    period = 2 * np.pi * np.sqrt(a ** 3 / MU)
+    r0 = np.array([[-a * (1 + e), 0.0, 0.0], [rp, 0.0, 0.0]])
+    v0 = np.array([[0.0, -np.sqrt(MU * (1 - e) / (a * (1 + e))), 0.0], [0.0, 1.2 * np.sqrt(2 * MU / rp), 1e3]])
+    tof = 2.5 * period
+    p = rp * (1 + e)
+    rng = np.random.default_rng(3)
+    targets = [np.array([rp - 1.5 * p, 1e5, 0.0]), np.array([rp - 1.5 * p, 1e6, 0.0])]
+    targets += list(np.array([rp, 0.0, 0.0]) + rng.normal(size=(8, 3)) * np.array([2e6, 2e6, 5e5]))
+
+    for r_target in targets:
+        r_min, d_min, t_min, info = closest_approach(r0, v0, r_target, BodySet([[0.0, 0.0, 0.0]], [MU]), tof)
+        assert np.all(info["stop"] == 0)
+        r_check, _ = propagate_kepler(r0, v0, t_min, MU)
+        assert np.allclose(r_check, r_min, rtol=0, atol=1e-3)
+        assert np.allclose(np.linalg.norm(r_min - r_target, axis=1), d_min, rtol=0, atol=1e-6)
+        for i in range(len(r0)):
+            def distance(t):
+                r, _ = propagate_kepler(np.repeat(r0[i:i + 1], len(t), 0), np.repeat(v0[i:i + 1], len(t), 0), t, MU)
+                return np.linalg.norm(r - r_target, axis=1)
+            assert abs(d_min[i] - brute_force(distance, tof)) < 1e-2
+
+
+def test_ensemble_event_minimum_matches_brute_force():
+    r0 = np.array([6.6781363e6, 0.0, 0.0])
+    v0 = np.array([[0.0, 7.26e3, 2.64e3], [0.0, 7.8e3, 1.0e3], [-5e2, 9.5e3, 0.0], [0.0, 1.1e4, 3e3]])
+    tof = 2.0 * 3600.0
+    targets = [np.array([-4.0e6, 5.5e6, 2.0e6]), np.array([1.0e6, 8.0e6, 1.0e6]), np.array([-1.2e7, -3.0e6, 0.0])]
+
+    def ode(t, y):
+        return np.concatenate((y[3:], BODIES.accel(y[:3], t)))
+
+    for r_target in targets:
+        r_min, d_min, t_min, info = closest_approach(r0, v0, r_target, BODIES, tof, stop_early=False)
+        assert np.all(info["success"]) and np.all(info["stop"] == 0)
+        for i in range(len(v0)):
+            sol = solve_ivp(ode, (0.0, tof), np.concatenate((r0, v0[i])), method="DOP853", rtol=1e-12, atol=1e-6,
+                            dense_output=True)
+            assert np.linalg.norm(sol.sol(t_min[i])[:3] - r_min[i]) < 1.0
+            brute = brute_force(lambda t: np.linalg.norm(sol.sol(t)[:3].T - r_target, axis=1), tof, n=20001)
+            assert abs(d_min[i] - brute) < 1.0
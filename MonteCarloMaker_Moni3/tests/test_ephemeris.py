@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from body_set import BodySet
+from ephemeris import ChebyshevEphemeris, body_positions, load_or_build
+from predefined_bodies import known_bodies
+
+EPOCH = "2025-01-01T12:00:00"
+EPOCH_DT = datetime.fromisoformat(EPOCH)
+DURATION = 3 * 86400.0
+NAMES = ["sun", "moon"]
+
+
+def test_chebyshev_fit_matches_body_positions_off_nodes():
+    ephemeris = ChebyshevEphemeris.build(NAMES, "earth", EPOCH, DURATION)
+    t = np.random.default_rng(2).uniform(0.0, DURATION, 200)
+    reference = body_positions(NAMES, "earth", EPOCH_DT, t)
+    error = np.linalg.norm(ephemeris.positions(t) - reference, axis=-1)
+    assert error[0].max() < 5.0       # Soleil (~1.5e11 m)
+    assert error[1].max() < 0.5       # Lune (~3.8e8 m)
+
+    # Instant scalaire : (B, 3) pour tous les corps, (3,) pour un corps
+    t0 = 1.234e5
+    assert ephemeris.positions(t0).shape == (2, 3)
+    moon = body_positions(["moon"], "earth", EPOCH_DT, t0)[0]
+    assert np.linalg.norm(ephemeris.position("moon", t0) - moon) < 0.5
+    assert np.allclose(ephemeris.body("moon")(t0), ephemeris.position("moon", t0), rtol=0, atol=0)
+
+
+def test_chebyshev_rejects_times_outside_window():
+    ephemeris = ChebyshevEphemeris.build(NAMES, "earth", EPOCH, DURATION)
+    for t in (-10.0, DURATION + 100.0, np.array([0.0, DURATION + 100.0])):
+        with pytest.raises(ValueError):
+            ephemeris.positions(t)
+    ephemeris.positions(np.array([0.0, DURATION]))       # bornes comprises
+
+
+def test_load_or_build_reloads_cached_coefficients(tmp_path, monkeypatch):
+    built = load_or_build(NAMES, "earth", EPOCH, DURATION, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.glob("cheb_*.npz"))) == 1
+
+    # Deuxième appel avec les mêmes paramètres : relu depuis le cache, sans recalcul
+    def no_build(*args, **kwargs):
+        raise AssertionError("éphéméride recalculée au lieu d'être relue")
+    monkeypatch.setattr(ChebyshevEphemeris, "build", no_build)
+    loaded = load_or_build(NAMES, "earth", EPOCH, DURATION, cache_dir=str(tmp_path))
+    assert loaded.names == built.names
+    assert loaded.duration == built.duration and loaded.segment == built.segment
+    assert np.array_equal(loaded.coeffs, built.coeffs)
+
+    # Autre fenêtre : nouvelle entrée du cache
+    monkeypatch.undo()
+    load_or_build(NAMES, "earth", EPOCH, 2 * DURATION, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.glob("cheb_*.npz"))) == 2
+
+
+def test_body_set_accel_with_ephemeris_matches_per_body_loop():
+    ephemeris = ChebyshevEphemeris.build(NAMES, "earth", EPOCH, DURATION)
+    mu_earth, mu_moving = known_bodies["earth"][0], [known_bodies[name][0] for name in NAMES]
+    bodies = BodySet([[0.0, 0.0, 0.0]], [mu_earth], ephemeris=ephemeris, mu_moving=mu_moving)
+
+    rng = np.random.default_rng(4)
+    r = rng.normal(size=(16, 3)) * 4e7
+    t = rng.uniform(0.0, DURATION, 16)
+
+    def reference(r, t):
+        # Corps central, puis chaque corps mobile avec le terme indirect (repère centré sur la Terre)
+        a = -mu_earth * r / np.linalg.norm(r) ** 3
+        for name, mu in zip(NAMES, mu_moving):
+            rb = ephemeris.position(name, t)
+            a += mu * ((rb - r) / np.linalg.norm(rb - r) ** 3 - rb / np.linalg.norm(rb) ** 3)
+        return a
+
+    expected = np.array([reference(r[i], t[i]) for i in range(len(r))])
+    assert np.allclose(bodies.accel(r, t), expected, rtol=1e-12, atol=0)
+    # Un seul état, instant scalaire ; lot d'états au même instant
+    assert np.allclose(bodies.accel(r[3], t[3]), expected[3], rtol=1e-12, atol=0)
+    assert np.allclose(bodies.accel(r, t[5]), [reference(ri, t[5]) for ri in r], rtol=1e-12, atol=0)
@@ -0,0 +1,59 @@
+import numpy as np
+
+from mc_adaptive import blind_evaluations, run_adaptive
+from mc_parallel import run_monte_carlo
+from mc_utils import closest_approach
+from telemetry import QUIET, Telemetry
+from test_mc_parallel import BODIES, R1, R2, TOF, V1_GUESS
+
+HALF = 0.02 * np.linalg.norm(V1_GUESS)
+BOUNDS = (np.full(3, -HALF), np.full(3, HALF))
+
+
+def search(tol, max_evals, **kwargs):
+    return run_adaptive(R1, V1_GUESS, R2, BODIES, TOF, tol, max_evals, BOUNDS, population=16, seed=3,
+                        telemetry=Telemetry(QUIET), **kwargs)
+
+
+def check_accounting(result, max_evals):
+    history = result["history"]
+    assert len(history) == result["generations"]
+    assert np.all(np.diff(history) <= 0)                     # meilleur f1 jamais dégradé
+    assert result["f1"] == history[-1]
+    assert result["unused_budget"] == max_evals - result["evaluations"]
+    # Le meilleur v1 retrouve son f1 sans élagage
+    _, f1, _, _ = closest_approach(R1, result["v1"][None], R2, BODIES, TOF, stop_early=False)
+    assert abs(f1[0] - result["f1"]) < 1e-6
+
+
+def test_adaptive_stops_at_tolerance():
+    result = search(1e4, 400)
+    assert result["reason"] == "tolérance"
+    assert result["f1"] <= 1e4 < result["history"][-2]       # atteinte à la dernière génération seulement
+    assert result["evaluations"] == 16 * result["generations"]
+    check_accounting(result, 400)
+
+
+def test_adaptive_stops_on_stagnation():
+    result = search(0.0, 4000, patience=3, min_improvement=0.5)
+    assert result["reason"] == "stagnation"
+    history = result["history"]
+    # Aucune des 3 dernières générations n'a divisé le meilleur f1 par 2
+    assert np.all(history[-3:] >= 0.5 * history[-4:-1])
+    assert result["evaluations"] == 16 * result["generations"] < 4000
+    check_accounting(result, 4000)
+
+
+def test_adaptive_budget_and_blind_comparison():
+    # Budget non multiple de la population : dernière génération incomplète
+    result = search(0.0, 40)
+    assert result["reason"] == "budget"
+    assert (result["generations"], result["evaluations"], result["unused_budget"]) == (3, 40, 0)
+    check_accounting(result, 40)
+
+    blind = run_monte_carlo(R1, V1_GUESS, R2, BODIES, 64, TOF, seed=3, chunk_size=16, workers=1, bounds=BOUNDS,
+                            telemetry=Telemetry(QUIET))
+    target = np.sort(blind["f1"])[2]                         # troisième meilleur tirage
+    n = blind_evaluations(blind["f1"], target)
+    assert blind["f1"][n - 1] <= target and np.all(blind["f1"][:n - 1] > target)
+    assert blind_evaluations(blind["f1"], 0.0) is None
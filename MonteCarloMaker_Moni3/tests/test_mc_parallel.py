@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pytest
+
+from body_set import BodySet
+from mc_parallel import run_monte_carlo
+from predefined_bodies import known_bodies
+from result_store import ResultStore
+from telemetry import METRICS_DTYPE, QUIET, Telemetry, load_metrics
+
+# Terre au centre et Lune fixe : champ non central, propagation numérique (intégrateur d'ensemble)
+BODIES = BodySet([[0.0, 0.0, 0.0], [3.84e8, 0.0, 0.0]], [known_bodies["earth"][0], known_bodies["moon"][0]],
+                 radius=[known_bodies["earth"][1], known_bodies["moon"][1]])
+R1 = np.array([6.6781363e6, 0.0, 0.0])
+V1_GUESS = np.array([0.0, 7.26e3, 2.64e3])
+R2 = np.array([-4.0e6, 5.5e6, 2.0e6])
+TOF = 2400.0
+ARRAYS = ("v1", "r2i", "f1", "t_min", "stop", "done")
+
+
+class InterruptAfter(Telemetry):
+    """Télémétrie silencieuse qui simule un Ctrl-C après `n_chunks` blocs terminés."""
+
+    def __init__(self, n_chunks):
+        super().__init__(QUIET)
+        self.n_chunks = n_chunks
+
+    def chunk_done(self, *args):
+        super().chunk_done(*args)
+        self.n_chunks -= 1
+        if self.n_chunks == 0:
+            raise KeyboardInterrupt
+
+
+def run(**kwargs):
+    kwargs.setdefault("telemetry", Telemetry(QUIET))
+    return run_monte_carlo(R1, V1_GUESS, R2, BODIES, 32, TOF, seed=7, chunk_size=8, spread=0.02, **kwargs)
+
+
+def test_run_monte_carlo_same_results_for_any_worker_count():
+    for sampler in ("random", "sobol"):
+        serial = run(workers=1, sampler=sampler)
+        pooled = run(workers=3, sampler=sampler)
+
+        assert serial["done"].all() and not serial["interrupted"]
+        assert np.isfinite(serial["f1"]).all()
+        for key in ARRAYS:
+            assert np.array_equal(serial[key], pooled[key]), (sampler, key)
+        for field in ("sample", "chunk", "f1", "t_min", "nfev", "steps", "success", "stop"):
+            assert np.array_equal(serial["metrics"][field], pooled["metrics"][field], equal_nan=True), field
+
+
+def test_run_monte_carlo_interrupted_keeps_finished_chunks():
+    full = run(workers=1)
+    for workers in (1, 2):
+        partial = run(workers=workers, telemetry=InterruptAfter(2))
+
+        assert partial["interrupted"]
+        done = partial["done"]
+        # Deux blocs entiers terminés (lesquels dépend de l'ordre d'achèvement avec un pool)
+        assert np.count_nonzero(done) == 16
+        assert np.unique(np.flatnonzero(done) // 8).size == 2
+        assert np.array_equal(partial["f1"][done], full["f1"][done])
+        assert np.array_equal(partial["v1"][done], full["v1"][done])
+        assert np.isnan(partial["f1"][~done]).all()
+
+
+def test_run_monte_carlo_resumes_from_store(tmp_path):
+    params = {"seed": 7, "chunk_size": 8, "n_samples": 32}
+    for sampler in ("random", "sobol"):
+        path = str(tmp_path / sampler)
+        full = run(workers=1, sampler=sampler)
+        partial = run(workers=2, sampler=sampler, telemetry=InterruptAfter(2), store=ResultStore(path, params))
+        assert partial["interrupted"]
+        chunks = sorted(os.listdir(path))
+
+        # Sans --resume, les blocs écrits ne sont ni écrasés ni effacés
+        with pytest.raises(ValueError):
+            ResultStore(path, params)
+        assert sorted(os.listdir(path)) == chunks
+
+        resumed = run(workers=1, sampler=sampler, store=ResultStore(path, params, resume=True))
+        assert resumed["resumed"] == 16 and not resumed["interrupted"]
+        for key in ARRAYS:
+            assert np.array_equal(resumed[key], full[key]), (sampler, key)
+
+    # Reprise d'un dossier inexistant : refusée, sans créer le dossier
+    with pytest.raises(ValueError):
+        ResultStore(str(tmp_path / "missing"), params, resume=True)
+    assert not (tmp_path / "missing").exists()
+
+
+def test_quiet_run_prints_nothing_and_writes_metrics(tmp_path, capfd):
+    path = str(tmp_path / "metrics.npy")
+    for workers in (1, 2):
+        result = run(workers=workers, telemetry=Telemetry(QUIET, metrics_path=path))
+        out, err = capfd.readouterr()
+        assert out == "" and err == ""
+
+        metrics = load_metrics(path)
+        assert metrics.dtype == METRICS_DTYPE and len(metrics) == 32
+        assert np.array_equal(metrics["sample"], np.arange(32))
+        assert np.array_equal(metrics["f1"], result["f1"])
+        assert np.array_equal(metrics["nfev"], result["metrics"]["nfev"]) and np.all(metrics["nfev"] > 0)
+        assert np.array_equal(metrics["stop"], result["stop"])
+
+    # Verbosité par défaut : barre de progression seulement, aucune ligne par échantillon
+    run(workers=1, telemetry=Telemetry())
+    out, err = capfd.readouterr()
+    assert "Trial" not in out + err and "Bloc" not in out + err
+
+
+def test_result_store_reads_chunk_indices_past_five_digits(tmp_path):
+    store = ResultStore(str(tmp_path), {"seed": 7})
+    children = np.random.SeedSequence(7).spawn(3)
+    for k in (0, 99999, 123456):
+        store.write_chunk(k, children[k % 3], f1=np.array([float(k)]))
+    chunks = store.completed()
+    assert sorted(chunks) == [0, 99999, 123456]
+    assert all(chunk["f1"][0] == k for k, chunk in chunks.items())
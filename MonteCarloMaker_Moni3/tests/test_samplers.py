@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from samplers import SAMPLERS, sample_box
+
+LOWER = np.array([-10.0, 5.0, 2.0])
+UPPER = np.array([10.0, 5.0, 3.0])  # axe y fixé (bornes égales)
+
+
+def test_sample_box_respects_bounds_and_fixed_axes():
+    for method in SAMPLERS:
+        x = sample_box(method, 64, LOWER, UPPER, seed=3)
+        assert x.shape == (64, 3), method
+        assert np.all(x >= LOWER) and np.all(x <= UPPER), method
+        assert np.all(x[:, 1] == 5.0), method
+        # Axes libres réellement échantillonnés sur toute leur largeur
+        assert np.ptp(x[:, 0]) > 15.0 and np.ptp(x[:, 2]) > 0.75, method
+
+
+def test_sample_box_reproducible_with_seed():
+    for method in SAMPLERS:
+        assert np.array_equal(sample_box(method, 32, LOWER, UPPER, seed=11),
+                              sample_box(method, 32, LOWER, UPPER, seed=11)), method
+        assert not np.array_equal(sample_box(method, 32, LOWER, UPPER, seed=11),
+                                  sample_box(method, 32, LOWER, UPPER, seed=12)), method
+
+
+def test_sample_box_all_axes_fixed_and_invalid_bounds():
+    assert np.array_equal(sample_box("sobol", 4, LOWER, LOWER), np.tile(LOWER, (4, 1)))
+    with pytest.raises(ValueError):
+        sample_box("random", 4, UPPER, LOWER)
+    with pytest.raises(ValueError):
+        sample_box("grid", 4, LOWER, UPPER)
@@ -0,0 +1,96 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from body_set import BodySet
+from kepler_propagator import propagate_kepler
+from mc_utils import BOUND, ESCAPE, IMPACT, closest_approach
+from predefined_bodies import known_bodies
+
+MU, RADIUS = known_bodies["earth"]
+# Terre au centre et Lune fixe : champ non central, propagation numérique (intégrateur d'ensemble)
+BODIES = BodySet([[0.0, 0.0, 0.0], [3.84e8, 0.0, 0.0]], [MU, known_bodies["moon"][0]],
+                 radius=[RADIUS, known_bodies["moon"][1]])
+R1 = np.array([6.6781363e6, 0.0, 0.0])
+V1_GUESS = np.array([0.0, 7.26e3, 2.64e3])
+R2 = np.array([-4.0e6, 5.5e6, 2.0e6])
+
+
+def apoapsis_samples(r_peri, r_apo=7e6):
+    """Départs à l'apogée (r_apo sur x) d'orbites de périgées r_peri, dans le plan (x, y)."""
+    a = (r_apo + np.asarray(r_peri)) / 2
+    v0 = np.zeros((len(a), 3))
+    v0[:, 1] = np.sqrt(MU * (2 / r_apo - 1 / a))
+    return np.tile([r_apo, 0.0, 0.0], (len(a), 1)), v0
+
+
+def ode(t, y):
+    return np.concatenate((y[3:], BODIES.accel(y[:3], t)))
+
+
+def test_impact_stops_at_the_surface():
+    # Périgées sous la surface (dont un rasant, traversé entre deux points de grille) et au-dessus ;
+    # la cible est derrière la Terre : la traversée du corps s'en rapprocherait davantage
+    r0, v0 = apoapsis_samples(RADIUS * np.array([0.5, 0.8, 0.99, 1.01, 1.1]))
+    impacts = np.array([True, True, True, False, False])
+    r_target = np.array([-6.5e6, 0.0, 1e5])
+    tof = 6000.0
+    t = np.linspace(0.0, tof, 60001)
+
+    for bodies in (BodySet([[0.0, 0.0, 0.0]], [MU], radius=[RADIUS]), BODIES):
+        r_min, d_min, t_min, info = closest_approach(r0, v0, r_target, bodies, tof)
+        _, d_through, _, _ = closest_approach(r0, v0, r_target, bodies, tof, stop_early=False)
+        assert np.array_equal(info["stop"] == IMPACT, impacts)
+        assert np.all(d_min[impacts] > d_through[impacts] + 1e5)
+        assert np.allclose(d_min[~impacts], d_through[~impacts], rtol=0, atol=1e-6)
+        for i in np.flatnonzero(impacts):
+            if bodies is BODIES:
+                r = solve_ivp(ode, (0.0, tof), np.concatenate((r0[i], v0[i])), method="DOP853", rtol=1e-12,
+                              atol=1e-6, t_eval=t).y[:3].T
+            else:
+                r, _ = propagate_kepler(np.repeat(r0[i:i + 1], len(t), 0), np.repeat(v0[i:i + 1], len(t), 0), t, MU)
+            before = np.linalg.norm(r, axis=1) >= RADIUS
+            entry = np.argmin(before)                       # premier point de la grille sous la surface
+            assert t_min[i] <= t[entry]
+            assert np.linalg.norm(r_min[i]) >= RADIUS * (1 - 1e-6)
+            assert d_min[i] <= np.linalg.norm(r[:entry] - r_target, axis=1).min() + 1e-6
+
+
+def test_escape_keeps_the_minimum_reached():
+    # Hyperbole en éloignement : la distance à la cible ne peut plus descendre sous d_min
+    v0 = np.array([[3e3, 1.15e4, 0.0], [0.0, 1.3e4, 2e3]])
+    stopped = closest_approach(R1, v0, R2, BODIES, 2e4)
+    full = closest_approach(R1, v0, R2, BODIES, 2e4, stop_early=False)
+    assert np.all(stopped[3]["stop"] == ESCAPE)
+    assert np.all(stopped[3]["steps"] < full[3]["steps"])
+    assert np.allclose(stopped[1], full[1], rtol=0, atol=1e-9)
+    assert np.allclose(stopped[2], full[2], rtol=0, atol=1e-9)
+
+
+def test_bound_only_drops_samples_worse_than_best():
+    # Un échantillon à la fois : le seuil est alors `best` lui-même, pas le meilleur coût de l'ensemble
+    rng = np.random.default_rng(5)
+    v0 = V1_GUESS * (1 + 0.05 * rng.standard_normal((32, 3)))
+    best = 3e5
+    stop, d_min, d_full = (np.empty(len(v0)) for _ in range(3))
+    for i in range(len(v0)):
+        _, d_min[i:i + 1], _, info = closest_approach(R1, v0[i:i + 1], R2, BODIES, 2400.0, best=best)
+        _, d_full[i:i + 1], _, _ = closest_approach(R1, v0[i:i + 1], R2, BODIES, 2400.0, stop_early=False)
+        stop[i] = info["stop"][0]
+    bound = stop == BOUND
+    assert np.any(bound) and np.any(d_full < best)
+    assert np.all(d_full[bound] > best)
+    assert np.all(d_min[bound] >= d_full[bound] - 1e-6)
+    assert np.allclose(d_min[stop == 0], d_full[stop == 0], rtol=0, atol=1e-6)
+
+
+def test_pruning_keeps_the_best_sample():
+    rng = np.random.default_rng(11)
+    v0 = V1_GUESS * (1 + 0.02 * rng.standard_normal((64, 3)))
+    _, d_min, t_min, info = closest_approach(R1, v0, R2, BODIES, 2400.0)
+    _, d_full, t_full, _ = closest_approach(R1, v0, R2, BODIES, 2400.0, stop_early=False)
+    assert np.any(info["stop"] != 0)
+    i = np.argmin(d_full)
+    assert np.argmin(d_min) == i
+    assert abs(d_min[i] - d_full[i]) < 1e-6 and abs(t_min[i] - t_full[i]) < 1e-9
+    # Échantillon arrêté : son coût affiché n'est jamais meilleur que son coût réel
+    assert np.all(d_min >= d_full - 1e-6)
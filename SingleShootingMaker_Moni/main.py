@@ -1,4 +1,4 @@
-from singleshooting_utils import single_shooting, write_docks_file, parse_isot
+from singleshooting_utils import single_shooting, multiple_shooting, batch_single_shooting, write_docks_file, parse_isot
 from predefined_bodies import known_bodies
 import numpy as np
 
@@ -18,20 +18,41 @@ body_selected = bodies_names[body_index]
 mu = known_bodies[body_selected][0]
 print(f"Body selected: {body_selected}\n")
 
-# 3. Paramètres d'estimation et cible
-r0_guess = np.array([float(x) for x in input("Enter initial guess position r0 [m] (x y z): ").split()])
-v0_guess = np.array([float(x) for x in input("Enter initial guess velocity v0 [m/s] (vx vy vz): ").split()])
-rf_target = np.array([float(x) for x in input("Enter target position rf [m] (x y z): ").split()])
-t_final_hours = float(input("Enter time of flight [hours]: "))
-t_span = [0, t_final_hours * 3600]
+# 3. Mode batch : un cas par ligne "r0 (3) v0 (3) rf (3) [m, m/s] tof [hours]"
+cases_file = input("Enter a cases file for batch mode [leave empty for a single case]: ")
 
-# 4. Single Shooting
-r0_sol, v0_sol = single_shooting(r0_guess, v0_guess, rf_target, t_span, mu)
+if cases_file:
+    cases = np.loadtxt(cases_file, ndmin=2)
+    r0_sol, v0_sol, info = batch_single_shooting(cases[:, 0:3], cases[:, 3:6], cases[:, 6:9], cases[:, 9] * 3600,
+                                                 mu, full_output=True)
+    for i in np.flatnonzero(~info["converged"]):
+        reason = "stagnated" if info["stagnated"][i] else "maximum iterations reached"
+        print(f"Case {i}: not converged ({reason}), residual {info['residual'][i]:.3e} m")
+    write_docks_file(f"InitCond_SingleShooting_{body_selected}_batch.txt", t1_str, r0_sol, v0_sol)
+else:
+    # Paramètres d'estimation et cible
+    r0_guess = np.array([float(x) for x in input("Enter initial guess position r0 [m] (x y z): ").split()])
+    v0_guess = np.array([float(x) for x in input("Enter initial guess velocity v0 [m/s] (vx vy vz): ").split()])
+    rf_target = np.array([float(x) for x in input("Enter target position rf [m] (x y z): ").split()])
+    t_final_hours = float(input("Enter time of flight [hours]: "))
+    t_span = [0, t_final_hours * 3600]
+    segments = int(input("Enter number of shooting segments (1 = single shooting) [default: 1]: ") or 1)
 
-print("\nSolution found:")
-print("r0 (m):", r0_sol)
-print("v0 (m/s):", v0_sol)
+    # Single / Multiple Shooting
+    if segments > 1:
+        r0_sol, v0_sol, info = multiple_shooting(r0_guess, v0_guess, rf_target, t_span, mu, segments=segments,
+                                                 full_output=True)
+        print(f"Iterations: {info['iterations']} ({info['propagations']} propagations), "
+              f"residual: {info['residual']:.3e} m, status: {info['status']}")
+    else:
+        r0_sol, v0_sol, info = single_shooting(r0_guess, v0_guess, rf_target, t_span, mu, full_output=True)
+        print(f"Iterations: {info['iterations']} ({info['propagations']} propagations), "
+              f"residual: {info['residual']:.3e} m, cond(drf/dv0): {info['cond']:.3e}, status: {info['status']}")
 
-# 5. Génération fichier DOCKS
-write_docks_file(f"InitCond_SingleShooting_{body_selected}.txt", t1_str, r0_sol, v0_sol)
+    print("\nSolution found:")
+    print("r0 (m):", r0_sol)
+    print("v0 (m/s):", v0_sol)
+
+    # Génération fichier DOCKS
+    write_docks_file(f"InitCond_SingleShooting_{body_selected}.txt", t1_str, r0_sol, v0_sol)
 print("\n=== End of script ===")
@@ -1,51 +1,438 @@
+import os
+import sys
+
 import numpy as np
-from scipy.integrate import solve_ivp
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from astropy import units as u
 
-def two_body_equations(t, y, mu):
-    """Équations du mouvement à deux corps"""
+# lazy_import, kepler_propagator et ensemble_propagator sont partagés par tous les outils (dossier common/)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "common")))
+
+from lazy_import import lazy_import
+from kepler_propagator import kepler_stm, propagate_kepler
+from ensemble_propagator import propagate_ensemble
+
+# scipy n'est importé qu'à la première propagation
+scipy_integrate = lazy_import("scipy.integrate")
+scipy_sparse = lazy_import("scipy.sparse")
+scipy_sparse_linalg = lazy_import("scipy.sparse.linalg")
+
+def two_body_equations(t, y, mu, perturbation=None):
+    """Équations du mouvement à deux corps (+ accélération supplémentaire a(t, r, v) optionnelle)"""
     r = y[:3]
     v = y[3:]
     r_norm = np.linalg.norm(r)
     a = -mu * r / r_norm**3
+    if perturbation is not None:
+        a = a + perturbation(t, r, v)
     dydt = np.concatenate((v, a))
     return dydt
 
-def single_shooting(r0_guess, v0_guess, rf_target, t_span, mu, tol=1e-3, max_iter=50):
+def _perturbation_partials(perturbation, t, r, v):
+    """
+    Accélération de perturbation a(t, r, v) et ses dérivées da/dr, da/dv (3x3) par différences finies centrées.
+    """
+    h_r = 1e-6 * np.linalg.norm(r)
+    h_v = 1e-6 * max(np.linalg.norm(v), 1.0)
+    da_dr = np.empty((3, 3))
+    da_dv = np.empty((3, 3))
+    for k in range(3):
+        e = np.zeros(3)
+        e[k] = h_r
+        da_dr[:, k] = (perturbation(t, r + e, v) - perturbation(t, r - e, v)) / (2 * h_r)
+        e[k] = h_v
+        da_dv[:, k] = (perturbation(t, r, v + e) - perturbation(t, r, v - e)) / (2 * h_v)
+    return perturbation(t, r, v), da_dr, da_dv
+
+def two_body_stm_equations(t, y, mu, perturbation=None):
+    """
+    Équations à deux corps + équations variationnelles.
+    y = [r (3), v (3), Phi (36, matrice de transition 6x6 aplatie ligne par ligne)]
+    dPhi/dt = A Phi, avec A = [[0, I], [G, 0]] et G = mu/r^3 (3 r r^T / r^2 - I)
+    perturbation : accélération supplémentaire a(t, r, v) (m/s²) ; ses dérivées par rapport à r et v
+                   sont ajoutées à A par différences finies centrées
+    """
+    dY = stacked_stm_equations(np.atleast_1d(t), y[None, :], mu, perturbation)
+    return dY[0]
+
+def stacked_stm_equations(t, Y, mu, perturbation=None):
+    """
+    Équations variationnelles de N cas empilés, Y (N, 42) -> dY/dt (N, 42), t (N,) : un instant par cas.
+    Le corps central et les équations variationnelles sont calculés en tableaux diffusés ;
+    seule la perturbation (définie sur un état (3,)) est évaluée cas par cas.
+    """
+    r = Y[:, :3]
+    v = Y[:, 3:6]
+    phi = Y[:, 6:].reshape(-1, 6, 6)
+    r_norm = np.linalg.norm(r, axis=1)[:, None]
+    a = -mu * r / r_norm**3
+    G = (mu / r_norm**3)[:, :, None] * (3.0 * r[:, :, None] * r[:, None, :] / (r_norm**2)[:, :, None] - np.eye(3))
+    H = np.zeros_like(G)
+    if perturbation is not None:
+        for i in range(len(Y)):
+            a_p, da_dr, da_dv = _perturbation_partials(perturbation, t[i], r[i], v[i])
+            a[i] += a_p
+            G[i] += da_dr
+            H[i] = da_dv
+    dphi = np.empty_like(phi)
+    dphi[:, :3] = phi[:, 3:]
+    dphi[:, 3:] = G @ phi[:, :3] + H @ phi[:, 3:]
+    return np.hstack((v, a, dphi.reshape(-1, 36)))
+
+def propagate_with_stm(r0, v0, t_span, mu, perturbation=None):
+    """
+    Propage (r0, v0) sur t_span avec la matrice de transition. Retourne (rf, vf, Phi 6x6).
+
+    Sans perturbation (corps central seul), la solution analytique en variables universelles
+    (`kepler_propagator.kepler_stm`) est utilisée ; sinon, intégration numérique (solve_ivp).
+    """
+    if perturbation is None:
+        return kepler_stm(r0, v0, t_span[1] - t_span[0], mu)
+    y0 = np.concatenate((r0, v0, np.eye(6).ravel()))
+    sol = scipy_integrate.solve_ivp(two_body_stm_equations, t_span, y0, args=(mu, perturbation),
+                                    rtol=1e-9, atol=1e-12)
+    yf = sol.y[:, -1]
+    return yf[:3], yf[3:6], yf[6:].reshape(6, 6)
+
+def _report_status(converged, stagnated, iterations, residual, detail=""):
+    """Affiche l'issue de la boucle de Newton et retourne son statut ("converged", "stagnated" ou "max_iter")."""
+    if converged:
+        print(f"Converged in {iterations} iterations{detail}.")
+        return "converged"
+    if stagnated:
+        print(f"Warning: Newton stagnated after {iterations} iterations (no step reduces the error, "
+              f"residual {residual:.3e} m), solution may be inaccurate.")
+        return "stagnated"
+    print("Warning: maximum iterations reached, solution may be inaccurate.")
+    return "max_iter"
+
+def single_shooting(r0_guess, v0_guess, rf_target, t_span, mu, tol=1e-3, max_iter=50, full_output=False,
+                    perturbation=None):
     """
     Méthode de single shooting pour trouver v0 (et r0 si nécessaire) qui atteint rf_target
     r0_guess, v0_guess : estimation initiale
     rf_target : position finale désirée
     t_span : [t0, tf]
     mu : paramètre gravitationnel
+    full_output : si True, retourne aussi un dictionnaire de diagnostic
+    perturbation : accélération supplémentaire a(t, r, v) ; None = corps central seul (propagation analytique)
+
+    Correction de Newton sur v0 avec le bloc drf/dv0 de la matrice de transition (intégrée
+    avec l'état), et recherche linéaire : le pas est divisé par 2 tant que l'erreur ne diminue pas.
+    Diagnostic : iterations, propagations, residual (m), cond (conditionnement de drf/dv0), converged,
+    status ("converged", "stagnated" si aucun pas ne réduit plus l'erreur, "max_iter").
     """
-    r0 = np.array(r0_guess)
-    v0 = np.array(v0_guess)
-    
-    for i in range(max_iter):
-        y0 = np.concatenate((r0, v0))
-        sol = solve_ivp(two_body_equations, t_span, y0, args=(mu,), rtol=1e-9, atol=1e-12)
-        rf_calc = sol.y[:3, -1]
-        error = rf_target - rf_calc
-        if np.linalg.norm(error) < tol:
-            print(f"Converged in {i+1} iterations.")
-            return r0, v0
-        # Ajustement simple : gradient approximé par différence finie
-        v0 += 0.1 * error / (t_span[1]-t_span[0])
-    
-    print("Warning: maximum iterations reached, solution may be inaccurate.")
+    r0 = np.array(r0_guess, dtype=float)
+    v0 = np.array(v0_guess, dtype=float)
+    rf_target = np.asarray(rf_target, dtype=float)
+
+    rf_calc, _, phi = propagate_with_stm(r0, v0, t_span, mu, perturbation)
+    error = rf_target - rf_calc
+    residual = np.linalg.norm(error)
+    propagations = 1
+    iterations = 0
+    stagnated = False
+
+    while residual >= tol and iterations < max_iter:
+        J = phi[:3, 3:]
+        dv = np.linalg.lstsq(J, error, rcond=None)[0]
+
+        # Recherche linéaire : pas complet de Newton, puis divisé par 2 tant que l'erreur ne diminue pas
+        alpha = 1.0
+        for _ in range(20):
+            v_trial = v0 + alpha * dv
+            rf_trial, _, phi_trial = propagate_with_stm(r0, v_trial, t_span, mu, perturbation)
+            propagations += 1
+            error_trial = rf_target - rf_trial
+            if np.linalg.norm(error_trial) < residual:
+                break
+            alpha *= 0.5
+        else:
+            stagnated = True  # aucun pas ne réduit l'erreur : la méthode stagne
+            break
+        v0, phi, error = v_trial, phi_trial, error_trial
+        residual = np.linalg.norm(error)
+        iterations += 1
+
+    converged = residual < tol
+    status = _report_status(converged, stagnated, iterations, residual)
+
+    if full_output:
+        info = {
+            "iterations": iterations,
+            "propagations": propagations,
+            "residual": float(residual),
+            "cond": float(np.linalg.cond(phi[:3, 3:])),
+            "converged": bool(converged),
+            "status": status,
+        }
+        return r0, v0, info
+    return r0, v0
+
+def propagate_batch_with_stm(r0, v0, tof, mu, perturbation=None):
+    """
+    Propage N cas (r0, v0 : (N, 3), tof : (N,) en s) avec leur matrice de transition.
+    Retourne (rf (N, 3), vf (N, 3), Phi (N, 6, 6)).
+
+    Sans perturbation : un seul appel analytique vectorisé. Avec perturbation : les N systèmes
+    (N, 42) avancent ensemble dans l'intégrateur DOP853 vectorisé (`ensemble_propagator`),
+    chaque cas avec sa propre durée, son propre pas et sa propre norme d'erreur.
+    """
+    if perturbation is None:
+        return kepler_stm(r0, v0, tof, mu)
+    N = len(tof)
+    Y0 = np.hstack((r0, v0, np.tile(np.eye(6).ravel(), (N, 1))))
+    Yf, _ = propagate_ensemble(lambda t, Y: stacked_stm_equations(t, Y, mu, perturbation), 0.0, Y0, tof,
+                               rtol=1e-9, atol=1e-12)
+    return Yf[:, :3], Yf[:, 3:6], Yf[:, 6:].reshape(N, 6, 6)
+
+def batch_single_shooting(r0_guess, v0_guess, rf_target, tof, mu, tol=1e-3, max_iter=50, full_output=False,
+                          perturbation=None):
+    """
+    Single shooting sur N cas à la fois.
+    r0_guess, v0_guess, rf_target : (N, 3) ; tof : durée de vol (s), scalaire ou (N,)
+
+    Les cas actifs sont propagés ensemble (`propagate_batch_with_stm`) et corrigés par Newton en
+    parallèle, chacun avec sa propre recherche linéaire. Un cas sort de l'ensemble actif dès qu'il
+    converge, qu'il atteint max_iter ou qu'il stagne.
+    Diagnostic (full_output) : iterations (N,), propagations (nombre d'appels), residual (N,) en m,
+    converged (N,), stagnated (N,).
+    """
+    r0 = np.array(r0_guess, dtype=float).reshape(-1, 3)
+    v0 = np.array(v0_guess, dtype=float).reshape(-1, 3)
+    rf_target = np.asarray(rf_target, dtype=float).reshape(-1, 3)
+    N = len(r0)
+    tof = np.broadcast_to(np.asarray(tof, dtype=float), (N,)).copy()
+
+    rf, _, phi = propagate_batch_with_stm(r0, v0, tof, mu, perturbation)
+    error = rf_target - rf
+    residual = np.linalg.norm(error, axis=1)
+    iterations = np.zeros(N, dtype=int)
+    propagations = 1
+    stagnated = np.zeros(N, dtype=bool)
+    active = np.flatnonzero(~(residual < tol))
+
+    while active.size:
+        dv = np.einsum("nij,nj->ni", np.linalg.pinv(phi[active][:, :3, 3:]), error[active])
+
+        # Recherche linéaire en parallèle : les cas dont l'erreur diminue acceptent leur pas,
+        # les autres divisent le leur par 2 et sont repropagés ensemble
+        alpha = np.ones(len(active))
+        accepted = np.zeros(len(active), dtype=bool)
+        pending = np.arange(len(active))
+        for _ in range(20):
+            idx = active[pending]
+            v_trial = v0[idx] + alpha[pending, None] * dv[pending]
+            rf_trial, _, phi_trial = propagate_batch_with_stm(r0[idx], v_trial, tof[idx], mu, perturbation)
+            propagations += 1
+            error_trial = rf_target[idx] - rf_trial
+            residual_trial = np.linalg.norm(error_trial, axis=1)
+            ok = residual_trial < residual[idx]
+            v0[idx[ok]], phi[idx[ok]] = v_trial[ok], phi_trial[ok]
+            error[idx[ok]], residual[idx[ok]] = error_trial[ok], residual_trial[ok]
+            accepted[pending[ok]] = True
+            pending = pending[~ok]
+            if not pending.size:
+                break
+            alpha[pending] *= 0.5
+
+        # Les cas sans pas acceptable stagnent et quittent l'ensemble actif
+        iterations[active[accepted]] += 1
+        stagnated[active[~accepted]] = True
+        active = active[accepted]
+        active = active[(residual[active] >= tol) & (iterations[active] < max_iter)]
+
+    converged = residual < tol
+    print(f"Converged: {np.count_nonzero(converged)}/{N} cases "
+          f"(max {iterations.max(initial=0)} iterations, {propagations} batch propagations).")
+    if stagnated.any():
+        print(f"Warning: {np.count_nonzero(stagnated)} case(s) stagnated (no step reduces the error).")
+
+    if full_output:
+        info = {
+            "iterations": iterations,
+            "propagations": propagations,
+            "residual": residual,
+            "converged": converged,
+            "stagnated": stagnated,
+        }
+        return r0, v0, info
+    return r0, v0
+
+def _propagate_segment(task):
+    """Propage un segment (tâche du pool de processus). Retourne (rf, vf, Phi)."""
+    r, v, t_span, mu, perturbation = task
+    return propagate_with_stm(r, v, t_span, mu, perturbation)
+
+def _propagate_segments(nodes, t_nodes, mu, perturbation, pool):
+    """
+    Propage chaque segment depuis son nœud. nodes : (K, 6). Retourne (états finaux (K, 6), Phi (K, 6, 6)).
+    Sans perturbation, tous les segments sont propagés en un seul appel analytique vectorisé.
+    """
+    dt = np.diff(t_nodes)
+    if perturbation is None:
+        rf, vf, phi = kepler_stm(nodes[:, :3], nodes[:, 3:], dt, mu)
+        return np.hstack((rf, vf)), phi
+    tasks = [(nodes[k, :3], nodes[k, 3:], [t_nodes[k], t_nodes[k + 1]], mu, perturbation) for k in range(len(nodes))]
+    results = list(pool.map(_propagate_segment, tasks)) if pool is not None else [_propagate_segment(t) for t in tasks]
+    return (np.array([np.concatenate((rf, vf)) for rf, vf, _ in results]),
+            np.array([phi for _, _, phi in results]))
+
+def _chain_nodes(r0, v0, t_nodes, mu, perturbation):
+    """
+    Nœuds continus (K, 6) obtenus en propageant (r0, v0) d'un seul tenant jusqu'à chaque date de nœud,
+    sans matrice de transition : une propagation de l'arc entier (analytique vectorisée sans perturbation).
+    """
+    t_start = t_nodes[:-1]
+    if perturbation is None:
+        r, v = propagate_kepler(r0, v0, t_start - t_start[0], mu)
+        return np.hstack((r, v))
+    y0 = np.concatenate((r0, v0))
+    if len(t_start) == 1:
+        return y0[None, :]
+    sol = scipy_integrate.solve_ivp(two_body_equations, [t_start[0], t_start[-1]], y0, t_eval=t_start,
+                                    args=(mu, perturbation), rtol=1e-9, atol=1e-12)
+    return sol.y.T
+
+def _shooting_residuals(nodes, ends, rf_target):
+    """Défauts de continuité (K-1, 6) puis erreur de position finale (3)."""
+    return np.concatenate(((ends[:-1] - nodes[1:]).ravel(), ends[-1, :3] - rf_target))
+
+def _shooting_jacobian(phi):
+    """
+    Jacobien creux des résidus de `_shooting_residuals` par rapport aux inconnues (v0, nœuds 1..K-1).
+    Bidiagonal par blocs : Phi de chaque segment (bloc drf/dv0 pour le premier), et -I pour le nœud suivant.
+    """
+    K = len(phi)
+    n = 3 + 6 * (K - 1)
+    rows, cols, vals = [], [], []
+    def block(r, c, m):
+        i, j = np.indices(m.shape).reshape(2, -1)
+        rows.append(r + i)
+        cols.append(c + j)
+        vals.append(m.ravel())
+    for k in range(K):
+        r = 6 * k
+        m = phi[k] if k < K - 1 else phi[k][:3]
+        if k == 0:
+            block(r, 0, m[:, 3:])                    # dépendance à v0 seul (r0 fixé)
+        else:
+            block(r, 3 + 6 * (k - 1), m)
+        if k < K - 1:
+            block(r, 3 + 6 * k, -np.eye(6))
+    return scipy_sparse.csc_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                                   shape=(n, n))
+
+def multiple_shooting(r0_guess, v0_guess, rf_target, t_span, mu, segments=8, tol=1e-3, max_iter=50,
+                      full_output=False, perturbation=None, workers=None):
+    """
+    Méthode de multiple shooting : t_span est découpé en `segments` arcs propagés indépendamment,
+    et les contraintes de continuité aux nœuds + la position finale sont résolues ensemble par Newton.
+
+    Inconnues : v0 et les états (r, v) des nœuds intermédiaires, 3 + 6 (K - 1) valeurs.
+    Le jacobien est bidiagonal par blocs (Phi de chaque segment, -I) : il est résolu en creux
+    (scipy.sparse), avec la même recherche linéaire que `single_shooting`.
+    Les segments sont propagés sur un pool de processus (workers : None = tous les cœurs, 1 = local),
+    sauf sans perturbation où la propagation analytique est vectorisée sur tous les segments.
+    `perturbation` doit alors être une fonction de module (sérialisable par pickle).
+
+    Retourne (r0, v0), ou (r0, v0, info) avec full_output (mêmes clés que `single_shooting`,
+    plus segments et nodes). `propagations` compte chaque propagation de l'ensemble des segments
+    (avec STM) et chaque propagation de l'arc entier sans STM (nœuds enchaînés).
+    """
+    r0 = np.array(r0_guess, dtype=float)
+    v0 = np.array(v0_guess, dtype=float)
+    rf_target = np.asarray(rf_target, dtype=float)
+    K = segments
+    t_nodes = np.linspace(t_span[0], t_span[1], K + 1)
+    dt_seg = t_nodes[1] - t_nodes[0]
+
+    # Nœuds initiaux : propagation de l'estimation initiale jusqu'à chaque nœud
+    nodes = _chain_nodes(r0, v0, t_nodes, mu, perturbation)
+
+    def unknowns_to_nodes(x):
+        out = np.empty((K, 6))
+        out[0, :3], out[0, 3:] = r0, x[:3]
+        out[1:] = x[3:].reshape(K - 1, 6)
+        return out
+
+    # Les défauts de vitesse sont ramenés en mètres (× durée d'un segment) pour le critère d'arrêt
+    scale = np.concatenate((np.tile(np.r_[np.ones(3), np.full(3, dt_seg)], K - 1), np.ones(3)))
+
+    pool = None
+    if perturbation is not None and workers != 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        x = np.concatenate((v0, nodes[1:].ravel()))
+        ends, phi = _propagate_segments(nodes, t_nodes, mu, perturbation, pool)
+        F = _shooting_residuals(nodes, ends, rf_target)
+        residual = np.linalg.norm(F * scale)
+        propagations = 2
+        iterations = 0
+        stagnated = False
+        while residual >= tol and iterations < max_iter:
+            dx = scipy_sparse_linalg.spsolve(_shooting_jacobian(phi), -F)
+
+            # Recherche linéaire. Pour chaque longueur de pas, on essaie d'abord le pas de Newton sur tous
+            # les nœuds, puis (si l'erreur ne diminue pas) les nœuds repropagés depuis le nouveau v0 : un grand
+            # décalage le long de l'orbite, extrapolé en ligne droite, crée sinon de gros défauts de continuité.
+            # Ces nœuds enchaînés sont obtenus sans STM, puis les segments sont propagés en parallèle.
+            alpha = 1.0
+            for _ in range(20):
+                x_trial = x + alpha * dx
+                nodes_trial = unknowns_to_nodes(x_trial)
+                ends_trial, phi_trial = _propagate_segments(nodes_trial, t_nodes, mu, perturbation, pool)
+                propagations += 1
+                F_trial = _shooting_residuals(nodes_trial, ends_trial, rf_target)
+                if np.linalg.norm(F_trial * scale) < residual:
+                    break
+                nodes_trial = _chain_nodes(r0, x_trial[:3], t_nodes, mu, perturbation)
+                x_trial = np.concatenate((x_trial[:3], nodes_trial[1:].ravel()))
+                ends_trial, phi_trial = _propagate_segments(nodes_trial, t_nodes, mu, perturbation, pool)
+                propagations += 2
+                F_trial = _shooting_residuals(nodes_trial, ends_trial, rf_target)
+                if np.linalg.norm(F_trial * scale) < residual:
+                    break
+                alpha *= 0.5
+            else:
+                stagnated = True  # aucun pas ne réduit l'erreur : la méthode stagne
+                break
+            x, phi, F = x_trial, phi_trial, F_trial
+            residual = np.linalg.norm(F * scale)
+            iterations += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    v0 = x[:3]
+    converged = residual < tol
+    status = _report_status(converged, stagnated, iterations, residual, detail=f" ({K} segments)")
+
+    if full_output:
+        info = {
+            "iterations": iterations,
+            "propagations": propagations,
+            "residual": float(residual),
+            "segments": K,
+            "nodes": unknowns_to_nodes(x),
+            "converged": bool(converged),
+            "status": status,
+        }
+        return r0, v0, info
     return r0, v0
 
 def write_docks_file(filename, date_str, r, v):
     """
     Écrit un fichier de conditions initiales compatible DOCKS
+    r, v : (3,) pour une ligne, ou (N, 3) pour N lignes ; date_str : une date, ou une par ligne
     """
-    r_km = r / 1000
-    v_kms = v / 1000
-    line = f"{date_str}\t" + "\t".join(f"{x:.15e}" for x in r_km) + "\t" + "\t".join(f"{x:.15e}" for x in v_kms)
+    r_km = np.atleast_2d(r) / 1000
+    v_kms = np.atleast_2d(v) / 1000
+    dates = [date_str] * len(r_km) if isinstance(date_str, str) else list(date_str)
+    lines = [f"{d}\t" + "\t".join(f"{x:.15e}" for x in rk) + "\t" + "\t".join(f"{x:.15e}" for x in vk)
+             for d, rk, vk in zip(dates, r_km, v_kms)]
     with open(filename, "w") as f:
-        f.write(line)
+        f.write("\n".join(lines))
     print(f"✅ Fichier DOCKS généré : {filename}")
 
 def parse_isot(date_str):
@@ -0,0 +1,36 @@
+import numpy as np
+from singleshooting_utils import batch_single_shooting, propagate_with_stm, single_shooting
+
+MU_EARTH = 3.986004418e14  # m^3/s^2
+
+
+def drag_like(t, r, v):
+    """Petite accélération opposée à la vitesse, fonction de module."""
+    return -1e-4 * v / np.linalg.norm(v)
+
+
+def cases(n=5, seed=1):
+    """Cas de durées différentes (LEO à GEO) : la cible est atteinte depuis v0 + 5 m/s."""
+    rng = np.random.default_rng(seed)
+    radius = rng.uniform(7.0e6, 4.2e7, n)
+    r0 = radius[:, None] * np.array([1.0, 0.0, 0.0])
+    v0 = np.sqrt(MU_EARTH / radius)[:, None] * np.array([0.0, 0.98, 0.2])
+    tof = rng.uniform(0.1, 0.4, n) * 2 * np.pi * np.sqrt(radius**3 / MU_EARTH)
+    rf = np.array([propagate_with_stm(r0[k], v0[k] + 5.0, [0.0, tof[k]], MU_EARTH, drag_like)[0] for k in range(n)])
+    return r0, v0, rf, tof
+
+
+def test_batch_single_shooting_matches_separate_calls():
+    r0, v0, rf, tof = cases()
+
+    _, v_batch, info = batch_single_shooting(r0, v0, rf, tof, MU_EARTH, full_output=True, perturbation=drag_like)
+
+    assert info["converged"].all() and not info["stagnated"].any()
+    for k in range(len(tof)):
+        _, v_single, info_k = single_shooting(r0[k], v0[k], rf[k], [0.0, tof[k]], MU_EARTH, full_output=True,
+                                              perturbation=drag_like)
+        assert info_k["converged"]
+        # Intégrateurs différents (DOP853 par cas contre solve_ivp) : écart au niveau de leur tolérance
+        assert np.allclose(v_batch[k], v_single, rtol=0, atol=1e-4)
+        r_end, _, _ = propagate_with_stm(r0[k], v_batch[k], [0.0, tof[k]], MU_EARTH, drag_like)
+        assert np.linalg.norm(r_end - rf[k]) < 0.1
@@ -0,0 +1,80 @@
+import numpy as np
+from singleshooting_utils import (_propagate_segments, _shooting_jacobian, _shooting_residuals,
+                                  multiple_shooting, propagate_with_stm)
+
+MU_EARTH = 3.986004418e14  # m^3/s^2
+
+
+def j2_like(t, r, v):
+    """Petite perturbation radiale en 1/r^4, fonction de module (sérialisable par pickle)."""
+    rn = np.linalg.norm(r)
+    return -1e-3 * (7.0e6 / rn)**4 * r / rn
+
+
+def test_multiple_shooting_kepler_nodes_continuous_and_target_reached():
+    r0 = np.array([7.0e6, 0.0, 0.0])
+    v0 = np.array([0.0, 7.8e3, 1.0e3])
+    t_span = [0.0, 9000.0]  # environ 1,5 révolution
+    rf, _, _ = propagate_with_stm(r0, v0, t_span, MU_EARTH)
+
+    _, v0_sol, info = multiple_shooting(r0, v0 + np.array([40.0, -25.0, 10.0]), rf, t_span, MU_EARTH,
+                                        segments=6, full_output=True)
+
+    assert info["converged"] and info["status"] == "converged"
+    assert np.allclose(v0_sol, v0, rtol=0, atol=1e-5)
+    nodes = info["nodes"]
+    t_nodes = np.linspace(*t_span, 7)
+    for k in range(6):
+        r_end, v_end, _ = propagate_with_stm(nodes[k, :3], nodes[k, 3:], t_nodes[k:k + 2], MU_EARTH)
+        if k < 5:
+            assert np.allclose(r_end, nodes[k + 1, :3], rtol=0, atol=1e-3)
+            assert np.allclose(v_end, nodes[k + 1, 3:], rtol=0, atol=1e-6)
+        else:
+            assert np.linalg.norm(r_end - rf) < 1e-3
+
+
+def test_multiple_shooting_with_perturbation_reaches_target():
+    r0 = np.array([7.0e6, 0.0, 0.0])
+    v_guess = np.array([0.0, 7.8e3, 1.0e3])
+    t_span = [0.0, 6000.0]
+    rf, _, _ = propagate_with_stm(r0, v_guess + 5.0, t_span, MU_EARTH, perturbation=j2_like)
+
+    _, v0_sol, info = multiple_shooting(r0, v_guess, rf, t_span, MU_EARTH, segments=4, full_output=True,
+                                        perturbation=j2_like, workers=1)
+
+    assert info["converged"]
+    # Écart dû seulement à la tolérance d'intégration (arc entier contre segments)
+    assert np.allclose(v0_sol, v_guess + 5.0, rtol=0, atol=1e-4)
+    r_end, _, _ = propagate_with_stm(r0, v0_sol, t_span, MU_EARTH, perturbation=j2_like)
+    assert np.linalg.norm(r_end - rf) < 0.1
+
+
+def test_shooting_jacobian_matches_finite_differences():
+    K = 4
+    t_nodes = np.linspace(0.0, 6000.0, K + 1)
+    rng = np.random.default_rng(0)
+    r0 = np.array([7.0e6, 0.0, 0.0])
+    rf_target = np.array([-3.0e6, 6.0e6, 1.0e6])
+    # Nœuds volontairement discontinus (état de Newton intermédiaire)
+    nodes = np.array([np.concatenate(propagate_with_stm(r0, [0.0, 7.8e3, 1.0e3], [0.0, t], MU_EARTH)[:2])
+                      for t in t_nodes[:-1]])
+    nodes += np.r_[np.full(3, 1e3), np.full(3, 1.0)] * rng.normal(size=(K, 6))
+    nodes[0, :3] = r0
+
+    def F(x):
+        nodes_x = np.vstack((np.r_[r0, x[:3]], x[3:].reshape(K - 1, 6)))
+        ends, _ = _propagate_segments(nodes_x, t_nodes, MU_EARTH, None, None)
+        return _shooting_residuals(nodes_x, ends, rf_target)
+
+    x = np.concatenate((nodes[0, 3:], nodes[1:].ravel()))
+    _, phi = _propagate_segments(nodes, t_nodes, MU_EARTH, None, None)
+    J = _shooting_jacobian(phi).toarray()
+
+    J_fd = np.empty_like(J)
+    for j in range(len(x)):
+        h = 1e-3 if (j < 3 or (j - 3) % 6 >= 3) else 1.0  # mm/s en vitesse, m en position
+        e = np.zeros(len(x))
+        e[j] = h
+        J_fd[:, j] = (F(x + e) - F(x - e)) / (2 * h)
+    assert J.shape == (3 + 6 * (K - 1),) * 2
+    assert np.allclose(J, J_fd, rtol=1e-5, atol=1e-7)
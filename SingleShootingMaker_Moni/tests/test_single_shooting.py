@@ -0,0 +1,35 @@
+import numpy as np
+from singleshooting_utils import propagate_with_stm, single_shooting
+
+MU_EARTH = 3.986004418e14  # m^3/s^2
+
+
+def kepler_target(tof=3000.0):
+    """Orbite LEO légèrement elliptique : (r0, v0 exacts, rf atteint après tof)."""
+    r0 = np.array([7.0e6, 0.0, 0.0])
+    v0 = np.array([0.0, 7.8e3, 1.0e3])
+    rf, _, _ = propagate_with_stm(r0, v0, [0.0, tof], MU_EARTH)
+    return r0, v0, rf, [0.0, tof]
+
+
+def test_single_shooting_newton_converges_on_kepler_target():
+    r0, v0, rf, t_span = kepler_target()
+    v_guess = v0 + np.array([30.0, -20.0, 15.0])
+
+    r0_sol, v0_sol, info = single_shooting(r0, v_guess, rf, t_span, MU_EARTH, tol=1e-3, full_output=True)
+
+    assert info["converged"] and info["status"] == "converged"
+    assert info["iterations"] <= 5
+    assert info["residual"] < 1e-3
+    assert np.array_equal(r0_sol, r0)
+    assert np.allclose(v0_sol, v0, rtol=0, atol=1e-6)
+
+
+def test_single_shooting_reports_stagnation():
+    # Tolérance nulle : l'erreur finit par ne plus diminuer (arrondi), la boucle stagne avant max_iter
+    r0, v0, rf, t_span = kepler_target()
+    _, _, info = single_shooting(r0, v0 + 10.0, rf, t_span, MU_EARTH, tol=0.0, max_iter=50, full_output=True)
+
+    assert info["status"] == "stagnated"
+    assert not info["converged"]
+    assert info["iterations"] < 50
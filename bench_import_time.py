@@ -0,0 +1,79 @@
+"""
+bench_import_time.py
+Mesure le temps de démarrage à froid de chaque point d'entrée (LambertMaker,
+SingleShootingMaker, MonteCarloMaker).
+
+Pour chaque `main.py`, on extrait ses instructions `import` de premier niveau et on les
+exécute dans un interpréteur neuf (dans le dossier du script), sans lancer les questions
+interactives. Le temps de lancement de Python seul est donné comme référence.
+
+Exemple :
+    python bench_import_time.py --repeat 5
+"""
+
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINTS = {
+    "LambertMaker": os.path.join(ROOT, "LambertMaker_Moni", "main.py"),
+    "SingleShootingMaker": os.path.join(ROOT, "SingleShootingMaker_Moni", "main.py"),
+    "MonteCarloMaker": os.path.join(ROOT, "MonteCarloMaker_Moni3", "main.py"),
+}
+
+TIMER = """
+import time
+_t0 = time.perf_counter()
+{imports}
+print(time.perf_counter() - _t0)
+"""
+
+
+def entry_point_imports(path):
+    """Instructions d'import de premier niveau d'un script, sous forme de code source."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    nodes = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in nodes)
+
+
+def cold_import_time(imports, cwd):
+    """Temps (s) d'exécution des imports dans un interpréteur neuf (hors démarrage de Python)."""
+    out = subprocess.run([sys.executable, "-c", TIMER.format(imports=imports)], cwd=cwd,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def interpreter_startup_time():
+    """Temps (s) de lancement d'un interpréteur Python vide, mesuré depuis le processus parent."""
+    import time
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import à froid des points d'entrée")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de mesures par point d'entrée")
+    args = parser.parse_args()
+
+    startup = [interpreter_startup_time() for _ in range(args.repeat)]
+    print(f"{'Python seul':<22} min {min(startup) * 1e3:8.1f} ms   médiane {statistics.median(startup) * 1e3:8.1f} ms")
+
+    for name, path in ENTRY_POINTS.items():
+        imports = entry_point_imports(path)
+        try:
+            times = [cold_import_time(imports, os.path.dirname(path)) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as e:
+            last_line = e.stderr.strip().splitlines()[-1] if e.stderr.strip() else "erreur inconnue"
+            print(f"{name:<22} échec de l'import : {last_line}")
+            continue
+        print(f"{name:<22} min {min(times) * 1e3:8.1f} ms   médiane {statistics.median(times) * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+ensemble_propagator.py
+Intégrateur de Dormand-Prince 8(5,3) (DOP853) pour un ensemble d'états (N, n) propagés ensemble
+(N, 6 pour les trajectoires du Monte Carlo, N, 42 avec la matrice de transition du single shooting).
+
+Chaque échantillon a son propre temps, son propre pas et sa propre norme d'erreur : le contrôle
+du pas est celui de `scipy.integrate.solve_ivp(method="DOP853")`, mais chaque étage de Runge-Kutta
+évalue le second membre sur tous les échantillons actifs en un seul appel vectorisé.
+Les coefficients sont ceux de scipy, copiés dans `dop853_coefficients` (module privé de scipy).
+
+Avec une cible `target`, l'intégrateur suit aussi le rapprochement minimal |r(t) - target| :
+l'événement d/dt |r - target| = 0 (produit scalaire (r - target)·v passant de - à +) est détecté
+à chaque pas accepté, puis localisé sur l'interpolant dense de DOP853 (3 évaluations
+supplémentaires, uniquement pour les pas qui contiennent un minimum). Une règle d'arrêt `stop`
+peut en plus interrompre un échantillon (impact, évasion...) : elle est testée à la fin de chaque
+pas accepté, puis l'instant d'arrêt est localisé dans le pas sur le même interpolant.
+"""
+
+import numpy as np
+
+import dop853_coefficients as dop853
+
+SAFETY = 0.9
+MIN_FACTOR = 0.2
+MAX_FACTOR = 10.0
+ERROR_EXPONENT = -1 / 8
+STOP_BISECTIONS = 40   # localisation de l'arrêt dans le pas : 2^-40 du pas
+
+
+def _rms(x):
+    return np.sqrt(np.mean(x * x, axis=1))
+
+
+def _approach_rate(y, target):
+    """(r - target)·v : du signe de d/dt |r - target|."""
+    return np.einsum("ij,ij->i", y[:, :3] - target, y[:, 3:6])
+
+
+def illinois_root(g, lo, hi, g_lo, g_hi, xtol=1e-12, max_iter=50):
+    """
+    Racines de g (vectorisée, (M,) -> (M,)) encadrées par [lo, hi], avec g_lo < 0 <= g_hi
+    (fausse position, variante d'Illinois). Arrêt quand x varie de moins de xtol·|hi - lo| initial.
+    """
+    lo, hi, g_lo, g_hi = (np.array(a, dtype=float) for a in (lo, hi, g_lo, g_hi))
+    tol = xtol * np.abs(hi - lo)
+    side = np.zeros(len(lo))
+    x = hi.copy()
+    for _ in range(max_iter):
+        x_prev = x
+        x = lo - g_lo * (hi - lo) / (g_hi - g_lo)
+        gx = g(x)
+        below = gx < 0
+        # Illinois : la borne conservée deux fois de suite voit sa valeur divisée par deux
+        g_hi = np.where(below & (side < 0), g_hi / 2, g_hi)
+        g_lo = np.where(~below & (side > 0), g_lo / 2, g_lo)
+        lo, g_lo = np.where(below, x, lo), np.where(below, gx, g_lo)
+        hi, g_hi = np.where(below, hi, x), np.where(below, g_hi, gx)
+        side = np.where(below, -1.0, 1.0)
+        if np.all((np.abs(x - x_prev) <= tol) | (gx == 0)):
+            break
+    return x
+
+
+def _dense_output(fun, t, y, f, y_new, f_new, K, hs):
+    """Coefficients (7, M, n) de l'interpolant DOP853 sur le pas [t, t + hs] (étages 13 à 15 calculés ici)."""
+    A, C, D = dop853.A, dop853.C, dop853.D
+    for s in range(13, 16):
+        dy = np.tensordot(A[s, :s], K[:s], axes=1) * hs
+        K[s] = fun(t + C[s] * hs[:, 0], y + dy)
+    delta = y_new - y
+    F = np.empty((7,) + y.shape)
+    F[0] = delta
+    F[1] = hs * f - delta
+    F[2] = 2 * delta - hs * (f_new + f)
+    F[3:] = hs * np.tensordot(D, K, axes=1)
+    return F
+
+
+def _dense_eval(F, y, x):
+    """Interpolant DOP853 à la fraction x (M,) du pas."""
+    x = x[:, None]
+    out = np.zeros_like(y)
+    for i, c in enumerate(F[::-1]):
+        out += c
+        out *= x if i % 2 == 0 else 1 - x
+    return out + y
+
+
+def _initial_step(fun, t0, y0, f0, direction, rtol, atol):
+    """Pas initial par échantillon (même heuristique que solve_ivp, ordre 7)."""
+    scale = atol + np.abs(y0) * rtol
+    d0 = _rms(y0 / scale)
+    d1 = _rms(f0 / scale)
+    h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / np.where(d1 > 0, d1, 1.0))
+    f1 = fun(t0 + direction * h0, y0 + (direction * h0)[:, None] * f0)
+    d2 = _rms((f1 - f0) / scale) / h0
+    dmax = np.maximum(d1, d2)
+    h1 = np.where(dmax <= 1e-15, np.maximum(1e-6, h0 * 1e-3), (0.01 / np.where(dmax > 0, dmax, 1.0)) ** (1 / 8))
+    return np.minimum(100 * h0, h1)
+
+
+def propagate_ensemble(fun, t0, y0, t_final, rtol=1e-8, atol=1e-8, max_steps=100000, target=None, stop=None,
+                       best=np.inf):
+    """
+    Propage N états de t0 à t_final.
+
+    fun     : second membre vectorisé, fun(t (M,), y (M, n)) -> dy/dt (M, n)
+    t0      : instant initial (scalaire)
+    y0      : états initiaux (N, n) ; avec target, les 6 premières composantes sont (r, v)
+    t_final : instant final, scalaire ou (N,) (une durée différente par échantillon)
+    target  : position cible (3,) ou (N, 3) ; si fournie, rapprochement minimal sur [t0, t_final]
+    stop    : règle d'arrêt (avec target), stop(t (M,), y (M, 6), d_min (M,), best) -> codes (M,),
+              appelée à la fin de chaque pas accepté ; 0 = continuer, sinon l'échantillon est arrêté au
+              premier instant du pas où la règle se déclenche (bissection sur l'interpolant dense) ;
+              seuls les minima antérieurs comptent, et l'état à l'arrêt est une extrémité.
+              best = plus petit d_min atteint par l'ensemble (ou la valeur `best` fournie, si plus petite)
+    Retourne (y (N, n), info) ; info : 'nfev', 'steps', 'rejected' (N,) et 'success' (N,) ;
+    avec target, aussi 'd_min' (N,), 't_min' (N,) et 'r_min' (N, 3) (extrémités comprises) ;
+    avec stop, 'stop' (N,) : code d'arrêt (0 si l'échantillon a atteint t_final).
+    Les échantillons en échec (pas trop petit ou max_steps atteint) ont un état NaN.
+    """
+    y = np.array(y0, dtype=float)
+    N = len(y)
+    t_final = np.broadcast_to(np.asarray(t_final, dtype=float), (N,))
+    t = np.full(N, float(t0))
+    direction = np.where(t_final >= t0, 1.0, -1.0)
+
+    A, B, C = dop853.A[:12, :12], dop853.B, dop853.C[:12]
+    E3, E5 = dop853.E3, dop853.E5
+
+    nfev = np.full(N, 2)
+    steps = np.zeros(N, dtype=int)
+    rejected = np.zeros(N, dtype=int)
+    success = np.ones(N, dtype=bool)
+
+    f = fun(t, y)
+    h = _initial_step(fun, t, y, f, direction, rtol, atol)
+    just_rejected = np.zeros(N, dtype=bool)
+    active = np.flatnonzero(t != t_final)
+
+    if stop is not None and target is None:
+        raise ValueError("La règle d'arrêt demande une cible (target)")
+    reason = np.zeros(N, dtype=np.int8)
+    if target is not None:
+        target = np.broadcast_to(np.asarray(target, dtype=float), (N, 3))
+        r_min = y[:, :3].copy()
+        d_min = np.linalg.norm(r_min - target, axis=1)
+        t_min = t.copy()
+        g = _approach_rate(y, target)
+
+    K = np.empty((16,) + y.shape)
+    for _ in range(max_steps):
+        if not active.size:
+            break
+        ta, ya, fa = t[active], y[active], f[active]
+        ha = np.minimum(h[active], np.abs(t_final[active] - ta))
+        hs = (direction[active] * ha)[:, None]
+
+        # Étages de Runge-Kutta, évalués ensemble sur tous les échantillons actifs
+        Ka = K[:, :len(active)]
+        Ka[0] = fa
+        for s in range(1, 12):
+            dy = np.tensordot(A[s, :s], Ka[:s], axes=1) * hs
+            Ka[s] = fun(ta + C[s] * hs[:, 0], ya + dy)
+        y_new = ya + hs * np.tensordot(B, Ka[:12], axes=1)
+        t_new = np.where(ha == np.abs(t_final[active] - ta), t_final[active], ta + hs[:, 0])
+        f_new = fun(t_new, y_new)
+        Ka[12] = f_new
+        nfev[active] += 12
+
+        # Norme d'erreur par échantillon (estimateurs d'ordre 5 et 3 combinés, comme DOP853)
+        scale = atol + np.maximum(np.abs(ya), np.abs(y_new)) * rtol
+        err5 = np.sum((np.tensordot(E5, Ka[:13], axes=1) / scale) ** 2, axis=1)
+        err3 = np.sum((np.tensordot(E3, Ka[:13], axes=1) / scale) ** 2, axis=1)
+        denom = err5 + 0.01 * err3
+        error = np.where(denom > 0, ha * err5 / np.sqrt(np.where(denom > 0, denom, 1.0) * y.shape[1]), 0.0)
+
+        accept = error < 1
+        with np.errstate(divide="ignore"):
+            factor = np.where(error == 0, MAX_FACTOR, SAFETY * error ** ERROR_EXPONENT)
+        factor = np.where(accept, np.minimum(MAX_FACTOR, factor), np.maximum(MIN_FACTOR, factor))
+        factor = np.where(accept & just_rejected[active], np.minimum(1.0, factor), factor)
+
+        # Règle d'arrêt en fin de pas (d_min du début du pas) ; l'arrêt est ensuite localisé dans le pas
+        # par bissection sur l'interpolant dense : l'échantillon s'arrête au premier instant où elle se déclenche
+        x_end = np.ones(len(active))
+        halt = np.zeros(len(active), dtype=bool)
+        if target is not None:
+            F = np.empty((7,) + ya.shape)
+        if stop is not None:
+            halt = accept & (t_new != t_final[active])
+            code = np.zeros(len(active), dtype=np.int8)
+            best_now = min(best, np.nanmin(d_min))
+            code[halt] = stop(t_new[halt], y_new[halt], d_min[active[halt]], best_now)
+            halt &= code != 0
+            if np.any(halt):
+                idx = active[halt]
+                F[:, halt] = _dense_output(fun, ta[halt], ya[halt], fa[halt], y_new[halt], f_new[halt], Ka[:, halt],
+                                           hs[halt])
+                nfev[idx] += 3
+                Fh, yh, code_h = F[:, halt], ya[halt], code[halt]
+                lo, hi = np.zeros(idx.size), np.ones(idx.size)
+                for _ in range(STOP_BISECTIONS):
+                    x = (lo + hi) / 2
+                    c = stop(ta[halt] + x * hs[halt, 0], _dense_eval(Fh, yh, x), d_min[idx], best_now)
+                    lo, hi, code_h = np.where(c == 0, x, lo), np.where(c == 0, hi, x), np.where(c == 0, code_h, c)
+                x_end[halt] = hi
+                y_new[halt] = _dense_eval(Fh, yh, hi)
+                t_new[halt] = ta[halt] + hi * hs[halt, 0]
+                reason[idx] = code_h
+
+        if target is not None:
+            # Minimum de distance dans le pas (avant l'arrêt) : (r - target)·v passe de - à +
+            g_new = _approach_rate(y_new, target[active])
+            cross = accept & (g[active] < 0) & (g_new >= 0)
+            if np.any(cross):
+                idx = active[cross]
+                todo = cross & ~halt
+                if np.any(todo):
+                    F[:, todo] = _dense_output(fun, ta[todo], ya[todo], fa[todo], y_new[todo], f_new[todo],
+                                               Ka[:, todo], hs[todo])
+                    nfev[active[todo]] += 3
+                Fc, yc, hc = F[:, cross], ya[cross], hs[cross]
+                x = illinois_root(lambda x: _approach_rate(_dense_eval(Fc, yc, x), target[idx]),
+                                  np.zeros(len(idx)), x_end[cross], g[idx], g_new[cross])
+                r_c = _dense_eval(Fc, yc, x)[:, :3]
+                d_c = np.linalg.norm(r_c - target[idx], axis=1)
+                better = d_c < d_min[idx]
+                d_min[idx[better]], r_min[idx[better]] = d_c[better], r_c[better]
+                t_min[idx[better]] = ta[cross][better] + x[better] * hc[better, 0]
+            if np.any(halt):
+                # L'état à l'arrêt est une extrémité
+                idx = active[halt]
+                d_s = np.linalg.norm(y_new[halt, :3] - target[idx], axis=1)
+                better = d_s < d_min[idx]
+                d_min[idx[better]], r_min[idx[better]] = d_s[better], y_new[halt, :3][better]
+                t_min[idx[better]] = t_new[halt][better]
+            g[active[accept]] = g_new[accept]
+
+        acc = active[accept]
+        t[acc], y[acc], f[acc] = t_new[accept], y_new[accept], f_new[accept]
+        steps[acc] += 1
+        rejected[active[~accept]] += 1
+        just_rejected[active] = ~accept
+        h[active] = ha * factor
+
+        # Pas devenu trop petit (ou état non fini) : l'échantillon est abandonné
+        too_small = h[active] < 10 * np.spacing(np.abs(t[active]))
+        failed = active[too_small | ~np.all(np.isfinite(y[active]), axis=1)]
+        success[failed] = False
+        active = active[(t[active] != t_final[active]) & success[active] & (reason[active] == 0)]
+    else:
+        success[active] = False
+
+    y[~success] = np.nan
+    info = {"nfev": nfev, "steps": steps, "rejected": rejected, "success": success}
+    if target is not None:
+        # Extrémité finale (cible pas encore atteinte à t_final) ; échantillons arrêtés : d_min acquis
+        d_f = np.linalg.norm(y[:, :3] - target, axis=1)
+        end = (d_f < d_min) & (reason == 0)
+        d_min[end], r_min[end], t_min[end] = d_f[end], y[end, :3], t[end]
+        d_min[~success], t_min[~success], r_min[~success] = np.nan, np.nan, np.nan
+        info.update({"d_min": d_min, "t_min": t_min, "r_min": r_min})
+    if stop is not None:
+        info["stop"] = reason
+    return y, info
@@ -0,0 +1,238 @@
+"""
+kepler_propagator.py
+Propagateur képlérien analytique en variables universelles (fonctions f et g de Lagrange,
+fonctions de Stumpff), vectorisé sur de nombreux états et durées, avec la matrice de
+transition (STM) 6x6 analytique.
+
+Valable pour toutes les coniques (elliptique, parabolique, hyperbolique) et pour des durées
+négatives. Remplace l'intégration numérique de `two_body_equations` quand le seul modèle
+de force est le corps central.
+"""
+
+import numpy as np
+
+
+def stumpff(z):
+    """Fonctions de Stumpff c2, c3, c4, c5 (séries de Taylor près de z = 0)."""
+    z = np.asarray(z, dtype=float)
+    c2 = np.empty_like(z)
+    c3 = np.empty_like(z)
+    small = np.abs(z) < 0.1
+    pos = (z > 0) & ~small
+    neg = (z < 0) & ~small
+
+    # Séries : c_k(z) = sum_j (-z)^j / (k + 2j)!
+    zs = z[small]
+    c2[small] = 1/2 - zs/24 * (1 - zs/30 * (1 - zs/56 * (1 - zs/90 * (1 - zs/132 * (1 - zs/182)))))
+    c3[small] = 1/6 - zs/120 * (1 - zs/42 * (1 - zs/72 * (1 - zs/110 * (1 - zs/156 * (1 - zs/210)))))
+    c4 = np.empty_like(z)
+    c5 = np.empty_like(z)
+    c4[small] = 1/24 - zs/720 * (1 - zs/56 * (1 - zs/90 * (1 - zs/132 * (1 - zs/182 * (1 - zs/240)))))
+    c5[small] = 1/120 - zs/5040 * (1 - zs/72 * (1 - zs/110 * (1 - zs/156 * (1 - zs/210 * (1 - zs/272)))))
+
+    sz = np.sqrt(z[pos])
+    c2[pos] = (1 - np.cos(sz)) / z[pos]
+    c3[pos] = (sz - np.sin(sz)) / sz**3
+    sz = np.sqrt(-z[neg])
+    c2[neg] = (np.cosh(sz) - 1) / -z[neg]
+    c3[neg] = (np.sinh(sz) - sz) / sz**3
+
+    # Récurrence c_k = 1/k! - z c_{k+2}
+    big = ~small
+    c4[big] = (1/2 - c2[big]) / z[big]
+    c5[big] = (1/6 - c3[big]) / z[big]
+    return c2, c3, c4, c5
+
+
+def _universal_functions(chi, alpha):
+    """Fonctions universelles U0..U5 de la variable universelle chi."""
+    z = alpha * chi * chi
+    c2, c3, c4, c5 = stumpff(z)
+    U2 = chi**2 * c2
+    U3 = chi**3 * c3
+    U0 = 1 - z * c2
+    U1 = chi * (1 - z * c3)
+    return U0, U1, U2, U3, chi**4 * c4, chi**5 * c5
+
+
+def _solve_universal_anomaly(r0, sigma0, alpha, sqrt_mu_dt, tol=1e-15, max_iter=50):
+    """
+    Résout l'équation de Kepler universelle r0 U1 + sigma0 U2 + U3 = sqrt(mu) dt
+    (itérations de Laguerre-Conway, n = 5).
+
+    Pour une orbite elliptique, le temps est d'abord ramené à moins d'une période ;
+    chi est ensuite augmenté de 2 pi / sqrt(alpha) par révolution complète.
+    """
+    ellipse = alpha > 1e-12
+    rev = np.zeros_like(sqrt_mu_dt)
+    target = sqrt_mu_dt.copy()
+    period = np.where(ellipse, 2 * np.pi / np.where(ellipse, alpha, 1.0)**1.5, np.inf)  # sqrt(mu)·période
+    rev[ellipse] = np.floor(target[ellipse] / period[ellipse])
+    target[ellipse] -= rev[ellipse] * period[ellipse]
+
+    # Estimation initiale : temps / rayon, bornée pour les hyperboles rapides
+    chi = np.where(ellipse, target * alpha, target / r0)
+    hyper = alpha < -1e-12
+    if np.any(hyper):
+        a = 1 / alpha[hyper]
+        s = np.sign(target[hyper])
+        with np.errstate(invalid="ignore", divide="ignore"):             # dt = 0 : 0 / 0
+            arg = -2 * target[hyper] / (a * (sigma0[hyper] + s * np.sqrt(-a) * (1 - r0[hyper] / a)))
+            guess = s * np.sqrt(-a) * np.log(arg)
+        chi[hyper] = np.where(np.isfinite(guess) & (arg > 0), guess, chi[hyper])
+
+    n = 5.0
+    # Les états d'essai très hyperboliques d'un solveur de Newton peuvent déborder : ils donnent NaN, sans avertissement
+    with np.errstate(over="ignore", invalid="ignore"):
+        for _ in range(max_iter):
+            U0, U1, U2, U3, _, _ = _universal_functions(chi, alpha)
+            F = r0 * U1 + sigma0 * U2 + U3 - target
+            dF = r0 * U0 + sigma0 * U1 + U2                     # = r > 0
+            ddF = (1 - alpha * r0) * U1 + sigma0 * U0
+            root = np.sqrt(np.abs((n - 1)**2 * dF**2 - n * (n - 1) * F * ddF))
+            delta = n * F / (dF + np.sign(dF) * root)
+            chi = chi - delta
+            if np.all(np.abs(delta) <= tol * np.maximum(1.0, np.abs(chi))):
+                break
+    return chi + rev * 2 * np.pi / np.sqrt(np.where(ellipse, alpha, 1.0)) * ellipse
+
+
+def _prepare(r0, v0, dt, mu):
+    r0 = np.asarray(r0, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+    dt = np.asarray(dt, dtype=float)
+    scalar = r0.ndim == 1 and v0.ndim == 1 and dt.ndim == 0
+    n = np.broadcast_shapes(r0.shape[:-1], v0.shape[:-1], dt.shape)
+    r0 = np.broadcast_to(r0, n + (3,)).reshape(-1, 3)
+    v0 = np.broadcast_to(v0, n + (3,)).reshape(-1, 3)
+    dt = np.broadcast_to(dt, n).ravel()
+    return r0, v0, dt, scalar, n
+
+
+def _invariants(r0v, v0v, mu):
+    """sqrt(mu), |r0|, sigma0 = r0·v0 / sqrt(mu) et alpha = 1/a de N états."""
+    sqrt_mu = np.sqrt(mu)
+    r0 = np.linalg.norm(r0v, axis=1)
+    sigma0 = np.einsum("ij,ij->i", r0v, v0v) / sqrt_mu
+    alpha = 2 / r0 - np.einsum("ij,ij->i", v0v, v0v) / mu
+    return sqrt_mu, r0, sigma0, alpha
+
+
+def _lagrange(r0v, v0v, chi, sqrt_mu, r0, sigma0, alpha):
+    """État à la variable universelle chi (fonctions f et g de Lagrange, formules explicites)."""
+    U = _universal_functions(chi, alpha)
+    U0, U1, U2, U3 = U[:4]
+    r = r0 * U0 + sigma0 * U1 + U2
+    f = 1 - U2 / r0
+    g = (r0 * U1 + sigma0 * U2) / sqrt_mu
+    fdot = -sqrt_mu * U1 / (r * r0)
+    gdot = 1 - U2 / r
+    rv = f[:, None] * r0v + g[:, None] * v0v
+    vv = fdot[:, None] * r0v + gdot[:, None] * v0v
+    return rv, vv, (U, r, f, g, fdot, gdot)
+
+
+def _kepler(r0v, v0v, dt, mu):
+    """Variables communes à la propagation et à la STM."""
+    sqrt_mu, r0, sigma0, alpha = _invariants(r0v, v0v, mu)
+    chi = _solve_universal_anomaly(r0, sigma0, alpha, sqrt_mu * dt)
+    rv, vv, (U, r, f, g, fdot, gdot) = _lagrange(r0v, v0v, chi, sqrt_mu, r0, sigma0, alpha)
+    return rv, vv, (sqrt_mu, r0, sigma0, alpha, chi, U, r, f, g, fdot, gdot)
+
+
+def universal_anomaly(r0, v0, dt, mu):
+    """
+    Variable universelle chi (m^1/2) atteinte après une durée dt depuis (r0, v0) : solution de
+    l'équation de Kepler universelle. Mêmes formes d'entrée que `propagate_kepler`.
+    """
+    r0v, v0v, dtv, scalar, n = _prepare(r0, v0, dt, mu)
+    sqrt_mu, r0, sigma0, alpha = _invariants(r0v, v0v, mu)
+    chi = _solve_universal_anomaly(r0, sigma0, alpha, sqrt_mu * dtv)
+    return chi[0] if scalar else chi.reshape(n)
+
+
+def state_at_anomaly(r0, v0, chi, mu):
+    """
+    État (r, v) et durée écoulée t (s) à la variable universelle chi depuis (r0, v0).
+
+    Inverse de `universal_anomaly` : tout est explicite en chi (aucune équation de Kepler à résoudre),
+    t = (r0 U1 + sigma0 U2 + U3) / sqrt(mu). Pratique pour parcourir une orbite à pas réguliers en chi
+    (pas en temps courts près du périgée, longs à l'apogée).
+    """
+    r0v, v0v, chiv, scalar, n = _prepare(r0, v0, chi, mu)
+    sqrt_mu, r0, sigma0, alpha = _invariants(r0v, v0v, mu)
+    rv, vv, (U, _, _, _, _, _) = _lagrange(r0v, v0v, chiv, sqrt_mu, r0, sigma0, alpha)
+    t = (r0 * U[1] + sigma0 * U[2] + U[3]) / sqrt_mu
+    if scalar:
+        return rv[0], vv[0], t[0]
+    return rv.reshape(n + (3,)), vv.reshape(n + (3,)), t.reshape(n)
+
+
+def propagate_kepler(r0, v0, dt, mu):
+    """
+    Propagation képlérienne analytique.
+
+    r0, v0 : position (m) et vitesse (m/s), (3,) ou (N,3)
+    dt     : durée(s) de propagation (s), scalaire ou (N,) ; diffusée avec r0, v0
+    mu     : paramètre gravitationnel (m³/s²)
+    Retourne (r, v) de même forme que les entrées diffusées.
+    """
+    r0v, v0v, dtv, scalar, n = _prepare(r0, v0, dt, mu)
+    rv, vv, _ = _kepler(r0v, v0v, dtv, mu)
+    if scalar:
+        return rv[0], vv[0]
+    return rv.reshape(n + (3,)), vv.reshape(n + (3,))
+
+
+def kepler_stm(r0, v0, dt, mu):
+    """
+    Propagation képlérienne analytique avec matrice de transition.
+
+    Retourne (r, v, Phi) avec Phi = d(r, v) / d(r0, v0), (6,6) ou (N,6,6).
+    Les dérivées sont obtenues par dérivation exacte des fonctions f et g, la dérivée de chi
+    venant du théorème des fonctions implicites appliqué à l'équation de Kepler universelle.
+    """
+    r0v, v0v, dtv, scalar, n = _prepare(r0, v0, dt, mu)
+    rv, vv, (sqrt_mu, r0, sigma0, alpha, chi, U, r, f, g, fdot, gdot) = _kepler(r0v, v0v, dtv, mu)
+    U0, U1, U2, U3, U4, U5 = U
+    N = len(r0)
+
+    # Gradients (N,6) des scalaires par rapport à x0 = (r0, v0)
+    d_r0 = np.zeros((N, 6))
+    d_r0[:, :3] = r0v / r0[:, None]
+    d_sigma0 = np.concatenate([v0v, r0v], axis=1) / sqrt_mu
+    d_alpha = np.concatenate([-2 * r0v / r0[:, None]**3, -2 * v0v / mu], axis=1)
+
+    # Dérivées des fonctions universelles par rapport à alpha : dU_n/dalpha = -(chi U_{n+1} - n U_{n+2}) / 2
+    U0_a = -0.5 * chi * U1
+    U1_a = -0.5 * (chi * U2 - U3)
+    U2_a = -0.5 * (chi * U3 - 2 * U4)
+    U3_a = -0.5 * (chi * U4 - 3 * U5)
+
+    # dchi par l'équation de Kepler : r dchi + U1 dr0 + U2 dsigma0 + (r0 U1_a + sigma0 U2_a + U3_a) dalpha = 0
+    K_alpha = r0 * U1_a + sigma0 * U2_a + U3_a
+    d_chi = -(U1[:, None] * d_r0 + U2[:, None] * d_sigma0 + K_alpha[:, None] * d_alpha) / r[:, None]
+
+    dU0 = -alpha[:, None] * U1[:, None] * d_chi + U0_a[:, None] * d_alpha
+    dU1 = U0[:, None] * d_chi + U1_a[:, None] * d_alpha
+    dU2 = U1[:, None] * d_chi + U2_a[:, None] * d_alpha
+
+    c = lambda x: x[:, None]
+    d_r = c(U0) * d_r0 + c(r0) * dU0 + c(U1) * d_sigma0 + c(sigma0) * dU1 + dU2
+    d_f = -dU2 / c(r0) + c(U2 / r0**2) * d_r0
+    d_g = (c(U1) * d_r0 + c(r0) * dU1 + c(U2) * d_sigma0 + c(sigma0) * dU2) / sqrt_mu
+    d_fdot = -sqrt_mu * (dU1 / c(r * r0) - c(U1 / (r * r0)**2) * (c(r0) * d_r + c(r) * d_r0))
+    d_gdot = -dU2 / c(r) + c(U2 / r**2) * d_r
+
+    eye = np.eye(3)
+    phi = np.zeros((N, 6, 6))
+    phi[:, :3, :3] = f[:, None, None] * eye
+    phi[:, :3, 3:] = g[:, None, None] * eye
+    phi[:, 3:, :3] = fdot[:, None, None] * eye
+    phi[:, 3:, 3:] = gdot[:, None, None] * eye
+    phi[:, :3] += r0v[:, :, None] * d_f[:, None, :] + v0v[:, :, None] * d_g[:, None, :]
+    phi[:, 3:] += r0v[:, :, None] * d_fdot[:, None, :] + v0v[:, :, None] * d_gdot[:, None, :]
+
+    if scalar:
+        return rv[0], vv[0], phi[0]
+    return rv.reshape(n + (3,)), vv.reshape(n + (3,)), phi.reshape(n + (6, 6))
@@ -0,0 +1,35 @@
+"""
+lazy_import.py
+Import paresseux des bibliothèques lourdes (astropy, poliastro, scipy...) :
+le vrai module n'est importé qu'au premier accès à l'un de ses attributs.
+"""
+import importlib
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """Module fictif qui importe `name` au premier accès à un attribut."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """
+    Retourne un module paresseux pour `name`, ex. `u = lazy_import("astropy.units")` puis `u.m`.
+    """
+    return _LazyModule(name)
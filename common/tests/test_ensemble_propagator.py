@@ -0,0 +1,38 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from ensemble_propagator import propagate_ensemble
+
+MU_EARTH = 3.986004418e14  # m^3/s^2
+
+
+def two_body(t, y):
+    r = y[:, :3]
+    r_norm = np.linalg.norm(r, axis=1)[:, None]
+    return np.hstack((y[:, 3:], -MU_EARTH * r / r_norm**3))
+
+
+def test_ensemble_dop853_matches_solve_ivp():
+    # Quasi circulaire, elliptiques (pas rejetés près du périgée), GEO, et une propagation rétrograde
+    y0 = np.array([[7.0e6, 0.0, 0.0, 0.0, 7.6e3, 0.0],
+                   [7.0e6, 0.0, 0.0, 0.0, 10.0e3, 1.0e3],
+                   [7.0e6, 0.0, 0.0, 0.0, 10.5e3, 0.0],
+                   [4.2e7, 0.0, 0.0, 0.0, 3.07e3, 100.0],
+                   [7.0e6, 0.0, 0.0, 0.0, 9.0e3, 0.0]])
+    t_final = np.array([20000.0, 40000.0, 30000.0, 86400.0, -15000.0])
+
+    y, info = propagate_ensemble(two_body, 0.0, y0, t_final, rtol=1e-9, atol=1e-6)
+
+    assert info["success"].all()
+    assert info["rejected"].sum() > 0
+    for k in range(len(y0)):
+        ref = solve_ivp(lambda t, yk: two_body(np.array([t]), yk[None])[0], [0.0, t_final[k]], y0[k],
+                        method="DOP853", rtol=1e-9, atol=1e-6)
+        steps = len(ref.t) - 1
+        # solve_ivp : 2 évaluations pour le pas initial, puis 12 par pas tenté (accepté ou rejeté)
+        rejected = (ref.nfev - 2) // 12 - steps
+        assert info["nfev"][k] == ref.nfev
+        assert info["steps"][k] == steps
+        assert info["rejected"][k] == rejected
+        # Mêmes pas : seul l'ordre des opérations flottantes diffère
+        assert np.allclose(y[k], ref.y[:, -1], rtol=1e-12, atol=1e-5)
@@ -0,0 +1,72 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from kepler_propagator import kepler_stm, propagate_kepler, state_at_anomaly, universal_anomaly
+
+MU_EARTH = 3.986004418e14  # m^3/s^2
+
+
+def integrate(r0, v0, dt):
+    """Référence indépendante : intégration numérique du problème à deux corps."""
+    def rhs(t, y):
+        r = y[:3]
+        return np.concatenate((y[3:], -MU_EARTH * r / np.linalg.norm(r)**3))
+    sol = solve_ivp(rhs, [0.0, dt], np.concatenate((r0, v0)), method="DOP853", rtol=1e-13, atol=1e-6)
+    return sol.y[:3, -1], sol.y[3:, -1]
+
+
+# (r0, v0, dt) : ellipse, hyperbole, durée négative, plusieurs révolutions
+CASES = {
+    "elliptic": ([7.0e6, 0.0, 0.0], [0.0, 8.2e3, 1.5e3], 4000.0),
+    "hyperbolic": ([7.0e6, 1.0e6, 0.0], [0.0, 12.0e3, 2.0e3], 20000.0),
+    "negative_dt": ([7.0e6, 0.0, 0.0], [0.0, 8.2e3, 1.5e3], -4000.0),
+    "multi_rev": ([7.0e6, 0.0, 0.0], [0.0, 7.6e3, 0.5e3], 5.3 * 5800.0),
+}
+
+
+def test_propagate_kepler_matches_integration():
+    for name, (r0, v0, dt) in CASES.items():
+        r0, v0 = np.array(r0), np.array(v0)
+        r, v = propagate_kepler(r0, v0, dt, MU_EARTH)
+        r_ref, v_ref = integrate(r0, v0, dt)
+        assert np.allclose(r, r_ref, rtol=0, atol=1e-2), name   # m
+        assert np.allclose(v, v_ref, rtol=0, atol=1e-5), name   # m/s
+
+
+def test_propagate_kepler_vectorized_matches_scalar_calls():
+    r0 = np.array([c[0] for c in CASES.values()])
+    v0 = np.array([c[1] for c in CASES.values()])
+    dt = np.array([c[2] for c in CASES.values()])
+    r, v = propagate_kepler(r0, v0, dt, MU_EARTH)
+    for k in range(len(dt)):
+        rk, vk = propagate_kepler(r0[k], v0[k], dt[k], MU_EARTH)
+        assert np.allclose(r[k], rk, rtol=1e-14, atol=0) and np.allclose(v[k], vk, rtol=1e-14, atol=0)
+
+
+def test_kepler_stm_matches_finite_differences():
+    for name, (r0, v0, dt) in CASES.items():
+        x0 = np.concatenate((r0, v0))
+        _, _, phi = kepler_stm(x0[:3], x0[3:], dt, MU_EARTH)
+
+        # Différences finies centrées, pas de 1 m en position et 1 mm/s en vitesse
+        phi_fd = np.empty((6, 6))
+        for j in range(6):
+            h = 1.0 if j < 3 else 1e-3
+            e = np.zeros(6)
+            e[j] = h
+            rp, vp = propagate_kepler(x0[:3] + e[:3], x0[3:] + e[3:], dt, MU_EARTH)
+            rm, vm = propagate_kepler(x0[:3] - e[:3], x0[3:] - e[3:], dt, MU_EARTH)
+            phi_fd[:, j] = np.concatenate((rp - rm, vp - vm)) / (2 * h)
+        assert np.allclose(phi, phi_fd, rtol=1e-5, atol=1e-8), name
+
+
+def test_state_at_anomaly_inverts_universal_anomaly():
+    r0 = np.array([c[0] for c in CASES.values()])
+    v0 = np.array([c[1] for c in CASES.values()])
+    dt = np.array([c[2] for c in CASES.values()])
+    chi = universal_anomaly(r0, v0, dt, MU_EARTH)
+    r, v, t = state_at_anomaly(r0, v0, chi, MU_EARTH)
+    r_ref, v_ref = propagate_kepler(r0, v0, dt, MU_EARTH)
+
+    assert np.allclose(t, dt, rtol=1e-12, atol=1e-9)
+    assert np.allclose(r, r_ref, rtol=1e-12, atol=1e-6) and np.allclose(v, v_ref, rtol=1e-12, atol=1e-9)